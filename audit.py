@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统一审计入口
+一次遍历 messages/、app/、components/ 与根目录样式/站点地图文件，
+将每个文件节点分发给已注册的检查插件，并在遍历结束后执行全局检查：
+- translations:        check_translations.check_file（按英文源文件节点分发）
+- seo.*:               seo_metadata_audit 的 metadata / ALT / hreflang 检查
+- 404.*:               check_404_pages 的 not-found 文件、翻译与调用检查
+- ui.*:                ui_layout_audit 的 CSS 与 TSX 检查
+
+遍历时每个文件只读取/解析一次（通过 message_corpus 共享），插件直接复用缓存；
+只预读被选中的检查声明的输入文件（如 --only seo.alt_tags 只解析各语言的 faq.json）。
+
+用法：
+    python audit.py                      # 运行全部检查
+    python audit.py --only 'seo.*'       # 只运行 SEO 检查
+    python audit.py --skip translations  # 跳过翻译检查
+    python audit.py --list               # 列出所有检查
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+import check_404_pages
+import check_translations
+import seo_metadata_audit
+import ui_layout_audit
+from audit_profile import add_profile_arguments, configure, finish, section
+from audit_report import JsonlReportWriter, convert_jsonl_to_json, translation_records
+from message_corpus import load_messages, load_text
+
+# 设置输出编码为 UTF-8
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+# 遍历范围
+TRAVERSAL_ROOTS = ['messages', 'app', 'components']
+ROOT_FILES = ['styles.css', 'sitemap.xml']
+
+# 遍历时预读为文本的源码类型
+SOURCE_SUFFIXES = {'.ts', '.tsx', '.css', '.xml'}
+
+REPORT_FILE = Path('full_audit_report.json')
+REPORT_STREAM_FILE = Path('full_audit_report.jsonl')
+
+# 翻译问题记录类型对应的严重程度
+TRANSLATION_SEVERITY = {
+    'missing_key': 'error',
+    'placeholder_issue': 'error',
+    'html_tag_issue': 'error',
+    'structure_issue': 'warning',
+}
+
+
+class AuditCheck(NamedTuple):
+    """检查插件"""
+    name: str
+    # 逐个产出问题；节点检查以文件路径为参数，全局检查无参数
+    run: Callable[..., Iterable[Dict[str, Any]]]
+    # 节点匹配函数（参数为 posix 相对路径）；为 None 时是全局检查，遍历结束后执行一次
+    match: Optional[Callable[[str], bool]] = None
+    # 检查读取的输入文件匹配函数；遍历时只预读被选中的检查声明的输入
+    inputs: Callable[[str], bool] = lambda path: False
+
+
+CHECKS: List[AuditCheck] = []
+
+
+def input_patterns(*patterns: str) -> Callable[[str], bool]:
+    """由路径模式生成输入匹配函数（只有 * 是通配符，匹配一层路径内的任意字符；[locale] 等按字面匹配）"""
+    regex = re.compile('(?:' + '|'.join(re.escape(p).replace(r'\*', '[^/]*') for p in patterns) + r')\Z')
+    return lambda path: regex.match(path) is not None
+
+
+def register_check(name: str, run: Callable[..., Iterable[Dict[str, Any]]],
+                   match: Optional[Callable[[str], bool]] = None,
+                   inputs: Sequence[str] = ()) -> None:
+    """注册检查插件；inputs 为检查读取的文件的路径模式"""
+    CHECKS.append(AuditCheck(name, run, match, input_patterns(*inputs)))
+
+
+def translation_issues(filename: str, lang: str, results: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """将 check_file 的结果转换为统一的问题对象"""
+    for record in translation_records(filename, lang, results):
+        record_type = record.pop('record')
+        record['language'] = record.pop('locale')
+        if record_type == 'pair':
+            if not record.get('file_exists'):
+                yield {'type': 'translation_file', 'file': filename, 'language': lang,
+                       'issue': '文件不存在', 'severity': 'error'}
+            elif 'json_error' in record or 'error' in record:
+                message = record.get('json_error') or record.get('error')
+                yield {'type': 'translation_file', 'file': filename, 'language': lang,
+                       'issue': f'读取文件错误: {message}', 'severity': 'error'}
+            continue
+        yield {'type': record_type, 'severity': TRANSLATION_SEVERITY[record_type], **record}
+
+
+def check_translation_source(en_file: Path) -> Iterator[Dict[str, Any]]:
+    """对一个英文源文件节点，检查所有目标语言的对应文件"""
+    for lang in check_translations.LANGUAGES:
+        lang_file = Path('messages') / lang / en_file.name
+        results = check_translations.check_file(en_file, lang_file, lang)
+        yield from translation_issues(en_file.name, lang, results)
+
+
+def _is_translation_source(path: str) -> bool:
+    directory, _, filename = path.rpartition('/')
+    return directory == 'messages/en' and filename in check_translations.FILES
+
+
+register_check('translations', check_translation_source, match=_is_translation_source,
+               inputs=[f'messages/*/{filename}' for filename in check_translations.FILES])
+register_check('seo.metadata', seo_metadata_audit.iter_metadata,
+               inputs=sorted({f"messages/*/{page['file']}" for page in seo_metadata_audit.PAGES.values()}))
+register_check('seo.alt_tags', seo_metadata_audit.iter_alt_tags,
+               inputs=['messages/*/faq.json', 'app/[locale]/about/page.tsx', 'app/[locale]/page.tsx'])
+register_check('seo.hreflang', seo_metadata_audit.iter_hreflang,
+               inputs=['app/[locale]/layout.tsx', 'sitemap.xml'])
+register_check('404.not_found_files', check_404_pages.iter_not_found_files,
+               inputs=['app/not-found.tsx', 'app/[locale]/not-found.tsx'])
+register_check('404.translations', check_404_pages.iter_404_translations,
+               inputs=['messages/*/index.json', 'messages/*/faq.json'])
+register_check('404.not_found_calls', check_404_pages.iter_not_found_calls,
+               inputs=['app/[locale]/faq/[slug]/page.tsx'])
+register_check('ui.css', ui_layout_audit.check_css_file, match=lambda path: path == 'styles.css',
+               inputs=['styles.css'])
+register_check('ui.tsx', ui_layout_audit.check_tsx_files,
+               inputs=['components/Navigation.tsx', 'app/[locale]/faq/[slug]/page.tsx'])
+
+
+def iter_nodes() -> Iterator[Path]:
+    """按确定的顺序遍历所有文件节点"""
+    for name in ROOT_FILES:
+        path = Path(name)
+        if path.is_file():
+            yield path
+    for root in TRAVERSAL_ROOTS:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                yield Path(dirpath) / name
+
+
+def prime_node(path: Path) -> None:
+    """预读节点：JSON 解析进共享语料，源码读入文本缓存；错误留给检查插件报告"""
+    try:
+        if path.suffix == '.json':
+            load_messages(path)
+        elif path.suffix in SOURCE_SUFFIXES:
+            load_text(path)
+    except Exception:
+        pass
+
+
+def select_checks(only: List[str], skip: List[str]) -> List[AuditCheck]:
+    """按 --only / --skip 模式（支持通配符）筛选检查"""
+    def matches(name: str, patterns: List[str]) -> bool:
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+    selected = []
+    for check in CHECKS:
+        if only and not matches(check.name, only):
+            continue
+        if skip and matches(check.name, skip):
+            continue
+        selected.append(check)
+    return selected
+
+
+def _split_patterns(values: Optional[List[str]]) -> List[str]:
+    patterns = []
+    for value in values or []:
+        patterns.extend(p.strip() for p in value.split(',') if p.strip())
+    return patterns
+
+
+def run_audit(checks: List[AuditCheck], writer: JsonlReportWriter) -> Dict[str, Dict[str, Any]]:
+    """执行一次遍历并分发节点，返回每个检查的 {issues, errors, warnings, seconds, nodes}"""
+    stats = {check.name: {'issues': 0, 'errors': 0, 'warnings': 0, 'seconds': 0.0, 'nodes': 0}
+             for check in checks}
+    stats['traversal'] = {'issues': 0, 'errors': 0, 'warnings': 0, 'seconds': 0.0, 'nodes': 0}
+    node_checks = [check for check in checks if check.match is not None]
+    global_checks = [check for check in checks if check.match is None]
+
+    def run_check(check: AuditCheck, *args) -> None:
+        # 检查逐个产出问题，直接写入报告流，不在内存中保留问题列表
+        check_stats = stats[check.name]
+        start = time.perf_counter()
+        with section(check.name):
+            for issue in check.run(*args):
+                writer.write({'record': 'issue', 'check': check.name, **issue})
+                check_stats['issues'] += 1
+                if issue.get('severity') == 'error':
+                    check_stats['errors'] += 1
+                else:
+                    check_stats['warnings'] += 1
+        check_stats['seconds'] += time.perf_counter() - start
+        check_stats['nodes'] += 1
+
+    # 1. 单次遍历：预读被选中的检查声明的输入，并将节点分发给匹配的节点检查
+    for path in iter_nodes():
+        relative = path.as_posix()
+        start = time.perf_counter()
+        with section('traversal'):
+            if any(check.inputs(relative) for check in checks):
+                prime_node(path)
+                stats['traversal']['nodes'] += 1
+        stats['traversal']['seconds'] += time.perf_counter() - start
+
+        for check in node_checks:
+            if check.match(relative):
+                run_check(check, path)
+
+    # 2. 全局检查（复用遍历时建立的缓存）
+    for check in global_checks:
+        run_check(check)
+
+    return stats
+
+
+def print_stats(stats: Dict[str, Dict[str, Any]]) -> None:
+    """打印每个检查的问题数与耗时"""
+    print(f"{'Check':<24}{'Nodes':>8}{'Issues':>9}{'Errors':>9}{'Warnings':>10}{'Time (ms)':>12}")
+    print("-" * 72)
+    for name, check_stats in stats.items():
+        print(f"{name:<24}{check_stats['nodes']:>8}{check_stats['issues']:>9}"
+              f"{check_stats['errors']:>9}{check_stats['warnings']:>10}"
+              f"{check_stats['seconds'] * 1000:>12.1f}")
+    print("-" * 72)
+    total_issues = sum(s['issues'] for s in stats.values())
+    total_seconds = sum(s['seconds'] for s in stats.values())
+    print(f"{'Total':<24}{'':>8}{total_issues:>9}{'':>9}{'':>10}{total_seconds * 1000:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='统一审计入口：一次遍历，执行所有已注册的检查')
+    parser.add_argument('--only', action='append', help='只运行匹配的检查（逗号分隔，支持通配符，如 seo.*）')
+    parser.add_argument('--skip', action='append', help='跳过匹配的检查（逗号分隔，支持通配符）')
+    parser.add_argument('--list', action='store_true', help='列出所有已注册的检查')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+
+    if args.list:
+        for check in CHECKS:
+            scope = '节点' if check.match is not None else '全局'
+            print(f"{check.name:<24}{scope}")
+        return
+
+    checks = select_checks(_split_patterns(args.only), _split_patterns(args.skip))
+    if not checks:
+        print("没有匹配的检查")
+        sys.exit(2)
+
+    print("=" * 80)
+    print("统一审计报告")
+    print("=" * 80)
+    print()
+
+    with JsonlReportWriter(REPORT_STREAM_FILE, 'audit') as writer:
+        stats = run_audit(checks, writer)
+
+    print_stats(stats)
+
+    convert_jsonl_to_json(REPORT_STREAM_FILE, REPORT_FILE)
+    print("\n" + "=" * 80)
+    print(f"详细报告已保存到: {REPORT_FILE}")
+    print("=" * 80)
+
+    finish(args)
+    sys.exit(1 if any(s['errors'] for s in stats.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()
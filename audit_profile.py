@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+审计耗时与资源统计
+为各审计脚本提供轻量的分段统计：每个检查段记录
+1. 墙钟耗时
+2. 读取的文件数（files_read）与解析的字节数（bytes_parsed）
+3. 正则表达式执行次数（regex_evals）
+4. HTTP 请求数（http_requests）
+
+未启用时 count() 直接返回，几乎没有开销。
+启用后可输出 --profile 表格、--profile-json 统计文件以及 --trace Chrome 跟踪文件
+（在 chrome://tracing 或 https://ui.perfetto.dev 中打开）。
+
+段栈按线程独立维护；线程池通过 thread_initializer() 沿用提交方当前的段。
+--jobs 子进程以 worker_config()/init_worker() 初始化，每个任务结束后用 collect() 取出统计随结果返回，
+主进程用 merge() 汇总。
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# 统计的计数器名称（顺序即表格列顺序）
+METRICS = ['files_read', 'bytes_parsed', 'regex_evals', 'http_requests']
+
+
+class Profiler:
+    """按检查段汇总耗时与计数器"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # {段名: {'calls', 'seconds', 计数器...}}，按首次出现的顺序
+        self.sections: Dict[str, Dict[str, float]] = {}
+        self.trace_events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+
+    @property
+    def _stack(self) -> List[str]:
+        """当前线程的段栈"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _section_stats(self, name: str) -> Dict[str, float]:
+        stats = self.sections.get(name)
+        if stats is None:
+            stats = self.sections[name] = {'calls': 0, 'seconds': 0.0, **{m: 0 for m in METRICS}}
+        return stats
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """统计一个检查段；同名段多次进入时累加"""
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._stack
+        with self._lock:
+            stats = self._section_stats(name)
+            before = {m: stats[m] for m in METRICS}
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            with self._lock:
+                stats = self._section_stats(name)
+                stats['calls'] += 1
+                stats['seconds'] += elapsed
+                self.trace_events.append({
+                    'name': name,
+                    'cat': 'audit',
+                    'ph': 'X',
+                    'ts': round((start - self._origin) * 1e6, 1),
+                    'dur': round(elapsed * 1e6, 1),
+                    'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                    'args': {m: stats[m] - before[m] for m in METRICS},
+                })
+
+    def count(self, metric: str, amount: int = 1) -> None:
+        """为当前（最内层）检查段累加计数器；不在任何段内时记入 (unattributed)"""
+        if not self.enabled:
+            return
+        stack = self._stack
+        name = stack[-1] if stack else '(unattributed)'
+        with self._lock:
+            self._section_stats(name)[metric] += amount
+
+    def inherit(self, stack: List[str]) -> None:
+        """让当前线程以给定的段栈为起点（用于线程池工作线程）"""
+        self._local.stack = list(stack)
+
+    def reset(self, enabled: bool, origin: float) -> None:
+        """清空统计（子进程初始化时调用，避免 fork 继承的主进程统计被重复汇总）"""
+        with self._lock:
+            self.enabled = enabled
+            self._origin = origin
+            self._local = threading.local()
+            self.sections = {}
+            self.trace_events = []
+
+    def collect(self) -> Dict[str, Any]:
+        """取出并清空当前统计"""
+        with self._lock:
+            state = {'sections': self.sections, 'trace_events': self.trace_events}
+            self.sections = {}
+            self.trace_events = []
+        return state
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        """累加 collect() 取出的统计（来自子进程）"""
+        with self._lock:
+            for name, stats in state['sections'].items():
+                target = self._section_stats(name)
+                for key, value in stats.items():
+                    target[key] += value
+            self.trace_events.extend(state['trace_events'])
+
+    def print_table(self) -> None:
+        """打印 --profile 表格"""
+        print(f"\n{'Section':<28}{'Calls':>7}{'Wall (ms)':>11}{'Files':>7}{'Bytes':>11}{'Regex':>9}{'HTTP':>7}")
+        print("-" * 80)
+        for name, stats in self.sections.items():
+            print(f"{name:<28}{stats['calls']:>7}{stats['seconds'] * 1000:>11.1f}"
+                  f"{stats['files_read']:>7}{stats['bytes_parsed']:>11}"
+                  f"{stats['regex_evals']:>9}{stats['http_requests']:>7}")
+        print("-" * 80)
+
+    def export_json(self, path: Path) -> None:
+        """导出按段汇总的统计"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'sections': self.sections}, f, ensure_ascii=False, indent=2)
+
+    def export_trace(self, path: Path) -> None:
+        """导出 Chrome trace event 格式"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events, 'displayTimeUnit': 'ms'}, f)
+
+
+PROFILER = Profiler()
+
+
+def section(name: str):
+    """PROFILER.section 的快捷方式"""
+    return PROFILER.section(name)
+
+
+def count(metric: str, amount: int = 1) -> None:
+    """PROFILER.count 的快捷方式"""
+    PROFILER.count(metric, amount)
+
+
+def thread_initializer() -> Callable[[], None]:
+    """返回线程池的 initializer：工作线程中的计数记入提交方当前所在的段"""
+    stack = list(PROFILER._stack)
+    return lambda: PROFILER.inherit(stack)
+
+
+def worker_config() -> Dict[str, Any]:
+    """传给 --jobs 子进程初始化函数的统计配置"""
+    return {'enabled': PROFILER.enabled, 'origin': PROFILER._origin}
+
+
+def init_worker(config: Dict[str, Any]) -> None:
+    """在子进程中按主进程的配置重置统计（perf_counter 为系统级单调时钟，跟踪时间轴可直接对齐）"""
+    PROFILER.reset(config['enabled'], config['origin'])
+
+
+def collect() -> Optional[Dict[str, Any]]:
+    """取出子进程的统计以随任务结果返回；未启用时返回 None"""
+    return PROFILER.collect() if PROFILER.enabled else None
+
+
+def merge(state: Optional[Dict[str, Any]]) -> None:
+    """在主进程中汇总子进程的统计"""
+    if state is not None:
+        PROFILER.merge(state)
+
+
+def add_profile_arguments(parser) -> None:
+    """为 argparse 解析器添加统计相关参数"""
+    parser.add_argument('--profile', action='store_true', help='运行结束后打印各检查段的耗时与计数表')
+    parser.add_argument('--profile-json', type=Path, metavar='PATH', help='将各检查段统计导出为 JSON')
+    parser.add_argument('--trace', type=Path, metavar='PATH', help='导出 Chrome trace 文件')
+
+
+def configure(args) -> None:
+    """根据命令行参数启用统计"""
+    PROFILER.enabled = bool(args.profile or args.profile_json or args.trace)
+
+
+def finish(args) -> None:
+    """根据命令行参数输出统计结果"""
+    if not PROFILER.enabled:
+        return
+    if args.profile:
+        PROFILER.print_table()
+    if args.profile_json:
+        PROFILER.export_json(args.profile_json)
+        print(f"Profile saved to: {args.profile_json}")
+    if args.trace:
+        PROFILER.export_trace(args.trace)
+        print(f"Trace saved to: {args.trace}")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+审计报告流式输出
+1. 审计运行过程中以 JSON Lines 逐条写出结果（每个文件/语言/问题一条记录），内存占用不随问题数量增长
+2. 提供兼容转换器，将 JSONL 流转换回现有的嵌套 JSON 报告格式（与 json.dump(..., indent=2) 输出一致）
+
+记录格式：每行一个 JSON 对象，以 'record' 字段区分类型
+- header:             {'record': 'header', 'audit': 'translations' | 'seo' | '404', 'version': 1}
+- pair:               翻译审计中一个 (文件, 语言) 组合的状态（file_exists / json_error / error）
+- missing_key / placeholder_issue / html_tag_issue / structure_issue: 翻译审计的单个问题
+- issue:              SEO / 404 审计的单个问题（其余字段与原报告中的问题对象一致）
+
+用法：
+    python audit_report.py translation_audit_report.jsonl translation_audit_report.json
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+REPORT_FORMAT_VERSION = 1
+
+# 翻译审计中问题记录类型与结果字段的对应关系
+TRANSLATION_ISSUE_FIELDS = {
+    'placeholder_issue': 'placeholder_issues',
+    'html_tag_issue': 'html_tag_issues',
+    'structure_issue': 'structure_issues',
+}
+
+# pair 记录中原样保留的结果字段
+PAIR_STATUS_FIELDS = ('file_exists', 'json_error', 'error')
+
+
+class JsonlReportWriter:
+    """逐条写出审计记录的 JSON Lines 写入器"""
+
+    def __init__(self, path: Path, audit: str):
+        self.path = Path(path)
+        self.records = 0
+        self._file: Optional[TextIO] = open(self.path, 'w', encoding='utf-8')
+        self.write({'record': 'header', 'audit': audit, 'version': REPORT_FORMAT_VERSION})
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write('\n')
+        self.records += 1
+
+    def write_translation_pair(self, filename: str, lang: str, results: Dict[str, Any]) -> None:
+        """写出一个 (文件, 语言) 组合的全部结果"""
+        for record in translation_records(filename, lang, results):
+            self.write(record)
+
+    def write_issues(self, issues: Iterable[Dict[str, Any]]) -> None:
+        """写出 SEO / 404 审计的问题列表"""
+        for issue in issues:
+            self.write({'record': 'issue', **issue})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'JsonlReportWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def translation_records(filename: str, lang: str, results: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """将 check_file 的结果拆分为 JSONL 记录"""
+    pair = {'record': 'pair', 'file': filename, 'locale': lang}
+    for field in PAIR_STATUS_FIELDS:
+        if field in results:
+            pair[field] = results[field]
+    yield pair
+
+    for key in results.get('missing_keys', []):
+        yield {'record': 'missing_key', 'file': filename, 'locale': lang, 'key': key}
+    for record_type, field in TRANSLATION_ISSUE_FIELDS.items():
+        for issue in results.get(field, []):
+            yield {'record': record_type, 'file': filename, 'locale': lang, **issue}
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """逐行读取 JSONL 记录"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_header(path: Path) -> Dict[str, Any]:
+    """读取 JSONL 报告的 header 记录"""
+    for record in iter_records(path):
+        if record.get('record') == 'header':
+            return record
+        break
+    raise ValueError(f'{path} 不是审计报告 JSONL 文件（缺少 header 记录）')
+
+
+def _empty_translation_results() -> Dict[str, Any]:
+    return {
+        'missing_keys': [],
+        'placeholder_issues': [],
+        'html_tag_issues': [],
+        'structure_issues': [],
+    }
+
+
+def iter_translation_pairs(records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    将翻译审计记录重新组合为 (文件, 语言, 结果)。
+    一次只保留一个组合的结果，适合对大报告做流式处理。
+    """
+    current: Optional[Tuple[str, str]] = None
+    results: Dict[str, Any] = {}
+
+    for record in records:
+        record_type = record.get('record')
+        if record_type == 'pair':
+            if current is not None:
+                yield current[0], current[1], results
+            current = (record['file'], record['locale'])
+            results = _empty_translation_results()
+            for field in PAIR_STATUS_FIELDS:
+                if field in record:
+                    results[field] = record[field]
+        elif record_type == 'missing_key':
+            results['missing_keys'].append(record['key'])
+        elif record_type in TRANSLATION_ISSUE_FIELDS:
+            issue = {k: v for k, v in record.items() if k not in ('record', 'file', 'locale')}
+            results[TRANSLATION_ISSUE_FIELDS[record_type]].append(issue)
+
+    if current is not None:
+        yield current[0], current[1], results
+
+
+def iter_issues(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """从 SEO / 404 审计记录中取出问题对象"""
+    for record in records:
+        if record.get('record') == 'issue':
+            yield {k: v for k, v in record.items() if k != 'record'}
+
+
+def _dump(value: Any, indent_level: int) -> str:
+    """与 json.dump(indent=2) 一致地序列化嵌套在第 indent_level 层的值"""
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return text.replace('\n', '\n' + '  ' * indent_level)
+
+
+def write_translation_json(pairs: Iterable[Tuple[str, str, Dict[str, Any]]], out: TextIO) -> None:
+    """将 (文件, 语言, 结果) 流式写成 {文件: {语言: 结果}} 的嵌套 JSON"""
+    current_file = None
+    first_file = True
+    first_lang = True
+
+    for filename, lang, results in pairs:
+        if filename != current_file:
+            if current_file is not None:
+                out.write('\n  }')
+            out.write('{\n  ' if first_file else ',\n  ')
+            out.write(json.dumps(filename, ensure_ascii=False) + ': {')
+            current_file = filename
+            first_file = False
+            first_lang = True
+        out.write('\n    ' if first_lang else ',\n    ')
+        out.write(json.dumps(lang, ensure_ascii=False) + ': ' + _dump(results, 2))
+        first_lang = False
+
+    out.write('{}' if first_file else '\n  }\n}')
+
+
+def write_issue_json(issues: Iterable[Dict[str, Any]], out: TextIO) -> None:
+    """将问题对象流式写成 JSON 数组"""
+    first = True
+    for issue in issues:
+        out.write('[\n  ' if first else ',\n  ')
+        out.write(_dump(issue, 1))
+        first = False
+    out.write('[]' if first else '\n]')
+
+
+def convert_jsonl_to_json(jsonl_path: Path, json_path: Path) -> None:
+    """
+    兼容转换：JSONL 流 -> 现有嵌套 JSON 报告。
+    转换出的报告沿用 JSONL 流的修改时间，读取方据此判断两者中哪一个更新（见 generate_summary_report）。
+    """
+    audit = read_header(jsonl_path).get('audit')
+    with open(json_path, 'w', encoding='utf-8') as out:
+        if audit == 'translations':
+            write_translation_json(iter_translation_pairs(iter_records(jsonl_path)), out)
+        else:
+            write_issue_json(iter_issues(iter_records(jsonl_path)), out)
+    stat = os.stat(jsonl_path)
+    os.utime(json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("用法: python audit_report.py <report.jsonl> <report.json>")
+        sys.exit(2)
+    convert_jsonl_to_json(Path(sys.argv[1]), Path(sys.argv[2]))
+    print(f"已转换: {sys.argv[1]} -> {sys.argv[2]}")
+
+
+if __name__ == '__main__':
+    main()
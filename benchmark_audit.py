@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+审计性能基准测试
+按可配置的规模生成合成的 messages/<lang>/*.json 语料（结构仿照真实的 faq.json 与 articles/en.json），
+在临时目录中运行以下基准，记录吞吐量与峰值内存（tracemalloc）：
+- check_file:      check_translations.check_file（所有 文件 × 语言 组合）
+- check_metadata:  seo_metadata_audit.iter_metadata
+- sitemap:         generate_sitemap.main 的生成阶段（路由预先发现，不计入耗时；不输出图片）
+- sitemap_discovery: generate_sitemap.discover_routes（不使用缓存，解析各语言的 faq.json 与文章文件）
+- article_walk:    scripts/generate-article-translations.py 的 walk（使用不联网的恒等翻译器）
+
+每个基准重复运行多次，记录耗时的最小值与中位数；峰值内存单独运行一次测量，避免 tracemalloc 影响计时。
+结果可保存为本机基线（.cache/benchmark_baseline.json，按语料规模分别保存，不提交到仓库），
+之后的运行与基线比较：最小耗时与中位耗时都超出相对容差、且增量超过绝对下限（MIN_REGRESSION_SECONDS），
+或峰值内存超出容差且增量超过 MIN_REGRESSION_BYTES 时视为回归并以非零状态退出，
+避免毫秒级的基准因计时抖动误报。基线记录的 Python 版本或机器架构与当前不同时只比较、不判定回归。
+
+用法：
+    python benchmark_audit.py                                  # 默认规模（medium），与基线比较
+    python benchmark_audit.py --scale large                    # 预设规模
+    python benchmark_audit.py --locales 40 --articles 200 --depth 4
+    python benchmark_audit.py --only check_file --repeat 5
+    python benchmark_audit.py --save-baseline                  # 保存当前结果为本机基线
+    python benchmark_audit.py --baseline other.json            # 使用指定的基线文件
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+import check_translations
+import generate_sitemap
+import seo_metadata_audit
+from message_corpus import reset_corpus
+
+# 设置输出编码为 UTF-8
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+REPO_ROOT = Path(__file__).resolve().parent
+BASELINE_FILE = REPO_ROOT / '.cache' / 'benchmark_baseline.json'
+ARTICLE_SCRIPT = REPO_ROOT / 'scripts' / 'generate-article-translations.py'
+
+BASELINE_VERSION = 2
+
+# 默认回归容差（相对基线的增幅）
+DEFAULT_TOLERANCE = 0.25
+
+# 回归的绝对下限：增量低于该值时视为计时/分配抖动
+MIN_REGRESSION_SECONDS = 0.005
+MIN_REGRESSION_BYTES = 256 * 1024
+
+
+class CorpusSpec(NamedTuple):
+    """合成语料规模"""
+    locales: int          # 语言数（含 en）
+    keys: int             # 每个页面文件的普通文本条目数
+    articles: int         # faq.json 与 articles/<lang>.json 中的文章数
+    depth: int            # 文章章节的嵌套深度
+    string_length: int    # 每个字符串的单词数
+    html_density: float   # 含 HTML 标签的字符串比例
+    seed: int = 0
+
+    def key(self) -> str:
+        """基线文件中使用的规模标识"""
+        return ','.join(f'{name}={value}' for name, value in self._asdict().items())
+
+
+SCALES = {
+    'small': CorpusSpec(locales=6, keys=20, articles=8, depth=2, string_length=20, html_density=0.3),
+    'medium': CorpusSpec(locales=18, keys=60, articles=30, depth=3, string_length=40, html_density=0.3),
+    'large': CorpusSpec(locales=40, keys=200, articles=120, depth=4, string_length=60, html_density=0.3),
+}
+
+# 每篇文章顶层章节数；每层嵌套再分出 2 个子章节
+CHAPTERS_PER_ARTICLE = 4
+SUBSECTIONS_PER_LEVEL = 2
+
+# 翻译中故意引入缺失键 / 标签丢失的比例，让检查覆盖问题分支
+DEFECT_RATE = 0.02
+
+VOCABULARY = [
+    'semen', 'analysis', 'sperm', 'motility', 'morphology', 'concentration', 'laboratory',
+    'standard', 'quality', 'control', 'sample', 'volume', 'vitality', 'fragmentation',
+    'microscope', 'automated', 'assessment', 'clinical', 'veterinary', 'breeding',
+    'fertility', 'evaluation', 'protocol', 'reference', 'value', 'count', 'progressive',
+    'velocity', 'chamber', 'temperature', 'staining', 'result', 'report', 'guideline',
+    'validation', 'accuracy', 'precision', 'andrology', 'specimen', 'collection',
+]
+PLACEHOLDERS = ['{count}', '{name}', '{year}', '{value}']
+HTML_WRAPPERS = [('<strong>', '</strong>'), ('<em>', '</em>'), ('<a href="/faq">', '</a>')]
+
+# 文章中保持原样、不翻译的键（与 generate-article-translations.py 一致）
+UNTRANSLATED_KEYS = {'image', 'link', 'type'}
+
+
+# ---------------------------------------------------------------------------
+# 合成语料
+# ---------------------------------------------------------------------------
+
+def locale_codes(count: int) -> List[str]:
+    """en 在前，先用真实语言代码，不够时补充合成代码"""
+    codes = ['en'] + list(check_translations.LANGUAGES)
+    codes += [f'x{i:02d}' for i in range(count - len(codes))]
+    return codes[:max(count, 1)]
+
+
+def _text(rng: random.Random, spec: CorpusSpec) -> str:
+    words = [rng.choice(VOCABULARY) for _ in range(spec.string_length)]
+    if rng.random() < 0.1:
+        words[rng.randrange(len(words))] = rng.choice(PLACEHOLDERS)
+    if rng.random() < spec.html_density:
+        start = rng.randrange(len(words))
+        end = min(len(words), start + rng.randint(1, 4))
+        opening, closing = rng.choice(HTML_WRAPPERS)
+        words[start] = opening + words[start]
+        words[end - 1] = words[end - 1] + closing
+        if rng.random() < 0.3:
+            words[rng.randrange(len(words))] += '<br/>'
+    return ' '.join(words).capitalize() + '.'
+
+
+def _chapter(rng: random.Random, spec: CorpusSpec, level: int) -> Dict[str, Any]:
+    chapter = {
+        'title': _text(rng, spec._replace(string_length=max(3, spec.string_length // 8))),
+        'content': _text(rng, spec),
+        'lists': [{
+            'type': 'ul',
+            'items': [{'label': rng.choice(VOCABULARY).capitalize() + ':', 'text': _text(rng, spec)}
+                      for _ in range(3)],
+        }],
+    }
+    if level < spec.depth:
+        chapter['subsections'] = [_chapter(rng, spec, level + 1) for _ in range(SUBSECTIONS_PER_LEVEL)]
+    return chapter
+
+
+def _article(rng: random.Random, spec: CorpusSpec, slug: str) -> Dict[str, Any]:
+    return {
+        'title': _text(rng, spec._replace(string_length=8)),
+        'subtitle': _text(rng, spec._replace(string_length=12)),
+        'metaDescription': _text(rng, spec._replace(string_length=25, html_density=0)),
+        'author': 'isperm.com Medical & Editorial Team',
+        'published': 'May 2026',
+        'image': f'/Knowledge Hub/{slug}/cover.webp',
+        'alt': _text(rng, spec._replace(string_length=12, html_density=0)),
+        'link': f'/faq/{slug}',
+        'intro': '<p><strong>Author:</strong> isperm.com Medical &amp; Editorial Team<br/>'
+                 '<strong>Published:</strong> May 2026</p><p>' + _text(rng, spec) + '</p>',
+        'chapters': [_chapter(rng, spec, 1) for _ in range(CHAPTERS_PER_ARTICLE)],
+    }
+
+
+def _meta(rng: random.Random, spec: CorpusSpec) -> Dict[str, str]:
+    return {
+        'title': _text(rng, spec._replace(string_length=8, html_density=0)),
+        'description': _text(rng, spec._replace(string_length=25, html_density=0)),
+    }
+
+
+def _page(rng: random.Random, spec: CorpusSpec, name: str) -> Dict[str, Any]:
+    page = {
+        'meta': _meta(rng, spec),
+        'nav': {item: item.capitalize() for item in ('home', 'about', 'products', 'faq', 'contact')},
+        'content': {f'item{i}': {'title': _text(rng, spec._replace(string_length=5)), 'text': _text(rng, spec)}
+                    for i in range(spec.keys)},
+    }
+    if name == 'products':
+        page['products'] = {f'{product}Meta': _meta(rng, spec) for product in ('nexus', 'msqa', 'sqavet')}
+    return page
+
+
+def article_slugs(spec: CorpusSpec) -> List[str]:
+    return [f'faq-synthetic-article-{i:04d}' for i in range(spec.articles)]
+
+
+def _translate(text: str, locale: str) -> str:
+    """确定性的“翻译”：保留占位符与标签，只改写普通文本片段"""
+    parts = re.split(r'(<[^>]+>|\{[^}]+\})', text)
+    return ''.join(part if i % 2 else part[::-1] for i, part in enumerate(parts)) + f' [{locale}]'
+
+
+def _localize(node: Any, locale: str, rng: random.Random) -> Any:
+    if isinstance(node, dict):
+        result = {}
+        for key, value in node.items():
+            if rng.random() < DEFECT_RATE and not isinstance(value, (dict, list)):
+                continue  # 缺失键
+            result[key] = value if key in UNTRANSLATED_KEYS else _localize(value, locale, rng)
+        return result
+    if isinstance(node, list):
+        return [_localize(item, locale, rng) for item in node]
+    if isinstance(node, str):
+        text = _translate(node, locale)
+        if '</strong>' in text and rng.random() < DEFECT_RATE:
+            text = text.replace('</strong>', '', 1)  # 标签丢失
+        return text
+    return node
+
+
+def _write_json(path: Path, data: Any) -> int:
+    """与真实语言文件一致：UTF-8 BOM + 2 空格缩进；返回写入的字节数"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(data, ensure_ascii=False, indent=2) + '\n'
+    path.write_text(text, encoding='utf-8-sig')
+    return path.stat().st_size
+
+
+def generate_corpus(root: Path, spec: CorpusSpec) -> int:
+    """在 root 下生成 messages/<lang>/*.json 与 messages/articles/<lang>.json，返回总字节数"""
+    rng = random.Random(spec.seed)
+    slugs = article_slugs(spec)
+
+    english = {name.rsplit('.', 1)[0]: _page(rng, spec, name.rsplit('.', 1)[0])
+               for name in check_translations.FILES}
+    english['faq']['articles'] = {slug: _article(rng, spec, slug) for slug in slugs}
+    articles = {'sections': {'article': {'title': 'Article'}},
+                'articles': {slug: _article(rng, spec, slug) for slug in slugs}}
+
+    total = 0
+    for locale in locale_codes(spec.locales):
+        locale_rng = random.Random(f'{spec.seed}:{locale}')
+        for name, data in english.items():
+            localized = data if locale == 'en' else _localize(data, locale, locale_rng)
+            total += _write_json(root / 'messages' / locale / f'{name}.json', localized)
+        localized = articles if locale == 'en' else _localize(articles, locale, locale_rng)
+        total += _write_json(root / 'messages' / 'articles' / f'{locale}.json', localized)
+    return total
+
+
+# ---------------------------------------------------------------------------
+# 基准
+# ---------------------------------------------------------------------------
+
+class Benchmark(NamedTuple):
+    """单个基准；run 在语料目录中执行并返回处理的单位数"""
+    name: str
+    unit: str
+    run: Callable[..., int]
+    # 不计入耗时的准备步骤；提供时其返回值作为 run 的第二个参数
+    setup: Optional[Callable[[CorpusSpec], Any]] = None
+
+
+@contextlib.contextmanager
+def patched(module: Any, **attrs: Any) -> Iterator[None]:
+    """临时替换模块级常量（语言列表等），使被测函数覆盖合成语料的规模"""
+    original = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            setattr(module, name, value)
+
+
+def bench_check_file(spec: CorpusSpec) -> int:
+    base_dir = Path('messages')
+    pairs = 0
+    for filename in check_translations.FILES:
+        for lang in locale_codes(spec.locales)[1:]:
+            check_translations.check_file(base_dir / 'en' / filename, base_dir / lang / filename, lang)
+            pairs += 1
+    return pairs
+
+
+def bench_check_metadata(spec: CorpusSpec) -> int:
+    locales = locale_codes(spec.locales)
+    with patched(seo_metadata_audit, LANGUAGES=locales):
+        # iter_metadata 逐个产出问题，需要消费完才会执行全部检查
+        for _ in seo_metadata_audit.iter_metadata():
+            pass
+    return len(seo_metadata_audit.PAGES) * len(locales)
+
+
+def _sitemap_patches(spec: CorpusSpec) -> contextlib.AbstractContextManager:
+    # 文章从合成语料中读取；静态页面沿用仓库中的路由树，不使用路由发现/图片索引缓存与 lastmod 清单
+    return patched(generate_sitemap, LANGUAGES=locale_codes(spec.locales), ROUTES_DIR=REPO_ROOT / 'app' / '[locale]',
+                   ROUTE_CACHE_FILE=None, IMAGE_CACHE_FILE=None, LASTMOD_MANIFEST=None)
+
+
+def discover_sitemap_routes(spec: CorpusSpec) -> List[Any]:
+    with _sitemap_patches(spec):
+        return generate_sitemap.discover_routes()
+
+
+def bench_sitemap_discovery(spec: CorpusSpec) -> int:
+    return sum(len(route.locales) for route in discover_sitemap_routes(spec))
+
+
+def bench_sitemap(spec: CorpusSpec, routes: List[Any]) -> int:
+    # 只计生成与写出：路由由 setup 预先发现，图片阶段关闭
+    with _sitemap_patches(spec), patched(generate_sitemap, discover_routes=lambda: routes), \
+            contextlib.redirect_stdout(io.StringIO()):
+        generate_sitemap.main(['--no-images', '--output-dir', 'out'])
+    with open(Path('out') / 'sitemap.xml', 'r', encoding='utf-8') as f:
+        return sum(line.count('<url>') for line in f)
+
+
+class IdentityTranslator:
+    """不联网的翻译器：原样返回并统计调用次数"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def translate(self, text: str) -> str:
+        self.calls += 1
+        return text
+
+
+def load_article_script() -> Any:
+    """按路径加载 scripts/generate-article-translations.py（文件名含连字符，无法直接 import）"""
+    spec = importlib.util.spec_from_file_location('generate_article_translations', ARTICLE_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_article_walk(spec: CorpusSpec) -> int:
+    module = load_article_script()
+    with open(Path('messages') / 'articles' / 'en.json', 'r', encoding='utf-8-sig') as f:
+        english = json.load(f)
+    translator = IdentityTranslator()
+    # walk 只认识脚本中配置了作者署名的语言
+    locales = [locale for locale in locale_codes(spec.locales) if locale in module.LOCALES]
+    # 恒等翻译器不联网，跳过脚本在每次翻译请求之间的限流等待
+    with patched(module, time=SimpleNamespace(sleep=lambda seconds: None)):
+        for locale in locales:
+            module.walk(english['articles'], translator, locale, 'articles')
+    return translator.calls
+
+
+BENCHMARKS = [
+    Benchmark('check_file', 'pairs', bench_check_file),
+    Benchmark('check_metadata', 'pages', bench_check_metadata),
+    Benchmark('sitemap', 'urls', bench_sitemap, setup=discover_sitemap_routes),
+    Benchmark('sitemap_discovery', 'urls', bench_sitemap_discovery),
+    Benchmark('article_walk', 'strings', bench_article_walk),
+]
+
+
+def _cold_start() -> None:
+    """每次运行前丢弃进程内缓存，保证各次运行都从解析文件开始"""
+    reset_corpus(None)
+    check_translations.tokenize_source_string.cache_clear()
+
+
+def measure(benchmark: Benchmark, spec: CorpusSpec, repeat: int) -> Dict[str, Any]:
+    """返回 {units, seconds（最小值）, median_seconds, throughput, peak_bytes}"""
+    args = (benchmark.setup(spec),) if benchmark.setup else ()
+    timings = []
+    units = 0
+    for _ in range(max(repeat, 1)):
+        _cold_start()
+        start = time.perf_counter()
+        units = benchmark.run(spec, *args)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    _cold_start()
+    tracemalloc.start()
+    try:
+        benchmark.run(spec, *args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'units': units,
+        'seconds': best,
+        'median_seconds': statistics.median(timings),
+        'throughput': units / best if best else 0.0,
+        'peak_bytes': peak,
+    }
+
+
+# ---------------------------------------------------------------------------
+# 基线
+# ---------------------------------------------------------------------------
+
+def load_baselines(path: Path = BASELINE_FILE) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if data.get('version') != BASELINE_VERSION:
+        return {}
+    return data.get('baselines', {})
+
+
+def save_baseline(spec: CorpusSpec, results: Dict[str, Dict[str, Any]], path: Path = BASELINE_FILE) -> None:
+    baselines = load_baselines(path)
+    previous = baselines.get(spec.key(), {}).get('results', {})
+    baselines[spec.key()] = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        # 只运行了部分基准时保留其余基准的旧基线
+        'results': {**previous, **results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': BASELINE_VERSION, 'baselines': baselines}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _exceeds(value: float, baseline: Optional[float], tolerance: float, minimum: float) -> bool:
+    """增幅超过相对容差且增量超过绝对下限"""
+    return bool(baseline) and value > baseline * (1 + tolerance) and value - baseline > minimum
+
+
+def compare(result: Dict[str, Any], baseline: Optional[Dict[str, Any]], tolerance: float) -> List[str]:
+    """返回回归说明（耗时或峰值内存超出容差与绝对下限）"""
+    if not baseline:
+        return []
+    regressions = []
+    # 最小值与中位数都变慢才算耗时回归，单次抖动只会影响其中之一
+    if all(_exceeds(result[field], baseline.get(field), tolerance, MIN_REGRESSION_SECONDS)
+           for field in ('seconds', 'median_seconds')):
+        regressions.append(f"耗时 +{(result['seconds'] / baseline['seconds'] - 1) * 100:.0f}%")
+    if _exceeds(result['peak_bytes'], baseline.get('peak_bytes'), tolerance, MIN_REGRESSION_BYTES):
+        regressions.append(f"峰值内存 +{(result['peak_bytes'] / baseline['peak_bytes'] - 1) * 100:.0f}%")
+    return regressions
+
+
+def _change(value: float, baseline: Optional[float]) -> str:
+    if not baseline:
+        return '-'
+    return f'{(value / baseline - 1) * 100:+.0f}%'
+
+
+def print_results(results: Dict[str, Dict[str, Any]], units: Dict[str, str],
+                  baseline: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'Benchmark':<20}{'Units':>10}{'Min (ms)':>11}{'Median (ms)':>13}{'Throughput':>20}{'Peak (KiB)':>13}"
+          f"{'ΔTime':>9}{'ΔPeak':>9}")
+    print("-" * 105)
+    for name, result in results.items():
+        previous = baseline.get(name, {})
+        throughput = f"{result['throughput']:.0f} {units[name]}/s"
+        print(f"{name:<20}{result['units']:>10}{result['seconds'] * 1000:>11.1f}"
+              f"{result['median_seconds'] * 1000:>13.1f}{throughput:>20}"
+              f"{result['peak_bytes'] / 1024:>13.0f}"
+              f"{_change(result['seconds'], previous.get('seconds')):>9}"
+              f"{_change(result['peak_bytes'], previous.get('peak_bytes')):>9}")
+    print("-" * 105)
+
+
+def build_spec(args: argparse.Namespace) -> CorpusSpec:
+    """预设规模 + 命令行覆盖"""
+    spec = SCALES[args.scale]
+    overrides = {name: getattr(args, name) for name in CorpusSpec._fields if getattr(args, name) is not None}
+    return spec._replace(**overrides)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='审计脚本性能基准测试（合成语料）')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='medium', help='预设语料规模（默认: medium）')
+    parser.add_argument('--locales', type=int, help='语言数（含 en）')
+    parser.add_argument('--keys', type=int, help='每个页面文件的文本条目数')
+    parser.add_argument('--articles', type=int, help='文章数')
+    parser.add_argument('--depth', type=int, help='文章章节嵌套深度')
+    parser.add_argument('--string-length', type=int, help='每个字符串的单词数')
+    parser.add_argument('--html-density', type=float, help='含 HTML 标签的字符串比例（0-1）')
+    parser.add_argument('--seed', type=int, help='随机种子')
+    parser.add_argument('--repeat', type=int, default=5, help='计时重复次数，记录最小值与中位数（默认: 5）')
+    parser.add_argument('--only', action='append', help='只运行指定的基准（可重复）')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'回归容差（默认: {DEFAULT_TOLERANCE}，即增幅超过 25%% 视为回归）')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE,
+                        help='基线文件（默认: .cache/benchmark_baseline.json，与机器相关，不提交到仓库）')
+    parser.add_argument('--save-baseline', action='store_true', help='将本次结果保存为该规模的基线')
+    parser.add_argument('--keep', action='store_true', help='保留生成的合成语料目录')
+    args = parser.parse_args()
+
+    spec = build_spec(args)
+    benchmarks = [b for b in BENCHMARKS if not args.only or b.name in args.only]
+    if not benchmarks:
+        print(f"没有匹配的基准，可选: {', '.join(b.name for b in BENCHMARKS)}")
+        sys.exit(2)
+
+    print(f"语料规模: {spec.key()}")
+    workdir = tempfile.mkdtemp(prefix='audit-bench-')
+    cwd = os.getcwd()
+    results = {}
+    try:
+        corpus_bytes = generate_corpus(Path(workdir), spec)
+        print(f"已生成合成语料: {corpus_bytes / 1024 / 1024:.1f} MiB\n")
+        os.chdir(workdir)
+        for benchmark in benchmarks:
+            results[benchmark.name] = measure(benchmark, spec, args.repeat)
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"合成语料保留在: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    recorded = load_baselines(args.baseline).get(spec.key(), {})
+    baseline = recorded.get('results', {})
+    print_results(results, {b.name: b.unit for b in benchmarks}, baseline)
+
+    if args.save_baseline:
+        save_baseline(spec, results, args.baseline)
+        print(f"\n基线已保存到: {args.baseline}")
+        return
+
+    if not baseline:
+        print("\n该规模尚无基线（使用 --save-baseline 保存）")
+        return
+
+    host = (platform.python_version(), platform.machine())
+    if (recorded.get('python'), recorded.get('machine')) != host:
+        print(f"\n基线来自 Python {recorded.get('python')} / {recorded.get('machine')}，"
+              f"与当前环境（Python {host[0]} / {host[1]}）不同，只供参考，不判定回归")
+        return
+
+    regressions = {name: compare(result, baseline.get(name), args.tolerance) for name, result in results.items()}
+    regressions = {name: found for name, found in regressions.items() if found}
+    if regressions:
+        print("\n[REGRESSION] 超出基线容差:")
+        for name, found in regressions.items():
+            print(f"  - {name}: {', '.join(found)}")
+        sys.exit(1)
+    print("\n[OK] 未发现性能回归")
+
+
+if __name__ == '__main__':
+    main()
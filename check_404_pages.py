@@ -8,9 +8,15 @@
 3. 翻译文件中是否有 404 相关文本
 """
 
+import argparse
 import json
 import sys
 from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from audit_profile import add_profile_arguments, configure, finish, section
+from audit_report import JsonlReportWriter, convert_jsonl_to_json, iter_issues, iter_records
+from message_corpus import load_messages, load_text
 
 # 设置输出编码为 UTF-8
 if sys.platform == 'win32':
@@ -20,60 +26,58 @@ if sys.platform == 'win32':
 
 LANGUAGES = ['en', 'es', 'ar', 'de', 'it', 'pt', 'ru', 'tr', 'fr', 'pl', 'nl', 'ko', 'ja', 'vi', 'id', 'uk', 'bg', 'ro']
 
-def check_not_found_files():
-    """检查是否存在 not-found.tsx 文件"""
-    issues = []
+REPORT_FILE = Path('404_audit_report.json')
+REPORT_STREAM_FILE = Path('404_audit_report.jsonl')
+
+def iter_not_found_files() -> Iterator[Dict[str, Any]]:
+    """检查是否存在 not-found.tsx 文件，逐个产出问题"""
     
     # 检查根目录的 not-found.tsx
     root_not_found = Path('app/not-found.tsx')
     locale_not_found = Path('app/[locale]/not-found.tsx')
     
     if not root_not_found.exists() and not locale_not_found.exists():
-        issues.append({
+        yield {
             'type': 'missing_file',
             'severity': 'error',
             'issue': '未找到 not-found.tsx 文件',
             'location': 'app/ 或 app/[locale]/',
             'description': 'Next.js App Router 需要 not-found.tsx 文件来处理 404 错误'
-        })
+        }
     elif root_not_found.exists() and not locale_not_found.exists():
-        issues.append({
+        yield {
             'type': 'wrong_location',
             'severity': 'warning',
             'issue': 'not-found.tsx 在根目录，但应该在 [locale] 目录下以支持多语言',
             'location': 'app/not-found.tsx',
             'description': '建议移动到 app/[locale]/not-found.tsx 以支持多语言 404 页面'
-        })
+        }
     elif locale_not_found.exists():
         # 检查文件内容
-        with open(locale_not_found, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = load_text(locale_not_found)
         
         # 检查是否使用了翻译
         if 'useTranslations' not in content and 'getTranslations' not in content:
-            issues.append({
+            yield {
                 'type': 'no_translation',
                 'severity': 'error',
                 'issue': 'not-found.tsx 未使用翻译函数',
                 'location': 'app/[locale]/not-found.tsx',
                 'description': '404 页面应该使用 next-intl 的翻译函数来显示多语言内容'
-            })
+            }
         
         # 检查是否使用了 next-intl
         if 'next-intl' not in content:
-            issues.append({
+            yield {
                 'type': 'no_next_intl',
                 'severity': 'error',
                 'issue': 'not-found.tsx 未导入 next-intl',
                 'location': 'app/[locale]/not-found.tsx',
                 'description': '404 页面需要导入 next-intl 以支持多语言'
-            })
-    
-    return issues
+            }
 
-def check_404_translations():
-    """检查翻译文件中是否有 404 相关文本"""
-    issues = []
+def iter_404_translations() -> Iterator[Dict[str, Any]]:
+    """检查翻译文件中是否有 404 相关文本，逐个产出问题"""
     
     # 检查英文版本
     en_files = ['index.json', 'faq.json']
@@ -82,8 +86,7 @@ def check_404_translations():
     for filename in en_files:
         file_path = Path(f'messages/en/{filename}')
         if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_messages(file_path)
             
             # 检查是否有 404 相关的键
             if 'notFound' in data or '404' in str(data).lower() or 'pageNotFound' in str(data).lower():
@@ -91,13 +94,13 @@ def check_404_translations():
                 break
     
     if not has_404_keys:
-        issues.append({
+        yield {
             'type': 'missing_translation',
             'severity': 'error',
             'issue': '翻译文件中缺少 404 页面相关文本',
             'location': 'messages/en/',
             'description': '需要在翻译文件中添加 404 页面的标题、描述等文本'
-        })
+        }
     
     # 检查其他语言
     for lang in LANGUAGES:
@@ -107,103 +110,122 @@ def check_404_translations():
         for filename in en_files:
             file_path = Path(f'messages/{lang}/{filename}')
             if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = load_messages(file_path)
                 
                 # 如果英文有 404 键，检查其他语言是否也有
                 if has_404_keys and ('notFound' not in data and '404' not in str(data).lower() and 'pageNotFound' not in str(data).lower()):
-                    issues.append({
+                    yield {
                         'type': 'missing_translation',
                         'severity': 'warning',
                         'issue': f'{lang} 语言缺少 404 页面翻译',
                         'location': f'messages/{lang}/{filename}',
                         'description': f'需要为 {lang} 语言添加 404 页面翻译'
-                    })
-    
-    return issues
+                    }
 
-def check_not_found_calls():
-    """检查代码中 notFound() 的调用情况"""
-    issues = []
+def iter_not_found_calls() -> Iterator[Dict[str, Any]]:
+    """检查代码中 notFound() 的调用情况，逐个产出问题"""
     
     # 检查 FAQ 文章页面
     faq_slug_page = Path('app/[locale]/faq/[slug]/page.tsx')
     if faq_slug_page.exists():
-        with open(faq_slug_page, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = load_text(faq_slug_page)
         
         if 'notFound()' in content:
             # 检查是否有对应的 not-found.tsx
             if not Path('app/[locale]/not-found.tsx').exists():
-                issues.append({
+                yield {
                     'type': 'missing_handler',
                     'severity': 'error',
                     'issue': '代码中调用了 notFound() 但缺少 not-found.tsx 文件',
                     'location': 'app/[locale]/faq/[slug]/page.tsx',
                     'description': '当访问无效 slug 时会调用 notFound()，但缺少对应的 404 页面组件'
-                })
-    
-    return issues
+                }
+
+def check_not_found_files() -> List[Dict[str, Any]]:
+    """检查是否存在 not-found.tsx 文件"""
+    return list(iter_not_found_files())
+
+def check_404_translations() -> List[Dict[str, Any]]:
+    """检查翻译文件中是否有 404 相关文本"""
+    return list(iter_404_translations())
+
+def check_not_found_calls() -> List[Dict[str, Any]]:
+    """检查代码中 notFound() 的调用情况"""
+    return list(iter_not_found_calls())
 
 def main():
+    parser = argparse.ArgumentParser(description='404 页面多语言支持审计')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+    
     print("=" * 80)
     print("404 页面多语言支持审计")
     print("=" * 80)
     print()
     
-    all_issues = []
-    
-    # 1. 检查 not-found.tsx 文件
-    print("1. 检查 not-found.tsx 文件...")
-    file_issues = check_not_found_files()
-    all_issues.extend(file_issues)
-    print(f"   发现 {len(file_issues)} 个问题")
-    
-    # 2. 检查翻译文件
-    print("\n2. 检查翻译文件中的 404 文本...")
-    translation_issues = check_404_translations()
-    all_issues.extend(translation_issues)
-    print(f"   发现 {len(translation_issues)} 个问题")
+    # 问题边检查边写入 JSONL 流，汇总时只保留计数
+    severity_counts = {'error': 0, 'warning': 0}
+    
+    with JsonlReportWriter(REPORT_STREAM_FILE, '404') as writer:
+        def record(name, issues):
+            """逐条写出检查产出的问题并计数，返回该项检查的问题数"""
+            found = 0
+            with section(name):
+                for issue in issues:
+                    writer.write({'record': 'issue', **issue})
+                    severity_counts[issue['severity']] = severity_counts.get(issue['severity'], 0) + 1
+                    found += 1
+            return found
+        
+        # 1. 检查 not-found.tsx 文件
+        print("1. 检查 not-found.tsx 文件...")
+        print(f"   发现 {record('404.not_found_files', iter_not_found_files())} 个问题")
+        
+        # 2. 检查翻译文件
+        print("\n2. 检查翻译文件中的 404 文本...")
+        print(f"   发现 {record('404.translations', iter_404_translations())} 个问题")
+        
+        # 3. 检查 notFound() 调用
+        print("\n3. 检查 notFound() 调用...")
+        print(f"   发现 {record('404.not_found_calls', iter_not_found_calls())} 个问题")
     
-    # 3. 检查 notFound() 调用
-    print("\n3. 检查 notFound() 调用...")
-    call_issues = check_not_found_calls()
-    all_issues.extend(call_issues)
-    print(f"   发现 {len(call_issues)} 个问题")
+    total_count = sum(severity_counts.values())
     
     # 汇总报告
     print("\n" + "=" * 80)
     print("问题汇总")
     print("=" * 80)
     
-    if not all_issues:
+    if not total_count:
         print("\n[SUCCESS] 未发现 404 页面相关问题！")
     else:
-        error_count = len([i for i in all_issues if i['severity'] == 'error'])
-        warning_count = len([i for i in all_issues if i['severity'] == 'warning'])
-        
-        print(f"\n总计: {len(all_issues)} 个问题")
-        print(f"  - 错误: {error_count}")
-        print(f"  - 警告: {warning_count}")
+        print(f"\n总计: {total_count} 个问题")
+        print(f"  - 错误: {severity_counts['error']}")
+        print(f"  - 警告: {severity_counts['warning']}")
         
+        # 显示详细问题（从 JSONL 流中逐条读回）
         print("\n详细问题列表:")
-        for i, issue in enumerate(all_issues, 1):
+        for i, issue in enumerate(iter_issues(iter_records(REPORT_STREAM_FILE)), 1):
             severity_mark = '[ERROR]' if issue['severity'] == 'error' else '[WARNING]'
             print(f"\n{i}. {severity_mark} [{issue['type'].upper()}]")
             print(f"   问题: {issue['issue']}")
             print(f"   位置: {issue['location']}")
             print(f"   说明: {issue['description']}")
     
-    # 保存详细报告
-    report_file = Path('404_audit_report.json')
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(all_issues, f, ensure_ascii=False, indent=2)
+    # 由 JSONL 流转换出兼容的详细报告
+    report_file = REPORT_FILE
+    with section('report.convert'):
+        convert_jsonl_to_json(REPORT_STREAM_FILE, report_file)
     
     print("\n" + "=" * 80)
     print(f"详细报告已保存到: {report_file}")
     print("=" * 80)
     
-    return all_issues
+    finish(args)
+    
+    # 与原有接口一致，返回全部问题（从 JSONL 流中读回）
+    return list(iter_issues(iter_records(REPORT_STREAM_FILE)))
 
 if __name__ == '__main__':
     main()
@@ -6,14 +6,24 @@ Translation Audit Script
 1. Key 缺失检查
 2. 占位符检查
 3. HTML 标签检查
+4. 结构检查（标签顺序、标签嵌套、实体引用、ICU plural/select 参数）
 """
 
+import argparse
+import functools
+import hashlib
 import json
+import multiprocessing
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Any
+from typing import Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Set, Tuple, Any
+
+from audit_profile import add_profile_arguments, collect, configure, count, finish, init_worker, merge, section, worker_config
+from audit_report import JsonlReportWriter, convert_jsonl_to_json, iter_records, iter_translation_pairs
+from message_corpus import get_corpus, load_flat_messages, load_messages
 
 # 设置输出编码为 UTF-8
 if sys.platform == 'win32':
@@ -33,52 +43,130 @@ PLACEHOLDER_PATTERN = re.compile(r'\{[^}]+\}')
 # HTML 标签模式
 HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
 
-def get_all_keys(obj: Any, prefix: str = '') -> Set[str]:
-    """递归获取所有键的完整路径"""
-    keys = set()
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            full_key = f"{prefix}.{key}" if prefix else key
-            keys.add(full_key)
-            if isinstance(value, (dict, list)):
-                keys.update(get_all_keys(value, full_key))
-    elif isinstance(obj, list):
-        for i, item in enumerate(obj):
-            if isinstance(item, (dict, list)):
-                keys.update(get_all_keys(item, prefix))
-    return keys
-
-def get_nested_value(obj: Any, key_path: str) -> Any:
-    """根据键路径获取嵌套值"""
-    keys = key_path.split('.')
-    current = obj
-    for key in keys:
-        if isinstance(current, dict) and key in current:
-            current = current[key]
-        elif isinstance(current, list):
-            try:
-                idx = int(key)
-                if 0 <= idx < len(current):
-                    current = current[idx]
-                else:
-                    return None
-            except ValueError:
-                return None
+# 合并的单次扫描模式：占位符 | HTML 标签 | 实体引用
+TOKEN_PATTERN = re.compile(
+    r'(?P<placeholder>\{[^}]+\})'
+    r'|(?P<tag><[^>]+>)'
+    r'|(?P<entity>&(?:[A-Za-z][A-Za-z0-9]*|#[0-9]+|#[xX][0-9A-Fa-f]+);)'
+)
+
+# ICU plural/select 参数，例如 {count, plural, one {...} other {...}}
+ICU_ARGUMENT_PATTERN = re.compile(r'\{\s*([A-Za-z_]\w*)\s*,\s*(plural|selectordinal|select)\b')
+
+# 标签名解析：(结束斜杠, 标签名, 自闭合斜杠)
+TAG_NAME_PATTERN = re.compile(r'<\s*(/?)\s*([A-Za-z][\w:-]*)[^>]*?(/?)\s*>$')
+
+# 无需闭合的 HTML 空元素
+VOID_TAGS = frozenset(['br', 'hr', 'img', 'input', 'meta', 'link', 'wbr', 'area', 'col', 'source'])
+
+# 审计报告（JSONL 流与兼容的嵌套 JSON）与增量审计使用的内容哈希清单
+REPORT_FILE = Path('translation_audit_report.json')
+REPORT_STREAM_FILE = Path('translation_audit_report.jsonl')
+HASH_MANIFEST_FILE = Path('translation_audit_hashes.json')
+
+# 检查逻辑版本：check_file 的输出发生变化时递增，使旧的增量结果失效
+AUDIT_VERSION = 3
+
+class StringTokens(NamedTuple):
+    """单个字符串的结构化标记"""
+    placeholders: FrozenSet[str]
+    tags: FrozenSet[str]
+    entities: FrozenSet[str]
+    # ICU 参数 (参数名, plural/select/selectordinal)
+    icu_arguments: FrozenSet[Tuple[str, str]]
+    # 按出现顺序排列的标签序列，如 ('strong', '/strong', 'br/')
+    tag_sequence: Tuple[str, ...]
+    # 成对标签是否正确嵌套
+    well_nested: bool
+
+def _tag_token(tag: str) -> Optional[str]:
+    """将标签文本归一化为序列元素，无法识别时返回 None"""
+    match = TAG_NAME_PATTERN.match(tag)
+    if not match:
+        return None
+    closing, name, self_closing = match.groups()
+    name = name.lower()
+    if closing:
+        return '/' + name
+    if self_closing or name in VOID_TAGS:
+        return name + '/'
+    return name
+
+def _is_well_nested(sequence: Tuple[str, ...]) -> bool:
+    """检查标签序列是否正确嵌套"""
+    stack = []
+    for token in sequence:
+        if token.endswith('/'):
+            continue
+        if token.startswith('/'):
+            if not stack or stack.pop() != token[1:]:
+                return False
         else:
-            return None
-    return current
+            stack.append(token)
+    return not stack
 
-def extract_placeholders(text: str) -> Set[str]:
-    """提取文本中的所有占位符"""
-    if not isinstance(text, str):
-        return set()
-    return set(PLACEHOLDER_PATTERN.findall(text))
+def tokenize_string(text: str) -> StringTokens:
+    """
+    单次扫描提取占位符、HTML 标签、实体引用与 ICU 参数。
+    占位符与标签互相嵌套时（如 <a href="{url}">）单次扫描会吞掉内层标记，
+    此时退回分别扫描，保证结果与 PLACEHOLDER_PATTERN / HTML_TAG_PATTERN 完全一致。
+    """
+    placeholders = set()
+    tags = set()
+    entities = set()
+    icu_arguments = set()
+    sequence = []
+    nested = False
+    regex_evals = 1
+    
+    for match in TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == 'placeholder':
+            placeholders.add(token)
+            if ',' in token:
+                regex_evals += 1
+                icu = ICU_ARGUMENT_PATTERN.match(token)
+                if icu:
+                    icu_arguments.add(icu.groups())
+            if '<' in token:
+                nested = True
+        elif kind == 'tag':
+            tags.add(token)
+            regex_evals += 1
+            normalized = _tag_token(token)
+            if normalized:
+                sequence.append(normalized)
+            if '{' in token:
+                nested = True
+        else:
+            entities.add(token)
+    
+    if nested:
+        placeholders = set(PLACEHOLDER_PATTERN.findall(text))
+        tags = set(HTML_TAG_PATTERN.findall(text))
+        regex_evals += 2
+    count('regex_evals', regex_evals)
+    
+    sequence = tuple(sequence)
+    return StringTokens(
+        frozenset(placeholders),
+        frozenset(tags),
+        frozenset(entities),
+        frozenset(icu_arguments),
+        sequence,
+        _is_well_nested(sequence),
+    )
+
+# 英文字符串的标记缓存容量：按 FILES × LANGUAGES 的顺序审计时，只需容纳单个文件的源字符串，
+# 即可在该文件的所有目标语言之间复用
+SOURCE_TOKEN_CACHE_SIZE = 8192
+
+# 英文字符串的标记在所有目标语言之间复用，只计算一次
+tokenize_source_string = functools.lru_cache(maxsize=SOURCE_TOKEN_CACHE_SIZE)(tokenize_string)
 
-def extract_html_tags(text: str) -> Set[str]:
-    """提取文本中的所有 HTML 标签"""
-    if not isinstance(text, str):
-        return set()
-    return set(HTML_TAG_PATTERN.findall(text))
+def _excerpt(text: str) -> str:
+    return text[:100] + ('...' if len(text) > 100 else '')
 
 def check_file(en_file: Path, lang_file: Path, lang: str) -> Dict[str, Any]:
     """检查单个文件的差异"""
@@ -86,6 +174,7 @@ def check_file(en_file: Path, lang_file: Path, lang: str) -> Dict[str, Any]:
         'missing_keys': [],
         'placeholder_issues': [],
         'html_tag_issues': [],
+        'structure_issues': [],
         'file_exists': lang_file.exists()
     }
     
@@ -93,10 +182,8 @@ def check_file(en_file: Path, lang_file: Path, lang: str) -> Dict[str, Any]:
         return results
     
     try:
-        with open(en_file, 'r', encoding='utf-8') as f:
-            en_data = json.load(f)
-        with open(lang_file, 'r', encoding='utf-8') as f:
-            lang_data = json.load(f)
+        en_flat = load_flat_messages(en_file)
+        lang_flat = load_flat_messages(lang_file)
     except json.JSONDecodeError as e:
         results['json_error'] = str(e)
         return results
@@ -104,80 +191,282 @@ def check_file(en_file: Path, lang_file: Path, lang: str) -> Dict[str, Any]:
         results['error'] = str(e)
         return results
     
-    # 获取所有英文键
-    en_keys = get_all_keys(en_data)
-    lang_keys = get_all_keys(lang_data)
-    
     # 1. 检查缺失的键
-    missing_keys = en_keys - lang_keys
+    missing_keys = en_flat.keys - lang_flat.keys
     if missing_keys:
         results['missing_keys'] = sorted(missing_keys)
     
-    # 2. 检查占位符和 HTML 标签
-    for key_path in en_keys:
-        en_value = get_nested_value(en_data, key_path)
-        lang_value = get_nested_value(lang_data, key_path)
-        
-        if en_value is None or lang_value is None:
+    # 2. 检查占位符、HTML 标签与结构（按扁平化索引直接连接两边的值）
+    lang_leaves = lang_flat.leaves
+    for key_path, en_value in en_flat.leaves.items():
+        # 只检查字符串值
+        if not isinstance(en_value, str):
+            continue
+        lang_value = lang_leaves.get(key_path)
+        if not isinstance(lang_value, str):
             continue
         
-        # 只检查字符串值
-        if isinstance(en_value, str) and isinstance(lang_value, str):
-            # 检查占位符
-            en_placeholders = extract_placeholders(en_value)
-            lang_placeholders = extract_placeholders(lang_value)
-            
-            if en_placeholders != lang_placeholders:
-                results['placeholder_issues'].append({
-                    'key': key_path,
-                    'en_placeholders': sorted(en_placeholders),
-                    'lang_placeholders': sorted(lang_placeholders),
-                    'en_text': en_value[:100] + ('...' if len(en_value) > 100 else ''),
-                    'lang_text': lang_value[:100] + ('...' if len(lang_value) > 100 else '')
-                })
-            
-            # 检查 HTML 标签
-            en_tags = extract_html_tags(en_value)
-            lang_tags = extract_html_tags(lang_value)
-            
-            if en_tags != lang_tags:
-                results['html_tag_issues'].append({
-                    'key': key_path,
-                    'en_tags': sorted(en_tags),
-                    'lang_tags': sorted(lang_tags),
-                    'en_text': en_value[:100] + ('...' if len(en_value) > 100 else ''),
-                    'lang_text': lang_value[:100] + ('...' if len(lang_value) > 100 else '')
-                })
+        en_tokens = tokenize_source_string(en_value)
+        lang_tokens = tokenize_string(lang_value)
+        
+        # 检查占位符
+        if en_tokens.placeholders != lang_tokens.placeholders:
+            results['placeholder_issues'].append({
+                'key': key_path,
+                'en_placeholders': sorted(en_tokens.placeholders),
+                'lang_placeholders': sorted(lang_tokens.placeholders),
+                'en_text': _excerpt(en_value),
+                'lang_text': _excerpt(lang_value)
+            })
+        
+        # 检查 HTML 标签
+        if en_tokens.tags != lang_tokens.tags:
+            results['html_tag_issues'].append({
+                'key': key_path,
+                'en_tags': sorted(en_tokens.tags),
+                'lang_tags': sorted(lang_tokens.tags),
+                'en_text': _excerpt(en_value),
+                'lang_text': _excerpt(lang_value)
+            })
+        elif en_tokens.well_nested and not lang_tokens.well_nested:
+            # 标签集合一致，但译文中的标签没有正确嵌套
+            results['structure_issues'].append({
+                'key': key_path,
+                'kind': 'tag_nesting',
+                'en': list(en_tokens.tag_sequence),
+                'lang': list(lang_tokens.tag_sequence),
+                'en_text': _excerpt(en_value),
+                'lang_text': _excerpt(lang_value)
+            })
+        elif en_tokens.tag_sequence != lang_tokens.tag_sequence:
+            # 标签集合一致，但顺序或数量不同
+            results['structure_issues'].append({
+                'key': key_path,
+                'kind': 'tag_order',
+                'en': list(en_tokens.tag_sequence),
+                'lang': list(lang_tokens.tag_sequence),
+                'en_text': _excerpt(en_value),
+                'lang_text': _excerpt(lang_value)
+            })
+        
+        # 检查实体引用（&nbsp;、&#8212; 等）
+        if en_tokens.entities != lang_tokens.entities:
+            results['structure_issues'].append({
+                'key': key_path,
+                'kind': 'entities',
+                'en': sorted(en_tokens.entities),
+                'lang': sorted(lang_tokens.entities),
+                'en_text': _excerpt(en_value),
+                'lang_text': _excerpt(lang_value)
+            })
+        
+        # 检查 ICU plural/select 参数
+        if en_tokens.icu_arguments != lang_tokens.icu_arguments:
+            results['structure_issues'].append({
+                'key': key_path,
+                'kind': 'icu_arguments',
+                'en': sorted(', '.join(arg) for arg in en_tokens.icu_arguments),
+                'lang': sorted(', '.join(arg) for arg in lang_tokens.icu_arguments),
+                'en_text': _excerpt(en_value),
+                'lang_text': _excerpt(lang_value)
+            })
     
     return results
 
+def audit_pair(pair: Tuple[str, str]) -> Dict[str, Any]:
+    """审计单个 (文件, 语言) 组合，可在子进程中执行"""
+    filename, lang = pair
+    base_dir = Path('messages')
+    with section(f'translations.{filename}'):
+        return check_file(base_dir / 'en' / filename, base_dir / lang / filename, lang)
+
+def _init_worker(profile_config: Dict[str, Any]) -> None:
+    """进程池初始化：fork 时沿用继承的语料，其他启动方式下从磁盘缓存加载语料"""
+    init_worker(profile_config)
+    get_corpus()
+
+def _audit_pair_worker(pair: Tuple[str, str]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """在子进程中审计单个组合，并把该任务的统计一起返回主进程汇总"""
+    return audit_pair(pair), collect()
+
+def iter_audit_results(filenames: List[str], jobs: int = 1,
+                       reuse: Optional['PreviousResults'] = None
+                       ) -> Iterator[Tuple[Tuple[str, str], Dict[str, Any]]]:
+    """
+    按 FILES × LANGUAGES 的顺序逐个产出 ((文件, 语言), 结果)。
+    jobs > 1 时分发到进程池；产出顺序与串行执行完全一致。
+    reuse 中已有的组合直接沿用，不再重新审计。
+    """
+    if reuse is None:
+        reuse = PreviousResults(REPORT_STREAM_FILE, set())
+    all_pairs = [(filename, lang) for filename in filenames for lang in LANGUAGES]
+    pairs = [pair for pair in all_pairs if pair not in reuse]
+    
+    if jobs <= 1 or len(pairs) <= 1:
+        for pair in all_pairs:
+            yield pair, reuse.get(pair) or audit_pair(pair)
+        return
+    
+    # 先在主进程中加载语料，磁盘缓存也由主进程统一写回。
+    # fork 出的子进程直接继承解析结果；spawn/forkserver（Windows、macOS 默认）的子进程不继承内存，
+    # 因此先把磁盘缓存写回，子进程在初始化时读取缓存，而不是各自重新解析 JSON
+    with section('translations.prime'):
+        for filename, lang in pairs:
+            for path in (Path('messages') / 'en' / filename, Path('messages') / lang / filename):
+                try:
+                    load_messages(path)
+                except Exception:
+                    # 错误由 check_file 在子进程中统一报告
+                    pass
+        if multiprocessing.get_start_method() != 'fork':
+            get_corpus().save()
+    
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(worker_config(),)) as executor:
+        fresh = executor.map(_audit_pair_worker, pairs)
+        for pair in all_pairs:
+            if pair in reuse:
+                # 上一次的报告中意外缺少该组合时在主进程中重新审计
+                yield pair, reuse.get(pair) or audit_pair(pair)
+            else:
+                result, profile = next(fresh)
+                merge(profile)
+                yield pair, result
+
+def content_hash(path: Path) -> Optional[str]:
+    """计算文件内容的 SHA-256，文件不存在时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def compute_pair_hashes(filenames: List[str]) -> Dict[str, Dict[str, Optional[str]]]:
+    """计算每个 (文件, 语言) 组合的英文源文件与目标文件哈希"""
+    base_dir = Path('messages')
+    hashes = {}
+    for filename in filenames:
+        en_hash = content_hash(base_dir / 'en' / filename)
+        for lang in LANGUAGES:
+            hashes[f"{filename}/{lang}"] = {
+                'en': en_hash,
+                'lang': content_hash(base_dir / lang / filename),
+            }
+    return hashes
+
+class PreviousResults:
+    """
+    上一次报告中可复用的结果，从 JSONL 流中按需读取。
+    iter_audit_results 按 FILES × LANGUAGES 的顺序取用结果，与报告中的记录顺序一致，
+    因此只需顺序前进一遍，内存中只保留当前组合。
+    """
+    
+    def __init__(self, path: Path, pairs: Set[Tuple[str, str]]):
+        self.pairs = pairs
+        self._records = iter_records(path) if pairs else iter(())
+        self._stream = iter_translation_pairs(self._records)
+    
+    def __contains__(self, pair: Tuple[str, str]) -> bool:
+        return pair in self.pairs
+    
+    def __len__(self) -> int:
+        return len(self.pairs)
+    
+    def get(self, pair: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """前进到 pair 对应的记录；流中已找不到时返回 None（由调用方重新审计）"""
+        if pair not in self.pairs:
+            return None
+        for filename, lang, results in self._stream:
+            if (filename, lang) == pair:
+                return results
+        return None
+    
+    def close(self) -> None:
+        """关闭上一次的报告流（之后才能用新的流替换它）"""
+        self._stream.close()
+        if hasattr(self._records, 'close'):
+            self._records.close()
+
+def load_reusable_results(pair_hashes: Dict[str, Dict[str, Optional[str]]], path: Path) -> PreviousResults:
+    """
+    从上一次的 JSONL 报告流中取出可复用的结果：
+    仅当检查逻辑版本一致且英文源文件与目标文件的哈希均未变化时才复用。
+    """
+    pairs: Set[Tuple[str, str]] = set()
+    try:
+        with open(HASH_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        manifest = {}
+    
+    if manifest.get('version') == AUDIT_VERSION and path.exists():
+        previous_hashes = manifest.get('pairs', {})
+        for pair_key, hashes in pair_hashes.items():
+            if previous_hashes.get(pair_key) == hashes:
+                filename, lang = pair_key.rsplit('/', 1)
+                pairs.add((filename, lang))
+    return PreviousResults(path, pairs)
+
+def save_hash_manifest(pair_hashes: Dict[str, Dict[str, Optional[str]]]) -> None:
+    """保存本次审计对应的内容哈希清单"""
+    with open(HASH_MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'version': AUDIT_VERSION, 'pairs': pair_hashes}, f, indent=2)
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='检查所有语言文件与英文版本的差异')
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='并行审计的进程数（默认: 1，串行执行）',
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='增量审计：仅重新检查英文源文件或目标文件内容发生变化的组合，其余结果沿用上次报告',
+    )
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+    
     base_dir = Path('messages')
     en_dir = base_dir / 'en'
     
-    all_results = {}
-    
     print("=" * 80)
     print("Translation Audit Report")
     print("=" * 80)
     print()
     
+    filenames = []
     for filename in FILES:
         en_file = en_dir / filename
         if not en_file.exists():
             print(f"[WARNING] English file not found: {en_file}")
             continue
-        
-        print(f"\n[FILE] Checking: {filename}")
-        print("-" * 80)
-        
-        file_results = {}
-        
-        for lang in LANGUAGES:
-            lang_file = base_dir / lang / filename
-            results = check_file(en_file, lang_file, lang)
-            file_results[lang] = results
+        filenames.append(filename)
+    
+    with section('translations.hashes'):
+        pair_hashes = compute_pair_hashes(filenames)
+    # 增量模式下新的 JSONL 流先写入临时文件，上一次的流在审计过程中按需读取
+    stream_file = REPORT_STREAM_FILE.with_name(REPORT_STREAM_FILE.name + '.tmp') if args.incremental \
+        else REPORT_STREAM_FILE
+    reuse = load_reusable_results(pair_hashes, REPORT_STREAM_FILE) if args.incremental else None
+    if args.incremental:
+        total_pairs = len(filenames) * len(LANGUAGES)
+        print(f"[INCREMENTAL] Reusing {len(reuse)}/{total_pairs} unchanged results, "
+              f"re-checking {total_pairs - len(reuse)}")
+    
+    # 结果边审计边写入 JSONL 流，内存中只保留当前组合
+    current_file = None
+    with JsonlReportWriter(stream_file, 'translations') as writer:
+        for (filename, lang), results in iter_audit_results(filenames, args.jobs, reuse):
+            writer.write_translation_pair(filename, lang, results)
+            
+            if filename != current_file:
+                current_file = filename
+                print(f"\n[FILE] Checking: {filename}")
+                print("-" * 80)
             
             # 显示结果
             issues_found = False
@@ -209,78 +498,104 @@ def main():
                 print(f"  [!] {lang}: {len(results['html_tag_issues'])} HTML tag issues")
                 issues_found = True
             
+            if results.get('structure_issues'):
+                print(f"  [!] {lang}: {len(results['structure_issues'])} structure issues")
+                issues_found = True
+            
             if not issues_found:
                 print(f"  [OK] {lang}: Passed")
-        
-        all_results[filename] = file_results
     
-    # 生成详细报告
+    if reuse is not None:
+        reuse.close()
+        os.replace(stream_file, REPORT_STREAM_FILE)
+    
+    # 生成详细报告（从 JSONL 流中逐个组合读回）
     print("\n" + "=" * 80)
     print("Detailed Report")
     print("=" * 80)
     
-    for filename, file_results in all_results.items():
-        print(f"\n{'=' * 80}")
-        print(f"File: {filename}")
-        print(f"{'=' * 80}")
+    current_file = None
+    for filename, lang, results in iter_translation_pairs(iter_records(REPORT_STREAM_FILE)):
+        if filename != current_file:
+            current_file = filename
+            print(f"\n{'=' * 80}")
+            print(f"File: {filename}")
+            print(f"{'=' * 80}")
         
-        for lang, results in file_results.items():
-            if not results.get('file_exists'):
-                continue
-            
-            if 'json_error' in results or 'error' in results:
-                continue
-            
-            has_issues = False
-            
-            # 缺失的键
-            if results['missing_keys']:
-                has_issues = True
-                print(f"\n  [{lang.upper()}] Missing Keys ({len(results['missing_keys'])}):")
-                for key in results['missing_keys'][:20]:  # 只显示前20个
-                    print(f"      - {key}")
-                if len(results['missing_keys']) > 20:
-                    print(f"      ... {len(results['missing_keys']) - 20} more keys")
-            
-            # 占位符问题
-            if results['placeholder_issues']:
-                has_issues = True
-                print(f"\n  [{lang.upper()}] Placeholder Issues ({len(results['placeholder_issues'])}):")
-                for issue in results['placeholder_issues'][:10]:  # 只显示前10个
-                    print(f"      Key: {issue['key']}")
-                    print(f"        EN placeholders: {issue['en_placeholders']}")
-                    print(f"        {lang} placeholders: {issue['lang_placeholders']}")
-                    print(f"        EN text: {issue['en_text']}")
-                    print(f"        {lang} text: {issue['lang_text']}")
-                    print()
-                if len(results['placeholder_issues']) > 10:
-                    print(f"      ... {len(results['placeholder_issues']) - 10} more issues")
-            
-            # HTML 标签问题
-            if results['html_tag_issues']:
-                has_issues = True
-                print(f"\n  [{lang.upper()}] HTML Tag Issues ({len(results['html_tag_issues'])}):")
-                for issue in results['html_tag_issues'][:10]:  # 只显示前10个
-                    print(f"      Key: {issue['key']}")
-                    print(f"        EN tags: {issue['en_tags']}")
-                    print(f"        {lang} tags: {issue['lang_tags']}")
-                    print(f"        EN text: {issue['en_text']}")
-                    print(f"        {lang} text: {issue['lang_text']}")
-                    print()
-                if len(results['html_tag_issues']) > 10:
-                    print(f"      ... {len(results['html_tag_issues']) - 10} more issues")
-            
-            if not has_issues:
-                print(f"\n  [{lang.upper()}] No issues found")
+        if not results.get('file_exists'):
+            continue
+        
+        if 'json_error' in results or 'error' in results:
+            continue
+        
+        has_issues = False
+        
+        # 缺失的键
+        if results['missing_keys']:
+            has_issues = True
+            print(f"\n  [{lang.upper()}] Missing Keys ({len(results['missing_keys'])}):")
+            for key in results['missing_keys'][:20]:  # 只显示前20个
+                print(f"      - {key}")
+            if len(results['missing_keys']) > 20:
+                print(f"      ... {len(results['missing_keys']) - 20} more keys")
+        
+        # 占位符问题
+        if results['placeholder_issues']:
+            has_issues = True
+            print(f"\n  [{lang.upper()}] Placeholder Issues ({len(results['placeholder_issues'])}):")
+            for issue in results['placeholder_issues'][:10]:  # 只显示前10个
+                print(f"      Key: {issue['key']}")
+                print(f"        EN placeholders: {issue['en_placeholders']}")
+                print(f"        {lang} placeholders: {issue['lang_placeholders']}")
+                print(f"        EN text: {issue['en_text']}")
+                print(f"        {lang} text: {issue['lang_text']}")
+                print()
+            if len(results['placeholder_issues']) > 10:
+                print(f"      ... {len(results['placeholder_issues']) - 10} more issues")
+        
+        # HTML 标签问题
+        if results['html_tag_issues']:
+            has_issues = True
+            print(f"\n  [{lang.upper()}] HTML Tag Issues ({len(results['html_tag_issues'])}):")
+            for issue in results['html_tag_issues'][:10]:  # 只显示前10个
+                print(f"      Key: {issue['key']}")
+                print(f"        EN tags: {issue['en_tags']}")
+                print(f"        {lang} tags: {issue['lang_tags']}")
+                print(f"        EN text: {issue['en_text']}")
+                print(f"        {lang} text: {issue['lang_text']}")
+                print()
+            if len(results['html_tag_issues']) > 10:
+                print(f"      ... {len(results['html_tag_issues']) - 10} more issues")
+        
+        # 结构问题
+        if results.get('structure_issues'):
+            has_issues = True
+            print(f"\n  [{lang.upper()}] Structure Issues ({len(results['structure_issues'])}):")
+            for issue in results['structure_issues'][:10]:  # 只显示前10个
+                print(f"      Key: {issue['key']} ({issue['kind']})")
+                print(f"        EN: {issue['en']}")
+                print(f"        {lang}: {issue['lang']}")
+                print(f"        EN text: {issue['en_text']}")
+                print(f"        {lang} text: {issue['lang_text']}")
+                print()
+            if len(results['structure_issues']) > 10:
+                print(f"      ... {len(results['structure_issues']) - 10} more issues")
+        
+        if not has_issues:
+            print(f"\n  [{lang.upper()}] No issues found")
     
-    # 保存详细报告到文件
-    report_file = Path('translation_audit_report.json')
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(all_results, f, ensure_ascii=False, indent=2)
+    # 由 JSONL 流转换出兼容的嵌套 JSON 报告
+    report_file = REPORT_FILE
+    with section('report.convert'):
+        convert_jsonl_to_json(REPORT_STREAM_FILE, report_file)
+    save_hash_manifest(pair_hashes)
     
     print(f"\n{'=' * 80}")
     print(f"Detailed report saved to: {report_file}")
+    print(f"Record stream saved to: {REPORT_STREAM_FILE}")
     print(f"{'=' * 80}")
+    
+    finish(args)
 
 if __name__ == '__main__':
     main()
@@ -1,73 +1,675 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-生成包含所有18种语言 hreflang 的 sitemap.xml
+生成包含所有语言 hreflang 的 sitemap.xml
+
+根目录与 public/ 下已发布的 sitemap.xml 由 scripts/generate-sitemap.ts（npm run build:sitemap）生成；
+本脚本默认输出到 sitemaps/ 目录，--output-dir 指向根目录或 public/ 时报错，避免两个生成器互相覆盖。
+
+URL 集合由路由发现阶段从源码与消息语料中得出，无需手工维护页面列表：
+1. 静态页面：一次遍历 app/[locale]/ 下的 page.tsx（跳过 [slug] 等动态段，
+   以及自身或上级 layout.tsx 声明 robots: {index: false} 的路由，如 /search）
+2. FAQ 文章：messages/<lang>/faq.json 与 messages/articles/<lang>.json 中 articles 下带标题的 slug
+3. 每个页面只列出实际具备内容的语言（静态页面要求 messages/<lang>/<命名空间>.json 存在）
+
+每个页面的每种语言各输出一个 <url>（带尾部斜杠，与 next.config trailingSlash: true 一致），
+同一页面的所有条目共用一份预先生成的 hreflang 备用链接块（含 x-default，指向英文版本）。
+
+发现结果按输入内容的哈希缓存在 .cache/sitemap_routes.json，内容未变化时直接复用。
+
+<lastmod> 取自每个页面、每种语言的内容哈希，记录在 sitemap_lastmod.json（提交到仓库）：
+- 哈希与清单一致：沿用清单中的 lastmod，重复生成不会改变任何日期
+- 清单中没有、但 --seed-from 指定的已发布 sitemap 中有的 URL：沿用已发布的 lastmod（用于初始化清单）
+- 首次出现的文章：发布日期（articles.<slug>.published，缺失时取 lib/seo/articleDates.ts 的回退日期）
+- 其余情况（内容变化或首次出现的静态页面）：内容来源文件最后一次提交的时间（git log），
+  不依赖检出时间，全新克隆或 CI 中结果相同；有未提交修改、未纳入版本库或无法调用 git 时取文件修改时间
+输出文件与已有文件逐字节相同时不会重写。
+
+图片 sitemap 阶段：一次遍历 faq.json 与 messages/articles/<lang>.json，从 image/alt 字段与字符串中的
+<img src alt> 建立反向索引 {图片路径: [(页面, 语言, 说明)]}，按来源文件签名缓存在 .cache/sitemap_images.json；
+每个语言版本的 <url> 附带该语言引用的 <image:image>，alt 文本作为本地化的 <image:caption>。
+public/ 中不存在的图片不会写入。
+
+条目由 SitemapWriter 流式写入文件：接近协议上限（50,000 个 URL / 50 MB）时自动分片为
+sitemap-1.xml、sitemap-2.xml ... 并生成 sitemap_index.xml；只有一个分片时仍输出 sitemap.xml。
+
+用法：
+    python generate_sitemap.py                       # 输出到 sitemaps/
+    python generate_sitemap.py --gzip                # 输出 .xml.gz
+    python generate_sitemap.py --seed-from sitemap.xml   # 清单中没有的 URL 沿用已发布的 lastmod
 """
 
-from datetime import datetime
+import argparse
+import filecmp
+import fnmatch
+import gzip
+import hashlib
+import html
+import json
+import os
+import re
+import subprocess
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from message_corpus import Signature, file_signature, load_messages
 
 LANGUAGES = ['en', 'es', 'ar', 'de', 'it', 'pt', 'ru', 'tr', 'fr', 'pl', 'nl', 'ko', 'ja', 'vi', 'id', 'uk', 'bg', 'ro']
 BASE_URL = 'https://www.isperm.com'
+# x-default 指向的语言（页面没有该语言时指向第一个可用语言）
+DEFAULT_LOCALE = 'en'
 
-# 主要页面路径（不包含语言前缀）
-PAGES = [
-    '/',
-    '/about',
-    '/contact',
-    '/products',
-    '/faq',
-    '/products/nexus-dx1',
-    '/products/msqa-100',
-    '/products/sqa-6100vet',
-]
+# 路由树与消息语料（相对于仓库根目录）
+ROUTES_DIR = Path('app') / '[locale]'
+MESSAGES_DIR = Path('messages')
+
+# 路由发现缓存（.cache/ 已加入 .gitignore）；为 None 时不读写缓存
+ROUTE_CACHE_FILE: Optional[Path] = Path(__file__).resolve().parent / '.cache' / 'sitemap_routes.json'
+ROUTE_CACHE_VERSION = 4
+
+# 默认输出目录；BUILD_SITEMAP_DIRS 中的 sitemap.xml 由 scripts/generate-sitemap.ts 生成，不能作为输出目录
+DEFAULT_OUTPUT_DIR = Path('sitemaps')
+BUILD_SITEMAP_DIRS = (Path('.'), Path('public'))
+
+# lastmod 清单（页面 -> 语言 -> {hash, lastmod}）；为 None 时不读写清单，lastmod 按来源推算
+LASTMOD_MANIFEST: Optional[Path] = Path('sitemap_lastmod.json')
+LASTMOD_MANIFEST_VERSION = 1
+
+# 文章发布日期的回退表（与前端共用同一份数据）
+ARTICLE_DATES_FILE = Path('lib') / 'seo' / 'articleDates.ts'
+ARTICLE_DATES_BLOCK_RE = re.compile(r'ARTICLE_PUBLISHED_FALLBACK[^=]*=\s*\{(.*?)\};', re.S)
+ARTICLE_DATE_ENTRY_RE = re.compile(r"""['"]([^'"]+)['"]\s*:\s*['"](\d{4}-\d{2}-\d{2})['"]""")
+DEFAULT_PUBLISHED = '2024-01-01'
+ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# 图片索引缓存（.cache/ 已加入 .gitignore）；为 None 时不读写缓存
+IMAGE_CACHE_FILE: Optional[Path] = Path(__file__).resolve().parent / '.cache' / 'sitemap_images.json'
+IMAGE_CACHE_VERSION = 1
+PUBLIC_DIR = Path('public')
+IMAGE_SUFFIXES = ('.webp', '.jpg', '.jpeg', '.png', '.gif', '.avif', '.svg')
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.I)
+IMG_ATTR_RE = re.compile(r"""\b(src|alt)\s*=\s*(["'])(.*?)\2""", re.I | re.S)
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june',
+          'july', 'august', 'september', 'october', 'november', 'december']
 
-# FAQ 文章 slugs
-FAQ_SLUGS = [
-    'faq-human-semen-standards',
-    'faq-bull-breeding-soundness',
-    'faq-canine-semen-analysis',
-    'faq-poultry-semen-analysis',
-    'faq-stallion-semen-analysis',
-    'faq-camelid-andrology',
-    'faq-fish-semen-analysis',
-    'faq-ram-breeding-soundness',
-    'faq-boar-semen-evaluation',
-    'who-6th-edition-semen-analysis-standards',
-    'iso-23162-2021-laboratory-competence-guide',
-    'eshre-guidelines-clinical-semen-examination',
-    'asrm-male-infertility-evaluation-protocols',
-    'article-what-is-spermmaxxing-2026',
-    'article-sperm-health-biomarker-2026',
-    'article-male-fertility-crisis-2026',
+# 文章路由（其 [slug] 段由消息语料中的文章填充）
+ARTICLE_ROUTE = '/faq'
+
+# 页面或布局中声明不收录的 robots 配置
+NOINDEX_RE = re.compile(r'robots\s*:\s*\{[^}]*\bindex\s*:\s*false')
+
+# 优先级与更新频率规则 (路径模式, priority, changefreq)，按顺序匹配，未匹配时使用 DEFAULT_PRIORITY_AND_CHANGEFREQ；
+# 与 scripts/generate-sitemap.ts（npm run build:sitemap）的 getPriorityAndChangefreq 保持一致
+PRIORITY_RULES = [
+    ('/', '1.0', 'weekly'),
+    ('/about', '0.9', 'monthly'),
+    ('/products', '0.9', 'monthly'),
+    ('/faq', '0.9', 'monthly'),
+    ('/contact', '0.8', 'monthly'),
+    ('/products/*', '0.8', 'monthly'),
+    ('/faq/*', '0.7', 'monthly'),
+    ('/search', '0.6', 'weekly'),
 ]
+DEFAULT_PRIORITY_AND_CHANGEFREQ = ('0.5', 'monthly')
+
+# sitemap 协议上限：每个文件最多 50,000 个 URL、未压缩 50 MB
+MAX_URLS_PER_SITEMAP = 50000
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+URLSET_HEADER = b'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:xhtml="http://www.w3.org/1999/xhtml"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+'''
+URLSET_FOOTER = b'</urlset>\n'
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+XHTML_NS = '{http://www.w3.org/1999/xhtml}'
+INDEX_FILE = 'sitemap_index.xml'
+# 分片文件名（sitemap-1.xml / sitemap-1.xml.gz ...），用于清理上次生成的多余分片
+SHARD_RE = re.compile(r'^sitemap-\d+\.xml(\.gz)?$')
+
+
+class PageVersion(NamedTuple):
+    """页面某一语言版本的内容标识"""
+    # 内容哈希（静态页面：page.tsx 与命名空间消息文件；文章：该语言的文章条目）
+    digest: str
+    # 文章发布日期（YYYY-MM-DD）；静态页面为 None
+    published: Optional[str]
+    # 内容来源文件的最新提交时间（UTC，W3C 日期时间格式；见 commit_dates）
+    modified: str
+
+
+class ImageRef(NamedTuple):
+    """图片的一处引用"""
+    # 引用该图片的页面路径（不含语言前缀）
+    page: str
+    lang: str
+    # 该语言的 alt 文本；没有时为 None
+    caption: Optional[str]
+
+
+class Route(NamedTuple):
+    """一个待收录的页面"""
+    # 不含语言前缀的路径，如 '/'、'/about'、'/faq/<slug>'
+    path: str
+    # 'page'（静态页面）或 'article'（FAQ 文章）
+    kind: str
+    # 实际具备内容的语言（按 LANGUAGES 顺序）
+    locales: Tuple[str, ...]
+    # {语言: 内容标识}
+    versions: Dict[str, PageVersion]
+
+
+def page_priority_and_changefreq(path: str) -> Tuple[str, str]:
+    """按 PRIORITY_RULES 返回页面的 (priority, changefreq)"""
+    for pattern, priority, changefreq in PRIORITY_RULES:
+        if fnmatch.fnmatchcase(path, pattern):
+            return priority, changefreq
+    return DEFAULT_PRIORITY_AND_CHANGEFREQ
+
 
-def generate_hreflang_links(path: str) -> str:
-    """生成所有语言的 hreflang 链接"""
-    links = []
+def scan_route_tree(root: Path) -> Tuple[List[str], Dict[str, bytes]]:
+    """
+    一次遍历路由树，返回 (静态页面路径, {源文件相对路径: 内容})。
+    动态段（[slug]）整棵子树跳过；(group) 路由组不计入路径；noindex 布局对整棵子树生效。
+    """
+    pages = []
+    sources: Dict[str, bytes] = {}
+    noindex_dirs = set()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith('['))
+        relative = Path(dirpath).relative_to(root)
+        noindex = relative.parent in noindex_dirs and relative != Path('.')
+        for name in ('layout.tsx', 'page.tsx'):
+            if name not in filenames:
+                continue
+            content = (Path(dirpath) / name).read_bytes()
+            sources[(relative / name).as_posix()] = content
+            if NOINDEX_RE.search(content.decode('utf-8', errors='replace')):
+                noindex = True
+            if name == 'page.tsx' and not noindex:
+                segments = [part for part in relative.parts if not part.startswith('(')]
+                pages.append('/' + '/'.join(segments))
+        if noindex:
+            noindex_dirs.add(relative)
+    return pages, sources
+
+
+def _namespace(path: str) -> str:
+    """页面对应的消息命名空间（messages/<lang>/<命名空间>.json）"""
+    segments = path.strip('/').split('/')
+    return segments[0] or 'index'
+
+
+def _article_sources(lang: str) -> List[Path]:
+    return [MESSAGES_DIR / lang / 'faq.json', MESSAGES_DIR / 'articles' / f'{lang}.json']
+
+
+def _message_signatures() -> Dict[Path, Signature]:
+    """各语言全部消息文件与文章文件的 (mtime_ns, size) 签名"""
+    signatures = {}
+    for lang in LANGUAGES:
+        directory = MESSAGES_DIR / lang
+        names = sorted(os.listdir(directory)) if directory.is_dir() else []
+        for path in [directory / name for name in names] + [MESSAGES_DIR / 'articles' / f'{lang}.json']:
+            if path.is_file():
+                signatures[path] = file_signature(path)
+    return signatures
+
+
+def _content_key(sources: Dict[str, bytes], messages: Dict[Path, Signature], article_dates: bytes) -> str:
+    """路由树源文件与文章日期表内容、消息文件签名的哈希（与 message_corpus 一样以签名判断消息文件是否变化）"""
+    digest = hashlib.sha256(f'{ROUTE_CACHE_VERSION}:{",".join(LANGUAGES)}'.encode('utf-8'))
+    for name in sorted(sources):
+        digest.update(name.encode('utf-8') + b'\0' + sources[name] + b'\0')
+    for path, signature in messages.items():
+        digest.update(f'{path.as_posix()}:{signature[0]}:{signature[1]}\0'.encode('utf-8'))
+    digest.update(article_dates)
+    return digest.hexdigest()
+
+
+def _w3c(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+def commit_dates(roots: Sequence[Path]) -> Dict[Path, str]:
+    """
+    roots 下每个文件最后一次提交的时间（UTC），一次 git log 取得。
+    工作区中有未提交修改的文件不包含在内；不在 git 仓库中或无法调用 git 时返回空字典。
+    """
+    paths = [str(root) for root in roots]
+    try:
+        log = subprocess.run(['git', '-c', 'core.quotepath=off', 'log', '--relative', '--name-only',
+                              '--format=%x00%cI', '--', *paths],
+                             capture_output=True, text=True, encoding='utf-8', check=True).stdout
+        dirty = subprocess.run(['git', '-c', 'core.quotepath=off', 'diff', '--name-only', '--relative', 'HEAD',
+                                '--', *paths],
+                               capture_output=True, text=True, encoding='utf-8', check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    dates: Dict[Path, str] = {}
+    # 提交按时间倒序输出，每个文件第一次出现即为最后一次提交
+    for commit in log.split('\0')[1:]:
+        date, _, names = commit.partition('\n')
+        for name in names.splitlines():
+            if name and Path(name) not in dates:
+                dates[Path(name)] = _w3c(datetime.fromisoformat(date.strip()))
+    for name in dirty.splitlines():
+        dates.pop(Path(name), None)
+    return dates
+
+
+def _modified(paths: Sequence[Path], dates: Dict[Path, str]) -> str:
+    """来源文件的最新提交时间；没有提交记录的文件（未提交的修改等）取文件修改时间"""
+    return max(dates.get(path) or _w3c(datetime.fromtimestamp(path.stat().st_mtime, timezone.utc))
+               for path in paths)
+
+
+def parse_published_to_iso(value: str) -> str:
+    """将 "May 2026"、"2024-06-01" 或 "2024" 转换为 YYYY-MM-DD（lib/seo/articleDates.ts 中 parsePublishedToIso 的移植）"""
+    trimmed = value.strip()
+    if re.match(r'^\d{4}-\d{2}-\d{2}', trimmed):
+        return trimmed[:10]
+    if re.match(r'^\d{4}$', trimmed):
+        return f'{trimmed}-01-01'
+    month_year = re.match(r'^([A-Za-z]+)\s+(\d{4})$', trimmed)
+    if month_year and month_year.group(1).lower() in MONTHS:
+        return f'{month_year.group(2)}-{MONTHS.index(month_year.group(1).lower()) + 1:02d}-01'
+    return trimmed
+
+
+def load_article_dates(text: str) -> Dict[str, str]:
+    """从 articleDates.ts 源码中解析 ARTICLE_PUBLISHED_FALLBACK"""
+    block = ARTICLE_DATES_BLOCK_RE.search(text)
+    return dict(ARTICLE_DATE_ENTRY_RE.findall(block.group(1))) if block else {}
+
+
+def article_published_iso(value: Any, slug: str, fallback: Dict[str, str]) -> str:
+    """
+    文章发布日期（getArticlePublishedIso 的移植）。
+    译文中的本地化月份（如 "Mai 2026"）无法解析为 ISO 日期时同样使用回退表，而不是原样输出。
+    """
+    if isinstance(value, str) and value and not value.startswith('articles.') \
+            and value != f'faq.articles.{slug}.published':
+        published = parse_published_to_iso(value)
+        if ISO_DATE_RE.match(published):
+            return published
+    return fallback.get(slug, DEFAULT_PUBLISHED)
+
+
+def _load_cached_routes(key: str) -> Optional[List[Route]]:
+    if ROUTE_CACHE_FILE is None:
+        return None
+    try:
+        with open(ROUTE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if payload.get('version') != ROUTE_CACHE_VERSION or payload.get('key') != key:
+        return None
+    return [Route(path, kind, tuple(locales), {lang: PageVersion(*version) for lang, version in versions.items()})
+            for path, kind, locales, versions in payload['routes']]
+
+
+def _save_cached_routes(key: str, routes: List[Route]) -> None:
+    if ROUTE_CACHE_FILE is None:
+        return
+    try:
+        ROUTE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = ROUTE_CACHE_FILE.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': ROUTE_CACHE_VERSION, 'key': key,
+                       'routes': [list(route) for route in routes]}, f, ensure_ascii=False)
+        os.replace(tmp_file, ROUTE_CACHE_FILE)
+    except OSError:
+        # 缓存写入失败不影响生成结果
+        pass
+
+
+def discover_articles(published_fallback: Dict[str, str],
+                      dates: Dict[Path, str]) -> Dict[str, Dict[str, PageVersion]]:
+    """
+    {文章 slug: {语言: 内容标识}}，只包含具备该文章内容（带标题）的语言；slug 按首次出现的顺序。
+    同一语言在 faq.json 与 articles/<lang>.json 中都有该文章时，两者共同决定内容哈希。
+    """
+    articles: Dict[str, Dict[str, PageVersion]] = {}
     for lang in LANGUAGES:
-        # 处理路径
-        if path == '/':
-            url = f"{BASE_URL}/{lang}/"
+        # {slug: [(来源文件, 文章条目)]}
+        found: Dict[str, List[Tuple[Path, Dict[str, Any]]]] = {}
+        for path in _article_sources(lang):
+            if not path.is_file():
+                continue
+            entries = load_messages(path).get('articles') or {}
+            for slug, article in entries.items():
+                if isinstance(article, dict) and article.get('title'):
+                    found.setdefault(slug, []).append((path, article))
+        for slug, items in found.items():
+            # repr 比 json.dumps(sort_keys=True) 快约一倍；键顺序变化也视为内容变化
+            digest = hashlib.sha256(repr([article for _, article in items]).encode('utf-8')).hexdigest()
+            published = next((article['published'] for _, article in items if article.get('published')), None)
+            articles.setdefault(slug, {})[lang] = PageVersion(
+                digest,
+                article_published_iso(published, slug, published_fallback),
+                _modified([path for path, _ in items], dates),
+            )
+    return articles
+
+
+def discover_routes() -> List[Route]:
+    """
+    路由发现：静态页面（按层级与路径排序）在前，FAQ 文章（按语料中的顺序）在后。
+    输入内容未变化时直接返回缓存的结果。
+    """
+    pages, sources = scan_route_tree(ROUTES_DIR)
+    messages = _message_signatures()
+    article_dates = ARTICLE_DATES_FILE.read_bytes() if ARTICLE_DATES_FILE.is_file() else b''
+
+    key = _content_key(sources, messages, article_dates)
+    cached = _load_cached_routes(key)
+    if cached is not None:
+        return cached
+
+    dates = commit_dates([ROUTES_DIR, MESSAGES_DIR])
+    routes = []
+    for path in sorted(pages, key=lambda p: (p != '/', p.count('/'), p)):
+        page_file = ROUTES_DIR / path.lstrip('/') / 'page.tsx'
+        page_source = sources[(Path(path.lstrip('/')) / 'page.tsx').as_posix()]
+        namespace = f'{_namespace(path)}.json'
+        versions = {}
+        for lang in LANGUAGES:
+            message_file = MESSAGES_DIR / lang / namespace
+            if message_file in messages:
+                digest = hashlib.sha256(page_source + b'\0' + message_file.read_bytes()).hexdigest()
+                versions[lang] = PageVersion(digest, None, _modified([page_file, message_file], dates))
+        if not versions:
+            # 没有任何语言提供该命名空间时，页面不依赖消息文件，所有语言都可访问
+            version = PageVersion(hashlib.sha256(page_source).hexdigest(), None, _modified([page_file], dates))
+            versions = {lang: version for lang in LANGUAGES}
+        routes.append(Route(path, 'page', tuple(versions), versions))
+    published_fallback = load_article_dates(article_dates.decode('utf-8'))
+    for slug, versions in discover_articles(published_fallback, dates).items():
+        routes.append(Route(f'{ARTICLE_ROUTE}/{slug}', 'article', tuple(versions), versions))
+
+    _save_cached_routes(key, routes)
+    return routes
+
+
+def _collect_images(node: Any, page: str, lang: str, refs: Dict[Tuple[str, str], ImageRef]) -> None:
+    """收集 node 中引用的图片：带 image 字段（及同级 alt）的对象，以及字符串中的 <img> 标签"""
+    # 用显式栈遍历，避免对每个节点的递归调用开销
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            image = item.get('image')
+            if isinstance(image, str) and image.lower().endswith(IMAGE_SUFFIXES):
+                alt = item.get('alt')
+                _add_image_ref(refs, image, ImageRef(page, lang, alt if isinstance(alt, str) and alt else None))
+            values = item.values()
+        elif isinstance(item, list):
+            values = item
         else:
-            clean_path = path.lstrip('/')
-            url = f"{BASE_URL}/{lang}/{clean_path}"
-        links.append(f'    <xhtml:link rel="alternate" hreflang="{lang}" href="{url}"/>')
+            values = (item,)
+        for value in values:
+            if isinstance(value, (dict, list)):
+                stack.append(value)
+            elif isinstance(value, str) and '<img' in value:
+                for tag in IMG_TAG_RE.findall(value):
+                    attrs = {name.lower(): html.unescape(attr) for name, _, attr in IMG_ATTR_RE.findall(tag)}
+                    if attrs.get('src', '').startswith('/'):
+                        _add_image_ref(refs, attrs['src'], ImageRef(page, lang, attrs.get('alt') or None))
+
+
+def _needs_deep_walk(path: Path, articles: Dict[str, Any]) -> bool:
+    """
+    文件中没有 <img> 标签、且 image 键全部位于文章顶层时，只需读取各文章自身的 image/alt，
+    不必遍历整篇文章；只扫描原始字节，比遍历解析后的对象快得多。无法确定时返回 True。
+    """
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return True
+    # 'img' 同时覆盖 <img 与转义的 \u003cimg；"image" 的出现次数不少于 image 键的个数
+    if b'img' in raw:
+        return True
+    top_level = sum(1 for article in articles.values() if isinstance(article, dict) and 'image' in article)
+    return raw.count(b'"image"') > top_level
+
+
+def _add_image_ref(refs: Dict[Tuple[str, str], ImageRef], image: str, ref: ImageRef) -> None:
+    # 同一页面同一语言只保留一处引用（faq.json 与 articles/<lang>.json 重复时优先保留带 alt 的）
+    existing = refs.get((image, ref.page))
+    if existing is None or existing.caption is None and ref.caption:
+        refs[(image, ref.page)] = ref
+
+
+def _image_index_key(signatures: Dict[Path, Signature]) -> str:
+    digest = hashlib.sha256(f'{IMAGE_CACHE_VERSION}:{",".join(LANGUAGES)}'.encode('utf-8'))
+    for path, signature in signatures.items():
+        digest.update(f'{path.as_posix()}:{signature[0]}:{signature[1]}\0'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _load_cached_images(key: str) -> Optional[Dict[str, List[ImageRef]]]:
+    if IMAGE_CACHE_FILE is None:
+        return None
+    try:
+        with open(IMAGE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if payload.get('version') != IMAGE_CACHE_VERSION or payload.get('key') != key:
+        return None
+    return {image: [ImageRef(*ref) for ref in refs] for image, refs in payload['images'].items()}
+
+
+def _save_cached_images(key: str, index: Dict[str, List[ImageRef]]) -> None:
+    if IMAGE_CACHE_FILE is None:
+        return
+    try:
+        IMAGE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = IMAGE_CACHE_FILE.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': IMAGE_CACHE_VERSION, 'key': key,
+                       'images': {image: [list(ref) for ref in refs] for image, refs in index.items()}},
+                      f, ensure_ascii=False)
+        os.replace(tmp_file, IMAGE_CACHE_FILE)
+    except OSError:
+        # 缓存写入失败不影响生成结果
+        pass
+
+
+def build_image_index() -> Dict[str, List[ImageRef]]:
+    """
+    图片反向索引 {图片路径: [引用]}，一次遍历各语言的 faq.json 与 articles/<lang>.json。
+    articles 下带标题的文章归属 /faq/<slug>，faq.json 的其余部分归属 /faq；
+    文章正文中没有图片引用的文件只读取文章顶层的 image/alt（见 _needs_deep_walk）。
+    来源文件签名未变化时直接复用缓存。
+    """
+    signatures = {path: file_signature(path)
+                  for lang in LANGUAGES for path in _article_sources(lang) if path.is_file()}
+    key = _image_index_key(signatures)
+    cached = _load_cached_images(key)
+    if cached is not None:
+        return cached
+
+    index: Dict[str, List[ImageRef]] = {}
+    for lang in LANGUAGES:
+        refs: Dict[Tuple[str, str], ImageRef] = {}
+        for path in _article_sources(lang):
+            if path not in signatures:
+                continue
+            data = load_messages(path)
+            articles = data.get('articles') or {}
+            deep = _needs_deep_walk(path, articles)
+            for slug, article in articles.items():
+                if not (isinstance(article, dict) and article.get('title')):
+                    continue
+                if deep:
+                    _collect_images(article, f'{ARTICLE_ROUTE}/{slug}', lang, refs)
+                    continue
+                image = article.get('image')
+                if isinstance(image, str) and image.lower().endswith(IMAGE_SUFFIXES):
+                    alt = article.get('alt')
+                    _add_image_ref(refs, image, ImageRef(f'{ARTICLE_ROUTE}/{slug}', lang,
+                                                         alt if isinstance(alt, str) and alt else None))
+            if path.name == 'faq.json':
+                _collect_images({k: v for k, v in data.items() if k != 'articles'}, ARTICLE_ROUTE, lang, refs)
+        for (image, _), ref in refs.items():
+            index.setdefault(image, []).append(ref)
+
+    _save_cached_images(key, index)
+    return index
+
+
+def page_images(index: Dict[str, List[ImageRef]]) -> Tuple[Dict[Tuple[str, str], List[Tuple[str, Optional[str]]]],
+                                                            List[str]]:
+    """
+    将反向索引展开为 {(页面, 语言): [(图片 URL, 说明)]}，并返回 public/ 中不存在的图片。
+    """
+    images: Dict[Tuple[str, str], List[Tuple[str, Optional[str]]]] = {}
+    missing = []
+    for image in sorted(index):
+        if not (PUBLIC_DIR / image.lstrip('/')).is_file():
+            missing.append(image)
+            continue
+        url = BASE_URL + quote(image)
+        for ref in index[image]:
+            images.setdefault((ref.page, ref.lang), []).append((url, ref.caption))
+    return images, missing
+
+
+def generate_image_entries(images: Sequence[Tuple[str, Optional[str]]]) -> str:
+    """生成 <image:image> 条目"""
+    entries = []
+    for url, caption in images:
+        entries.append('    <image:image>')
+        entries.append(f'      <image:loc>{escape(url)}</image:loc>')
+        if caption:
+            entries.append(f'      <image:caption>{escape(caption)}</image:caption>')
+        entries.append('    </image:image>')
+    return '\n'.join(entries)
+
+
+def main_locale(locales: Sequence[str]) -> str:
+    """页面的默认语言版本：英文，页面没有英文内容时使用第一个可用语言"""
+    return DEFAULT_LOCALE if DEFAULT_LOCALE in locales else locales[0]
+
+
+def page_url(lang: str, path: str) -> str:
+    """页面某一语言版本的 URL（带尾部斜杠）"""
+    clean_path = path.strip('/')
+    return f"{BASE_URL}/{lang}/{clean_path}/" if clean_path else f"{BASE_URL}/{lang}/"
+
+
+def generate_hreflang_links(path: str, locales: Optional[Sequence[str]] = None) -> str:
+    """
+    生成页面的 hreflang 备用链接块（默认为所有语言，末尾附 x-default）。
+    同一页面各语言条目的备用链接完全相同，每个页面只需生成一次。
+    """
+    locales = locales or LANGUAGES
+    links = [f'    <xhtml:link rel="alternate" hreflang="{lang}" href="{page_url(lang, path)}"/>'
+             for lang in locales]
+    links.append(f'    <xhtml:link rel="alternate" hreflang="x-default" '
+                 f'href="{page_url(main_locale(locales), path)}"/>')
     return '\n'.join(links)
 
-def generate_url_entry(path: str, priority: str = '0.8', changefreq: str = 'monthly') -> str:
-    """生成单个 URL 条目"""
-    # 使用英文版本作为主要 URL
-    if path == '/':
-        main_url = f"{BASE_URL}/en/"
-    else:
-        clean_path = path.lstrip('/')
-        main_url = f"{BASE_URL}/en/{clean_path}"
-    
-    hreflang_links = generate_hreflang_links(path)
-    
+
+def load_published_lastmods(path: Path) -> Dict[str, str]:
+    """已发布 sitemap 中每个 URL（<loc> 与 hreflang 备用链接，共用所在 <url> 的日期）的 lastmod"""
+    lastmods: Dict[str, str] = {}
+    for _, element in ET.iterparse(path):
+        if element.tag != f'{SITEMAP_NS}url':
+            continue
+        lastmod = (element.findtext(f'{SITEMAP_NS}lastmod') or '').strip()
+        if lastmod:
+            urls = [element.findtext(f'{SITEMAP_NS}loc')]
+            urls.extend(link.get('href') for link in element.iter(f'{XHTML_NS}link'))
+            for url in urls:
+                if url:
+                    lastmods.setdefault(url.strip(), lastmod)
+        element.clear()
+    return lastmods
+
+
+class LastmodManifest:
+    """
+    lastmod 清单：{页面路径: {语言: {'hash': 内容哈希, 'lastmod': 日期}}}。
+    内容哈希不变时沿用记录的日期；清单中没有的 URL 优先沿用 seed（已发布 sitemap 的 {URL: lastmod}）。
+    保存时只保留本次出现的页面，内容没有变化时不重写文件。
+    """
+
+    def __init__(self, path: Optional[Path] = LASTMOD_MANIFEST, seed: Optional[Dict[str, str]] = None):
+        self.path = Path(path) if path else None
+        self.seed = seed or {}
+        self.entries: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self._seen: Dict[str, Dict[str, Dict[str, str]]] = {}
+        # 本次 lastmod 发生变化的 (页面, 语言) 数
+        self.changed = 0
+        if self.path and self.path.is_file():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+            except (OSError, ValueError):
+                payload = {}
+            if isinstance(payload, dict) and payload.get('version') == LASTMOD_MANIFEST_VERSION:
+                self.entries = payload.get('pages', {})
+
+    def lastmod(self, route: Route, lang: str) -> str:
+        """返回页面某一语言版本的 lastmod，并记录到本次的清单中"""
+        version = route.versions[lang]
+        stored = self.entries.get(route.path, {}).get(lang)
+        if stored is not None and stored.get('hash') == version.digest:
+            lastmod = stored['lastmod']
+        else:
+            # 首次出现的 URL 沿用已发布的日期，其次文章使用发布日期；其余情况使用来源文件的提交时间
+            seeded = self.seed.get(page_url(lang, route.path)) if stored is None else None
+            if seeded:
+                lastmod = seeded
+            elif stored is None and version.published:
+                lastmod = version.published
+            else:
+                lastmod = version.modified
+            self.changed += 1
+        self._seen.setdefault(route.path, {})[lang] = {'hash': version.digest, 'lastmod': lastmod}
+        return lastmod
+
+    def save(self) -> bool:
+        """写回清单，返回是否实际写入"""
+        if self.path is None or self._seen == self.entries:
+            return False
+        tmp_file = self.path.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': LASTMOD_MANIFEST_VERSION, 'pages': self._seen}, f,
+                      ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_file, self.path)
+        self.entries = self._seen
+        return True
+
+
+def generate_url_entry(path: str, priority: str = '0.8', changefreq: str = 'monthly',
+                       locales: Optional[Sequence[str]] = None, lastmod: Optional[str] = None,
+                       lang: Optional[str] = None, alternates: Optional[str] = None,
+                       images: Sequence[Tuple[str, Optional[str]]] = ()) -> str:
+    """
+    生成页面某一语言版本的 URL 条目（未指定 lang 时为默认语言版本，未指定 lastmod 时使用当前时间）。
+    alternates 为 generate_hreflang_links 预先生成的备用链接块，省略时按 locales 现场生成；
+    images 为该语言版本引用的 (图片 URL, 说明)。
+    """
+    locales = locales or LANGUAGES
+    main_url = page_url(lang or main_locale(locales), path)
+    hreflang_links = alternates if alternates is not None else generate_hreflang_links(path, locales)
+    if images:
+        hreflang_links += '\n' + generate_image_entries(images)
+
     # 使用完整的 ISO 8601 格式（包含时间）
-    lastmod = datetime.now().strftime('%Y-%m-%dT%H:%M:%S+00:00')
-    
+    lastmod = lastmod or datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
     return f'''  <url>
     <loc>{main_url}</loc>
 {hreflang_links}
@@ -76,40 +678,175 @@ def generate_url_entry(path: str, priority: str = '0.8', changefreq: str = 'mont
     <priority>{priority}</priority>
   </url>'''
 
-def main():
-    sitemap_content = '''<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
-        xmlns:xhtml="http://www.w3.org/1999/xhtml">
-'''
-    
-    # 主要页面
-    priorities = {
-        '/': '1.0',
-        '/about': '0.9',
-        '/contact': '0.8',
-        '/products': '0.9',
-        '/faq': '0.8',
-        '/products/nexus-dx1': '0.9',
-        '/products/msqa-100': '0.9',
-        '/products/sqa-6100vet': '0.9',
-    }
-    
-    for page in PAGES:
-        priority = priorities.get(page, '0.8')
-        sitemap_content += generate_url_entry(page, priority) + '\n'
-    
-    # FAQ 文章
-    for slug in FAQ_SLUGS:
-        path = f'/faq/{slug}'
-        sitemap_content += generate_url_entry(path, '0.7') + '\n'
-    
-    sitemap_content += '</urlset>\n'
-    
-    # 写入文件
-    with open('sitemap.xml', 'w', encoding='utf-8') as f:
-        f.write(sitemap_content)
-    
-    print("sitemap.xml 已生成，包含所有18种语言的 hreflang 链接")
+class SitemapWriter:
+    """
+    流式 sitemap 写入器：每个 <url> 条目直接写入文件句柄，不在内存中拼接整个文档。
+    当前分片的 URL 数或未压缩字节数即将超出上限时，结束该分片并开始 sitemap-<N>.xml。
+    关闭时只有一个分片则重命名为 sitemap.xml；多个分片时另外写出 sitemap_index.xml。
+    所有文件先写入 .tmp 临时文件，关闭时与已有文件逐字节比较，相同则保留原文件不重写。
+    gzip 输出的文件头不含时间戳，内容相同时输出的字节也相同。
+    """
+
+    def __init__(self, output_dir: Path = Path('.'), base_url: str = BASE_URL, gzip_output: bool = False,
+                 max_urls: int = MAX_URLS_PER_SITEMAP, max_bytes: int = MAX_SITEMAP_BYTES):
+        self.output_dir = Path(output_dir)
+        self.base_url = base_url
+        self.suffix = '.xml.gz' if gzip_output else '.xml'
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.shards: List[Path] = []
+        # 每个分片中最新的 lastmod（写入 sitemap_index.xml）
+        self.shard_lastmods: List[Optional[str]] = []
+        # 关闭后实际生成的文件（多个分片时最后一个是 sitemap_index.xml）
+        self.files: List[Path] = []
+        # 其中内容与已有文件完全相同、未重写的文件
+        self.unchanged: List[Path] = []
+        self.urls = 0
+        self._raw: Optional[BinaryIO] = None
+        self._file: Optional[BinaryIO] = None
+        self._shard_urls = 0
+        self._shard_bytes = 0
+
+    def _open_shard(self) -> None:
+        path = self.output_dir / f'sitemap-{len(self.shards) + 1}{self.suffix}'
+        self._raw = open(self._tmp(path), 'wb')
+        self._file = gzip.GzipFile(fileobj=self._raw, mode='wb', mtime=0) if self.suffix.endswith('.gz') \
+            else self._raw
+        self.shards.append(path)
+        self.shard_lastmods.append(None)
+        self._file.write(URLSET_HEADER)
+        self._shard_urls = 0
+        self._shard_bytes = len(URLSET_HEADER)
+
+    def _close_shard(self) -> None:
+        self._file.write(URLSET_FOOTER)
+        if self._file is not self._raw:
+            self._file.close()
+        self._raw.close()
+        self._file = self._raw = None
+
+    @staticmethod
+    def _tmp(path: Path) -> Path:
+        return path.with_name(path.name + '.tmp')
+
+    def _commit(self, path: Path, target: Path) -> Path:
+        """将临时文件替换为 target；target 内容完全相同时丢弃临时文件"""
+        tmp_file = self._tmp(path)
+        if target.is_file() and filecmp.cmp(tmp_file, target, shallow=False):
+            os.remove(tmp_file)
+            self.unchanged.append(target)
+        else:
+            os.replace(tmp_file, target)
+        return target
+
+    def write(self, entry: str, lastmod: Optional[str] = None) -> None:
+        """写入一个 <url> 条目（generate_url_entry 的输出）及其 lastmod"""
+        data = entry.encode('utf-8') + b'\n'
+        if self._file is None:
+            self._open_shard()
+        elif (self._shard_urls >= self.max_urls
+              or self._shard_bytes + len(data) + len(URLSET_FOOTER) > self.max_bytes):
+            self._close_shard()
+            self._open_shard()
+        self._file.write(data)
+        if lastmod and (self.shard_lastmods[-1] is None or lastmod > self.shard_lastmods[-1]):
+            self.shard_lastmods[-1] = lastmod
+        self._shard_urls += 1
+        self._shard_bytes += len(data)
+        self.urls += 1
+
+    def _write_index(self) -> Path:
+        path = self.output_dir / INDEX_FILE
+        with open(self._tmp(path), 'wb') as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                    b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+            for shard, lastmod in zip(self.shards, self.shard_lastmods):
+                f.write(f'  <sitemap>\n    <loc>{self.base_url}/{shard.name}</loc>\n'.encode('utf-8'))
+                if lastmod:
+                    f.write(f'    <lastmod>{lastmod}</lastmod>\n'.encode('utf-8'))
+                f.write(b'  </sitemap>\n')
+            f.write(b'</sitemapindex>\n')
+        return self._commit(path, path)
+
+    def close(self) -> List[Path]:
+        """结束写入，返回生成的文件，并删除上次生成、本次已不需要的分片与索引"""
+        if self._file is None and not self.shards:
+            self._open_shard()  # 没有任何条目时仍输出一个空的 urlset
+        if self._file is not None:
+            self._close_shard()
+        if len(self.shards) == 1:
+            self.files = [self._commit(self.shards[0], self.output_dir / f'sitemap{self.suffix}')]
+            self.shards = []
+            stale = {INDEX_FILE}
+        else:
+            self.files = [self._commit(shard, shard) for shard in self.shards] + [self._write_index()]
+            stale = {f'sitemap{self.suffix}'}
+        written = {path.name for path in self.files}
+        for name in os.listdir(self.output_dir):
+            if name not in written and (name in stale or SHARD_RE.match(name)):
+                os.remove(self.output_dir / name)
+        return self.files
+
+    def __enter__(self) -> 'SitemapWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            if self._file is not None:
+                self._close_shard()
+            for shard in self.shards:
+                if self._tmp(shard).exists():
+                    os.remove(self._tmp(shard))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='生成包含各语言 hreflang 的 sitemap（超出协议上限时自动分片）')
+    parser.add_argument('--output-dir', type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help=f'输出目录，不能是 npm run build:sitemap 的输出目录 (默认: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--gzip', action='store_true', help='输出 gzip 压缩的 .xml.gz 文件')
+    parser.add_argument('--max-urls', type=int, default=MAX_URLS_PER_SITEMAP,
+                        help=f'每个 sitemap 文件的最大 URL 数 (默认: {MAX_URLS_PER_SITEMAP})')
+    parser.add_argument('--no-images', action='store_true', help='不输出 <image:image> 条目')
+    parser.add_argument('--seed-from', type=Path, metavar='SITEMAP',
+                        help='已发布的 sitemap；清单中没有的 URL 沿用其中的 lastmod（如 sitemap.xml）')
+    args = parser.parse_args(argv)
+    if args.output_dir.resolve() in {path.resolve() for path in BUILD_SITEMAP_DIRS}:
+        parser.error(f'{args.output_dir} 中的 sitemap.xml 由 scripts/generate-sitemap.ts 生成，请使用其他输出目录')
+
+    routes = discover_routes()
+    images, missing_images = ({}, []) if args.no_images else page_images(build_image_index())
+    seed = load_published_lastmods(args.seed_from) if args.seed_from else None
+    manifest = LastmodManifest(LASTMOD_MANIFEST, seed)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    with SitemapWriter(args.output_dir, gzip_output=args.gzip, max_urls=args.max_urls) as writer:
+        for route in routes:
+            priority, changefreq = page_priority_and_changefreq(route.path)
+            alternates = generate_hreflang_links(route.path, route.locales)
+            for lang in route.locales:
+                lastmod = manifest.lastmod(route, lang)
+                writer.write(generate_url_entry(route.path, priority, changefreq, locales=route.locales,
+                                                lastmod=lastmod, lang=lang, alternates=alternates,
+                                                images=images.get((route.path, lang), ())), lastmod)
+    manifest_saved = manifest.save()
+
+    articles = sum(1 for route in routes if route.kind == 'article')
+    written = [str(path) for path in writer.files if path not in writer.unchanged]
+    unchanged = [str(path) for path in writer.unchanged]
+    if written:
+        print(f"已生成 {', '.join(written)}：{len(routes) - articles} 个页面，"
+              f"{articles} 篇文章，共 {writer.urls} 个语言版本 URL（含 hreflang 与 x-default）")
+    if images:
+        print(f"图片: {len({url for refs in images.values() for url, _ in refs})} 张，"
+              f"{sum(len(refs) for refs in images.values())} 处引用")
+    if missing_images:
+        print(f"警告: {len(missing_images)} 张被引用的图片在 public/ 中不存在，已跳过: "
+              f"{', '.join(missing_images[:5])}{' ...' if len(missing_images) > 5 else ''}")
+    if unchanged:
+        print(f"内容未变化，未重写: {', '.join(unchanged)}")
+    if manifest_saved:
+        print(f"lastmod 清单已更新: {LASTMOD_MANIFEST}（{manifest.changed} 个页面语言版本的内容有变化）")
 
 if __name__ == '__main__':
     main()
@@ -4,9 +4,19 @@
 生成翻译审计摘要报告
 """
 
+import argparse
 import json
 import sys
 from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from audit_report import TRANSLATION_ISSUE_FIELDS, iter_records, translation_records
+
+# 可选依赖：安装 ijson 后可按事件流读取嵌套 JSON 报告，无需整体加载
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # 设置输出编码为 UTF-8
 if sys.platform == 'win32':
@@ -14,79 +24,182 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+REPORT_FILE = Path('translation_audit_report.json')
+REPORT_STREAM_FILE = Path('translation_audit_report.jsonl')
+SUMMARY_FILE = Path('translation_audit_summary.json')
+
+# 计数字段（顺序即摘要输出顺序）
+ISSUE_FIELDS = ['missing_keys', 'placeholder_issues', 'html_tag_issues', 'structure_issues']
+STAT_FIELDS = ISSUE_FIELDS + ['files_missing', 'json_errors']
+
+# 记录类型 -> 计数字段
+RECORD_FIELDS = {'missing_key': 'missing_keys', **TRANSLATION_ISSUE_FIELDS}
+
+class SummaryAggregator:
+    """
+    单遍聚合翻译审计结果，只保留 (文件, 语言) 级别的计数，不保留问题列表。
+    事件顺序无关：状态字段可以在问题之前或之后出现（嵌套 JSON 中 file_exists 位于列表之后）。
+    """
+    
+    def __init__(self):
+        # {文件: {语言: {'file_exists': bool, 'json_error': bool, 计数字段: int}}}
+        self.pairs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    
+    def _pair(self, filename: str, lang: str) -> Dict[str, Any]:
+        file_pairs = self.pairs.setdefault(filename, {})
+        pair = file_pairs.get(lang)
+        if pair is None:
+            pair = file_pairs[lang] = {'file_exists': False, 'json_error': False}
+            for field in ISSUE_FIELDS:
+                pair[field] = 0
+        return pair
+    
+    def add_pair(self, filename: str, lang: str) -> None:
+        self._pair(filename, lang)
+    
+    def set_status(self, filename: str, lang: str, field: str, value: Any) -> None:
+        pair = self._pair(filename, lang)
+        if field == 'file_exists':
+            pair['file_exists'] = bool(value)
+        elif field == 'json_error':
+            pair['json_error'] = True
+    
+    def add_issues(self, filename: str, lang: str, field: str, count: int = 1) -> None:
+        self._pair(filename, lang)[field] += count
+    
+    def feed_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        """消费 audit_report 格式的 JSONL 记录"""
+        for record in records:
+            record_type = record.get('record')
+            if record_type == 'pair':
+                filename, lang = record['file'], record['locale']
+                self.add_pair(filename, lang)
+                for field in ('file_exists', 'json_error'):
+                    if field in record:
+                        self.set_status(filename, lang, field, record[field])
+            elif record_type in RECORD_FIELDS:
+                self.add_issues(record['file'], record['locale'], RECORD_FIELDS[record_type])
+    
+    def feed_json_events(self, events: Iterable) -> None:
+        """
+        消费 ijson.basic_parse 事件流（嵌套 JSON 报告 {文件: {语言: 结果}}）。
+        文件名本身包含 '.'，因此不使用 ijson 的点分前缀，而是自行维护容器栈。
+        """
+        stack = []  # 每层为 [容器类型, 当前键]
+        for event, value in events:
+            if event == 'map_key':
+                stack[-1][1] = value
+                continue
+            if event in ('end_map', 'end_array'):
+                stack.pop()
+                continue
+            
+            # 值开始：在 {文件: {语言: {字段: [...]}}} 的第 4 层数组中每出现一个值计数一次
+            depth = len(stack)
+            if depth == 2 and event == 'start_map':
+                self.add_pair(stack[0][1], stack[1][1])
+            elif depth == 3 and stack[2][0] == 'map' and stack[2][1] in ('file_exists', 'json_error'):
+                self.set_status(stack[0][1], stack[1][1], stack[2][1], value)
+            elif depth == 4 and stack[3][0] == 'array' and stack[2][1] in ISSUE_FIELDS:
+                self.add_issues(stack[0][1], stack[1][1], stack[2][1])
+            
+            if event == 'start_map':
+                stack.append(['map', None])
+            elif event == 'start_array':
+                stack.append(['array', None])
+    
+    def summary(self) -> Dict[str, Any]:
+        """生成只含计数的摘要：总计、按文件、按文件 × 语言"""
+        totals = {field: 0 for field in STAT_FIELDS}
+        files = {}
+        total_languages = 0
+        
+        for filename, file_pairs in self.pairs.items():
+            file_totals = {field: 0 for field in STAT_FIELDS}
+            locales = {}
+            for lang, pair in file_pairs.items():
+                total_languages += 1
+                counts = {field: 0 for field in STAT_FIELDS}
+                if not pair['file_exists']:
+                    counts['files_missing'] = 1
+                elif pair['json_error']:
+                    counts['json_errors'] = 1
+                else:
+                    for field in ISSUE_FIELDS:
+                        counts[field] = pair[field]
+                for field in STAT_FIELDS:
+                    file_totals[field] += counts[field]
+                    totals[field] += counts[field]
+                locales[lang] = counts
+            files[filename] = {'totals': file_totals, 'locales': locales}
+        
+        return {
+            'files_checked': len(self.pairs),
+            'language_files': total_languages,
+            'totals': totals,
+            'files': files,
+        }
+
+def _stream_is_current() -> bool:
+    """JSONL 流存在且不比嵌套 JSON 报告旧（旧版审计脚本只更新 JSON 时，JSONL 已过时）"""
+    if not REPORT_STREAM_FILE.exists():
+        return False
+    if not REPORT_FILE.exists():
+        return True
+    return REPORT_STREAM_FILE.stat().st_mtime_ns >= REPORT_FILE.stat().st_mtime_ns
+
+def aggregate_report() -> Dict[str, Any]:
+    """
+    单遍聚合审计报告：
+    读取 JSONL 流与嵌套 JSON 中较新的一个（由 JSONL 转换出的 JSON 与其修改时间相同，此时读取 JSONL）；
+    嵌套 JSON 在安装了 ijson 时按事件流读取，否则整体加载。
+    """
+    aggregator = SummaryAggregator()
+    if _stream_is_current():
+        aggregator.feed_records(iter_records(REPORT_STREAM_FILE))
+    elif ijson is not None:
+        with open(REPORT_FILE, 'rb') as f:
+            aggregator.feed_json_events(ijson.basic_parse(f))
+    else:
+        with open(REPORT_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for filename, file_results in data.items():
+            for lang, results in file_results.items():
+                aggregator.feed_records(translation_records(filename, lang, results))
+    return aggregator.summary()
+
 def main():
-    report_file = Path('translation_audit_report.json')
+    parser = argparse.ArgumentParser(description='生成翻译审计摘要报告')
+    parser.add_argument(
+        '--summary-json',
+        type=Path,
+        default=SUMMARY_FILE,
+        help=f'只含计数的机器可读摘要输出路径 (默认: {SUMMARY_FILE})',
+    )
+    args = parser.parse_args()
     
-    if not report_file.exists():
+    if not REPORT_STREAM_FILE.exists() and not REPORT_FILE.exists():
         print("Error: translation_audit_report.json not found. Please run check_translations.py first.")
         return
     
-    with open(report_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    summary = aggregate_report()
+    with open(args.summary_json, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
     
     print("=" * 80)
     print("Translation Audit Summary Report")
     print("=" * 80)
     print()
     
-    total_files = len(data)
-    total_languages = 0
-    total_issues = {
-        'missing_keys': 0,
-        'placeholder_issues': 0,
-        'html_tag_issues': 0,
-        'files_missing': 0,
-        'json_errors': 0
-    }
-    
-    files_with_issues = []
-    
-    for filename, file_results in data.items():
-        file_has_issues = False
-        file_stats = {
-            'missing_keys': 0,
-            'placeholder_issues': 0,
-            'html_tag_issues': 0,
-            'files_missing': 0,
-            'json_errors': 0
-        }
-        
-        for lang, results in file_results.items():
-            total_languages += 1
-            
-            if not results.get('file_exists'):
-                file_stats['files_missing'] += 1
-                total_issues['files_missing'] += 1
-                file_has_issues = True
-                continue
-            
-            if 'json_error' in results:
-                file_stats['json_errors'] += 1
-                total_issues['json_errors'] += 1
-                file_has_issues = True
-                continue
-            
-            missing_count = len(results.get('missing_keys', []))
-            placeholder_count = len(results.get('placeholder_issues', []))
-            html_count = len(results.get('html_tag_issues', []))
-            
-            if missing_count > 0:
-                file_stats['missing_keys'] += missing_count
-                total_issues['missing_keys'] += missing_count
-                file_has_issues = True
-            
-            if placeholder_count > 0:
-                file_stats['placeholder_issues'] += placeholder_count
-                total_issues['placeholder_issues'] += placeholder_count
-                file_has_issues = True
-            
-            if html_count > 0:
-                file_stats['html_tag_issues'] += html_count
-                total_issues['html_tag_issues'] += html_count
-                file_has_issues = True
-        
-        if file_has_issues:
-            files_with_issues.append((filename, file_stats))
+    total_files = summary['files_checked']
+    total_languages = summary['language_files']
+    total_issues = summary['totals']
+    
+    files_with_issues = [
+        (filename, file_summary['totals'])
+        for filename, file_summary in summary['files'].items()
+        if any(file_summary['totals'].values())
+    ]
     
     # 总体统计
     print("OVERALL STATISTICS")
@@ -98,12 +211,14 @@ def main():
     print(f"  - Missing keys: {total_issues['missing_keys']}")
     print(f"  - Placeholder issues: {total_issues['placeholder_issues']}")
     print(f"  - HTML tag issues: {total_issues['html_tag_issues']}")
+    print(f"  - Structure issues: {total_issues['structure_issues']}")
     print(f"  - Missing files: {total_issues['files_missing']}")
     print(f"  - JSON errors: {total_issues['json_errors']}")
     print()
     
     if total_issues['missing_keys'] == 0 and total_issues['placeholder_issues'] == 0 and \
-       total_issues['html_tag_issues'] == 0 and total_issues['files_missing'] == 0 and \
+       total_issues['html_tag_issues'] == 0 and total_issues['structure_issues'] == 0 and \
+       total_issues['files_missing'] == 0 and \
        total_issues['json_errors'] == 0:
         print("=" * 80)
         print("[SUCCESS] ALL CHECKS PASSED!")
@@ -113,6 +228,7 @@ def main():
         print("  [OK] Have all required keys")
         print("  [OK] Preserve all placeholders correctly")
         print("  [OK] Preserve all HTML tags correctly")
+        print("  [OK] Keep tag order, nesting and ICU arguments intact")
         print("  [OK] Are valid JSON files")
     else:
         print("=" * 80)
@@ -130,6 +246,8 @@ def main():
                     print(f"    - {stats['placeholder_issues']} placeholder issues")
                 if stats['html_tag_issues'] > 0:
                     print(f"    - {stats['html_tag_issues']} HTML tag issues")
+                if stats['structure_issues'] > 0:
+                    print(f"    - {stats['structure_issues']} structure issues")
                 if stats['files_missing'] > 0:
                     print(f"    - {stats['files_missing']} missing files")
                 if stats['json_errors'] > 0:
@@ -138,6 +256,7 @@ def main():
     print()
     print("=" * 80)
     print("For detailed information, see: translation_audit_report.json")
+    print(f"Machine-readable summary: {args.summary_json}")
     print("=" * 80)
 
 if __name__ == '__main__':
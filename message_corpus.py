@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享消息语料缓存
+所有审计脚本通过本模块读取 messages/ 下的 JSON 文件：
+1. 同一进程内每个文件只解析一次，解析结果在各审计之间共享
+2. 以 (mtime, size) 为键在磁盘上持久化缓存，重复运行时只重新解析变更过的文件
+3. 提供一次遍历的扁平化索引 {点分键: 值}，键名经过驻留，在所有语言之间共享
+4. 源码文本（app/、components/、styles.css 等）同样按签名在进程内缓存，供各审计共享
+
+注意：返回的解析树是共享对象，调用方不得修改。
+"""
+
+import atexit
+import json
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from audit_profile import count
+
+# 磁盘缓存位置（相对于仓库根目录，已加入 .gitignore）
+CACHE_DIR = Path(__file__).resolve().parent / '.cache'
+CACHE_FILE = CACHE_DIR / 'message_corpus.pickle'
+
+# 缓存格式版本，格式变化时递增以丢弃旧缓存
+CACHE_VERSION = 1
+
+Signature = Tuple[int, int]
+
+
+class FlatMessages(NamedTuple):
+    """扁平化后的消息树"""
+    # 所有键路径（列表内对象的键沿用列表所在的路径，不带下标）
+    keys: FrozenSet[str]
+    # 仅经由字典可达的叶子值（列表内的值无法按键路径定位，不包含在内）
+    leaves: Dict[str, Any]
+
+
+def flatten_messages(obj: Any) -> FlatMessages:
+    """一次遍历生成键集合与 {点分键: 叶子值} 映射"""
+    keys = set()
+    leaves = {}
+    intern = sys.intern
+
+    def walk(node: Any, prefix: str, addressable: bool) -> None:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                full_key = intern(f"{prefix}.{key}" if prefix else key)
+                keys.add(full_key)
+                if isinstance(value, (dict, list)):
+                    walk(value, full_key, addressable)
+                elif addressable:
+                    leaves[full_key] = value
+        elif isinstance(node, list):
+            for item in node:
+                if isinstance(item, (dict, list)):
+                    walk(item, prefix, False)
+
+    walk(obj, '', True)
+    return FlatMessages(frozenset(keys), leaves)
+
+
+def file_signature(path: Path) -> Signature:
+    """返回文件的 (mtime_ns, size) 签名"""
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_size)
+
+
+class MessageCorpus:
+    """按文件签名缓存的 JSON 语料"""
+
+    def __init__(self, cache_file: Optional[Path] = CACHE_FILE):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._entries: Dict[str, Tuple[Signature, Any]] = {}
+        self._flat: Dict[str, Tuple[Signature, FlatMessages]] = {}
+        self._texts: Dict[str, Tuple[Signature, str]] = {}
+        self._dirty = False
+        self.stats = {'hits': 0, 'parsed': 0}
+        self._load_cache()
+
+    def _load_cache(self) -> None:
+        """读取磁盘缓存，缓存损坏或版本不符时直接忽略"""
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception:
+            return
+        if isinstance(payload, dict) and payload.get('version') == CACHE_VERSION:
+            self._entries = payload.get('entries', {})
+
+    def load(self, path: Path) -> Any:
+        """
+        加载并解析 JSON 文件。
+        文件不存在时抛出 FileNotFoundError，JSON 无效时抛出 json.JSONDecodeError，
+        与直接 json.load 的行为一致。允许 UTF-8 BOM。
+        """
+        path = Path(path)
+        key = os.path.abspath(path)
+        signature = file_signature(path)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            self.stats['hits'] += 1
+            return entry[1]
+
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            data = json.load(f)
+        count('files_read')
+        count('bytes_parsed', signature[1])
+
+        self._entries[key] = (signature, data)
+        self._dirty = True
+        self.stats['parsed'] += 1
+        return data
+
+    def load_flat(self, path: Path) -> FlatMessages:
+        """加载 JSON 文件并返回其扁平化索引（进程内缓存）"""
+        key = os.path.abspath(path)
+        data = self.load(path)
+        signature = self._entries[key][0]
+
+        entry = self._flat.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        flat = flatten_messages(data)
+        self._flat[key] = (signature, flat)
+        return flat
+
+    def load_text(self, path: Path) -> str:
+        """读取源码文本（进程内缓存，不写入磁盘缓存）"""
+        path = Path(path)
+        key = os.path.abspath(path)
+        signature = file_signature(path)
+
+        entry = self._texts.get(key)
+        if entry is not None and entry[0] == signature:
+            self.stats['hits'] += 1
+            return entry[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        count('files_read')
+        count('bytes_parsed', signature[1])
+        self._texts[key] = (signature, text)
+        return text
+
+    def save(self) -> None:
+        """将缓存写回磁盘（仅在有新解析结果时写入）"""
+        if not self._dirty or not self.cache_file:
+            return
+        # 丢弃已被删除的文件
+        entries = {k: v for k, v in self._entries.items() if os.path.exists(k)}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({'version': CACHE_VERSION, 'entries': entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+        except OSError:
+            # 缓存写入失败不影响审计结果
+            pass
+
+
+_corpus: Optional[MessageCorpus] = None
+
+
+def get_corpus() -> MessageCorpus:
+    """获取进程级共享语料实例，进程退出时自动保存磁盘缓存"""
+    global _corpus
+    if _corpus is None:
+        _corpus = MessageCorpus()
+        atexit.register(_corpus.save)
+    return _corpus
+
+
+def reset_corpus(cache_file: Optional[Path] = CACHE_FILE) -> MessageCorpus:
+    """替换进程级共享语料（基准测试等场景用于冷启动；cache_file 为 None 时不读写磁盘缓存）"""
+    global _corpus
+    _corpus = MessageCorpus(cache_file)
+    if cache_file:
+        atexit.register(_corpus.save)
+    return _corpus
+
+
+def load_messages(path: Path) -> Any:
+    """通过共享语料加载 JSON 文件"""
+    return get_corpus().load(path)
+
+
+def load_flat_messages(path: Path) -> FlatMessages:
+    """通过共享语料加载 JSON 文件的扁平化索引"""
+    return get_corpus().load_flat(path)
+
+
+def load_text(path: Path) -> str:
+    """通过共享语料读取源码文本"""
+    return get_corpus().load_text(path)
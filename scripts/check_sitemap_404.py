@@ -1,88 +1,1453 @@
 #!/usr/bin/env python3
 """
 解析 sitemap.xml 中的所有 URL，并批量检查它们是否返回 404。
+
+sitemap index 中的子 sitemap 并发抓取（限制递归深度，已访问的 sitemap 不重复抓取以避免循环），
+每个 sitemap 边下载边解析，解析出的 URL 立即交给检查引擎，检查与 sitemap 的下载/解析重叠进行；
+已发现但未检查完的 URL 数有上限，检查跟不上时暂停读取 sitemap。
+
+检查结果按 URL 持久化缓存在 .cache/sitemap_check_cache.json（ETag / Last-Modified / 状态码）：
+默认每个 URL 都发送条件请求（If-None-Match / If-Modified-Since），304 时沿用缓存的状态码；
+指定 --cache-ttl 时，TTL 内的 URL 直接沿用上次结果而不发出请求（输出中会标明）。
+缓存按最近使用淘汰，--fresh 忽略已有缓存。
+
+--hreflang 模式下同时检查 <xhtml:link rel="alternate"> 中的全部备用语言 URL（与页面 URL 统一去重，
+在同一个并发池中检查，每个 URL 只请求一次），并验证互链：每个备用页面都应回链到声明它的页面。
+回链关系优先取自备用页面 HTML 中的 <link rel="alternate" hreflang>，取不到时以 sitemap 中的声明为准。
+
+检查引擎：
+- threads（默认）: ThreadPoolExecutor + requests，每个线程复用一个带连接池与重试/退避的 Session，
+                  汇总中显示新建与复用的连接数
+- async:          asyncio + httpx，使用带连接池的 keep-alive 客户端（安装 h2 时启用 HTTP/2），
+                  全局并发数与每个主机的连接数分别可配置
+
+两种引擎的并发都由 AIMD 自适应控制：正常响应时逐步增加并发窗口，遇到 429/503、超时或延迟明显上升时减半；
+限流响应的 Retry-After 期间暂停发出新请求，之后重试被限流的 URL。汇总中显示有效请求速率与窗口变化。
+
+每个 URL 记录重定向链、TTFB、总耗时与响应大小；汇总中显示 p50/p95/p99 延迟、最慢的 URL 与重定向链长度，
+可用 --timings-json / --timings-csv 导出，便于跨部署对比。
+
+结果可用 --output 逐条写出为 JSON / JSONL / JUnit XML；--fail-on / --warn-on 按状态码、状态码段、
+timeout、error、hreflang 决定哪些结果导致退出码 1、哪些只报告警告。
+
+离线模式（--static-dir out/）：不访问网络，按静态托管的规则（末尾斜杠、index.html）在导出目录中解析
+全部 URL 与 hreflang 备用 URL，目录只扫描一次，适合在部署前的 CI 中运行。
 """
 
 import argparse
+import asyncio
+import codecs
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import math
+import os
+import queue
+import re
 import sys
+import threading
+import time
 import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from urllib.parse import urljoin
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator
+from urllib.parse import unquote, urljoin, urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# 共享的审计统计模块位于仓库根目录
+sys.path.insert(0, str(REPO_ROOT))
+from audit_profile import add_profile_arguments, configure, count, finish, section, thread_initializer  # noqa: E402
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError
+    from urllib3.util.retry import Retry
 except ImportError:
     print("请先安装 requests: pip install requests")
     sys.exit(1)
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 # Sitemap XML 命名空间
 SITEMAP_NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+XHTML_NS = "http://www.w3.org/1999/xhtml"
+
+# iterparse 中使用的完整标签名（也接受无命名空间的 sitemap）
+LOC_TAGS = {f"{{{SITEMAP_NS['sm']}}}loc", "loc"}
+XHTML_LINK_TAG = f"{{{XHTML_NS}}}link"
+ENTRY_TAGS = {
+    f"{{{SITEMAP_NS['sm']}}}url": "url",
+    "url": "url",
+    f"{{{SITEMAP_NS['sm']}}}sitemap": "sitemap",
+    "sitemap": "sitemap",
+}
+
+# 检查结果缓存（.cache/ 已加入 .gitignore）
+CACHE_FILE = REPO_ROOT / ".cache" / "sitemap_check_cache.json"
+CACHE_VERSION = 1
+
+GZIP_MAGIC = b"\x1f\x8b"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 提取 <link rel="alternate"> 时最多读取的 HTML 字节数（通常在 <head> 内即可读完）
+HEAD_SCAN_LIMIT = 512 * 1024
 DEFAULT_SITEMAP_URL = "https://www.isperm.com/sitemap.xml"
 
+# 每个检查并发槽位允许排队的已发现 URL 数（超过时暂停读取 sitemap）
+PENDING_PER_WORKER = 4
+
+# 遇到这些状态码时由 urllib3 按退避策略重试（仅 HEAD / GET）
+RETRY_STATUSES = (500, 502, 504)
+# 限流状态码不交给 urllib3 重试，而是反馈给 AdaptiveLimiter 降低并发，按 Retry-After 暂停后再重试
+THROTTLE_STATUSES = (429, 503)
+# 未带 Retry-After 的限流响应默认暂停的秒数
+DEFAULT_RETRY_AFTER = 1.0
+# Retry-After 的上限，避免异常的响应头让检查长时间停住
+MAX_RETRY_AFTER = 120.0
+# 正常响应延迟基线的 EWMA 平滑系数
+LATENCY_EWMA_ALPHA = 0.2
+# 两次窗口减半之间的最短间隔（秒），实际取 max(该值, 基线延迟)
+MIN_DECREASE_INTERVAL = 0.1
+# 窗口接近上次被限流时的大小后，增长速度降为原来的 1/该值（每次越过都要付出一个 Retry-After 的暂停）
+CEILING_SLOWDOWN = 8
+
+
+class SessionPool:
+    """
+    每个线程一个 requests.Session（Session 本身不保证线程安全）。
+    每个 Session 挂载带连接池与重试/退避的 HTTPAdapter，同一线程内对同一主机的请求复用 keep-alive 连接。
+    """
+
+    def __init__(self, pool_size: int = 4, retries: int = 3, backoff: float = 0.5):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
+        self._sessions: list[requests.Session] = []
+        self._lock = threading.Lock()
+
+    def _create(self) -> requests.Session:
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"HEAD", "GET"}),
+            respect_retry_after_header=True,
+            # 重试用尽后返回最后一次的响应，由调用方按状态码报告
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def get(self) -> requests.Session:
+        """返回当前线程的 Session"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._create()
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def connection_stats(self) -> tuple[int, int]:
+        """返回 (新建连接数, 复用连接的请求数)，基于 urllib3 连接池的计数"""
+        created = requests_sent = 0
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            for adapter in {id(a): a for a in session.adapters.values()}.values():
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools[key]
+                    created += pool.num_connections
+                    requests_sent += pool.num_requests
+        return created, requests_sent - created
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+
+@dataclass(frozen=True)
+class SitemapEntry:
+    """
+    sitemap 中的一个条目：
+    - page:      <url> 中的 <loc>
+    - alternate: <url> 中 <xhtml:link rel="alternate"> 的 href（page 为所属页面）
+    - sitemap:   sitemap index 中的子 sitemap
+    """
+    kind: str
+    url: str
+    page: str | None = None
+    hreflang: str | None = None
+
+
+class _ChunkReader(io.RawIOBase):
+    """把响应的分块迭代器包装成可读的二进制流"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _maybe_gunzip(stream: BinaryIO) -> BinaryIO:
+    """按内容魔数识别 gzip（.xml.gz 或未声明 Content-Encoding 的压缩响应），返回解压后的流"""
+    buffered = stream if isinstance(stream, io.BufferedReader) else io.BufferedReader(stream)
+    if buffered.peek(2)[:2] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=buffered)
+    return buffered
 
-def fetch_sitemap(url: str) -> str:
-    """获取 sitemap 内容"""
+
+@contextmanager
+def open_sitemap(source: str, session: requests.Session | None = None, timeout: int = 30) -> Iterator[BinaryIO]:
+    """
+    以二进制流打开 sitemap，不把整个文档读入内存。
+    source 可以是 http(s) URL、file:// URL 或本地文件路径；gzip 压缩自动解压。
+    下载失败时抛出 requests.RequestException，本地文件不存在时抛出 OSError。
+    """
+    if urlsplit(source).scheme in ("http", "https"):
+        count("http_requests")
+        resp = (session or requests).get(source, timeout=timeout, stream=True)
+        try:
+            resp.raise_for_status()
+            # iter_content 已处理 Content-Encoding；.xml.gz 文件本身的压缩由 _maybe_gunzip 识别
+            yield _maybe_gunzip(_ChunkReader(resp.iter_content(STREAM_CHUNK_SIZE)))
+        finally:
+            resp.close()
+    else:
+        path = source[len("file://"):] if source.startswith("file://") else source
+        with open(path, "rb") as f:
+            yield _maybe_gunzip(f)
+
+
+def iter_sitemap_entries(stream: BinaryIO) -> Iterator[SitemapEntry]:
+    """
+    用 iterparse 流式解析 sitemap，逐个产出条目。
+    每个 <url> / <sitemap> 处理完后清空已解析的元素，内存占用与文档大小无关。
+    只识别 sitemap 命名空间（或无命名空间）的 <loc>，image:loc 等扩展不会被当作页面。
+    """
+    root = None
+    loc = None
+    alternates: list[tuple[str | None, str]] = []
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+
+        tag = elem.tag
+        if tag in LOC_TAGS:
+            loc = (elem.text or "").strip() or None
+        elif tag == XHTML_LINK_TAG:
+            href = (elem.get("href") or "").strip()
+            if elem.get("rel") == "alternate" and href:
+                alternates.append((elem.get("hreflang"), href))
+        elif tag in ENTRY_TAGS:
+            if loc:
+                # 兼容旧逻辑：以 .xml 结尾的 <loc> 同样视为子 sitemap
+                if ENTRY_TAGS[tag] == "sitemap" or loc.endswith((".xml", ".xml.gz")):
+                    yield SitemapEntry("sitemap", loc)
+                else:
+                    yield SitemapEntry("page", loc)
+                    for hreflang, href in alternates:
+                        yield SitemapEntry("alternate", href, page=loc, hreflang=hreflang)
+            loc = None
+            alternates = []
+            root.clear()
+
+
+class AlternateLinkParser(HTMLParser):
+    """从 HTML 中收集 <link rel="alternate" hreflang="..." href="...">，读到 </head> 或 <body> 即停止"""
+
+    def __init__(self, encoding: str | None = None):
+        super().__init__(convert_charrefs=True)
+        self.links: dict[str, str] = {}
+        self.done = False
+        self._size = 0
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed_bytes(self, chunk: bytes) -> bool:
+        """增量解析一个响应分块；返回 True 表示已无需继续读取（读完 <head> 或达到 HEAD_SCAN_LIMIT）"""
+        self.feed(self._decoder.decode(chunk))
+        self._size += len(chunk)
+        return self.done or self._size >= HEAD_SCAN_LIMIT
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "body":
+            self.done = True
+        elif tag == "link":
+            values = dict(attrs)
+            rel = (values.get("rel") or "").lower().split()
+            hreflang = values.get("hreflang")
+            href = (values.get("href") or "").strip()
+            if "alternate" in rel and hreflang and href:
+                self.links[hreflang] = href
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "head":
+            self.done = True
+
+
+def read_alternate_links(chunks: Iterator[bytes], encoding: str | None) -> dict[str, str]:
+    """增量解析 HTML 分块，返回 {hreflang: href}；最多读取 HEAD_SCAN_LIMIT 字节"""
+    parser = AlternateLinkParser(encoding)
+    for chunk in chunks:
+        if parser.feed_bytes(chunk):
+            break
+    return parser.links
+
+
+@dataclass
+class CheckResult:
+    """单个 URL 的检查结果"""
+    url: str
+    status: int | None = None
+    error: str | None = None
+    # 结果来自缓存时为 "fresh"（TTL 内未请求）或 "revalidated"（条件请求返回 304）
+    cache: str | None = None
+    # --hreflang 模式下从页面 HTML 中提取的 {hreflang: href}；未获取到时为 None
+    alternates: dict[str, str] | None = None
+    # 限流响应（429/503）的 Retry-After 秒数
+    retry_after: float | None = None
+    # 重定向链 [(状态码, URL)]，按跳转顺序，不含最终响应
+    redirects: list[tuple[int, str]] = field(default_factory=list)
+    # 跟随重定向后的最终 URL
+    final_url: str | None = None
+    # 从发出第一个请求到收到最终响应头的秒数（含全部重定向）
+    ttfb: float | None = None
+    # 从发出第一个请求到响应处理完毕的秒数；TTL 内的缓存命中与请求失败时为 None
+    elapsed: float | None = None
+    # 最终响应的 Content-Length（未声明时为 None）
+    size: int | None = None
+    # 请求失败的原因是超时（连接或读取）
+    timed_out: bool = False
+
+
+class CheckCache:
+    """
+    按 URL 持久化的检查结果缓存：{url: {status, etag, last_modified, checked_at[, alternates]}}。
+    条目按最近使用排序，保存时只保留最近使用的 max_entries 个。线程安全。
+    """
+
+    def __init__(self, path: Path = CACHE_FILE, ttl: float = 0, max_entries: int = 50000, fresh: bool = False):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"fresh": 0, "revalidated": 0, "stored": 0}
+        if not fresh:
+            self._load()
+
+    def _load(self) -> None:
+        """读取缓存文件，损坏或版本不符时直接忽略"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(payload, dict) and payload.get("version") == CACHE_VERSION:
+            self._entries = OrderedDict(payload.get("entries", {}))
+
+    def lookup(self, url: str, collect_links: bool = False) -> dict | None:
+        """返回可用的缓存条目；需要 HTML 回链信息而条目中没有时视为未缓存"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or (collect_links and "alternates" not in entry):
+                return None
+            self._entries.move_to_end(url)
+            return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return self.ttl > 0 and time.time() - entry["checked_at"] < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: dict | None) -> dict[str, str]:
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, url: str, entry: dict, kind: str) -> CheckResult:
+        """记录一次缓存命中并返回缓存的结果；revalidated 时刷新检查时间"""
+        with self._lock:
+            self.stats[kind] += 1
+            if kind == "revalidated":
+                entry["checked_at"] = time.time()
+        return CheckResult(url, entry["status"], cache=kind, alternates=entry.get("alternates"))
+
+    def store(self, url: str, status: int, headers, alternates: dict[str, str] | None = None) -> None:
+        """缓存最终状态码；限流与服务端错误不缓存，下次重新请求"""
+        if status == 429 or status >= 500:
+            return
+        entry = {
+            "status": status,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "checked_at": time.time(),
+        }
+        if alternates is not None:
+            entry["alternates"] = alternates
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            self.stats["stored"] += 1
+
+    def save(self) -> None:
+        """按 LRU 淘汰后写回磁盘（先写临时文件再替换）"""
+        with self._lock:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            payload = {"version": CACHE_VERSION, "entries": self._entries}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.path.with_suffix(".tmp")
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(payload, f)
+                os.replace(tmp_file, self.path)
+            except OSError:
+                # 缓存写入失败不影响检查结果
+                pass
+
+
+def _charset(content_type: str | None) -> str | None:
+    """从 Content-Type 中取出声明的字符集（未声明时返回 None，由调用方按 UTF-8 处理）"""
+    for part in (content_type or "").split(";")[1:]:
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "charset":
+            return value.strip("\"' ") or None
+    return None
+
+
+def _retry_after(value: str | None) -> float | None:
+    """解析 Retry-After 响应头（秒数或 HTTP 日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
     try:
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
-        return resp.text
-    except requests.RequestException as e:
-        raise SystemExit(f"获取 sitemap 失败: {e}")
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
 
+class AimdController:
+    """
+    AIMD（加性增、乘性减）并发窗口，只负责计算窗口，由线程与 asyncio 两种限流器共享：
+    - 正常响应：每完成约一个窗口的请求（约一个往返周期）窗口 +1，直到 maximum
+    - 429/503、超时/连接错误，或延迟超过基线 latency_factor 倍：窗口减半（不低于 minimum）；
+      同一往返周期内只减一次，避免同一批并发请求把窗口连续减到底
+    - 限流响应带 Retry-After（未带时按 DEFAULT_RETRY_AFTER）时，所有新请求暂停到指定时刻；
+      记住被限流时的窗口大小，之后窗口增长到该值附近时放慢增长
+    adaptive 为 False 时窗口固定为 maximum，仍然遵守 Retry-After 并统计请求速率。
+    调用方负责加锁（线程引擎在条件变量内调用，asyncio 引擎在单线程内调用）。
+    """
+
+    def __init__(self, maximum: int, adaptive: bool = True, latency_factor: float = 3.0, minimum: int = 1):
+        self.maximum = max(1, maximum)
+        self.minimum = min(max(1, minimum), self.maximum)
+        self.adaptive = adaptive
+        self.latency_factor = latency_factor
+        # 自适应时从上限的一半起步，由加性增长探测可用的并发
+        self.limit = float(max(self.minimum, self.maximum // 2) if adaptive else self.maximum)
+        # 响应延迟基线（EWMA），第一个正常响应之前为 None
+        self.baseline: float | None = None
+        # 在此时刻（time.monotonic）之前不发出新请求
+        self.pause_until = 0.0
+        # 最近一次被限流时的窗口大小
+        self.ceiling: int | None = None
+        self._last_decrease = 0.0
+        self._started: float | None = None
+        self._finished = 0.0
+        self.stats = {"requests": 0, "throttled": 0, "slow": 0, "decreases": 0, "lowest": int(self.limit)}
+
+    @property
+    def window(self) -> int:
+        """当前允许的在飞请求数"""
+        return max(self.minimum, int(self.limit))
+
+    def record(self, result: CheckResult, latency: float) -> None:
+        """根据一次请求的结果与耗时调整窗口；TTL 内的缓存命中没有发出请求，不计入"""
+        if result.cache == "fresh":
+            return
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now - latency
+        self._finished = now
+        self.stats["requests"] += 1
+
+        if result.status in THROTTLE_STATUSES:
+            self.stats["throttled"] += 1
+            pause = DEFAULT_RETRY_AFTER if result.retry_after is None else result.retry_after
+            self.pause_until = max(self.pause_until, now + min(pause, MAX_RETRY_AFTER))
+            throttled_at = self.window
+            if self._decrease(now):
+                self.ceiling = throttled_at
+            return
+        if result.error:
+            self._decrease(now)
+            return
+
+        slow = self.baseline is not None and latency > self.baseline * self.latency_factor
+        # 慢响应同样计入基线，服务端整体变慢后基线随之上移，窗口可以重新增长
+        self.baseline = latency if self.baseline is None else \
+            self.baseline + LATENCY_EWMA_ALPHA * (latency - self.baseline)
+        if slow:
+            self.stats["slow"] += 1
+            self._decrease(now)
+        elif self.adaptive:
+            step = 1 / self.limit
+            if self.ceiling is not None and self.limit + 1 >= self.ceiling:
+                step /= CEILING_SLOWDOWN
+            self.limit = min(float(self.maximum), self.limit + step)
+
+    def _decrease(self, now: float) -> bool:
+        """窗口减半；不在自适应模式或同一往返周期内已减过时返回 False"""
+        if not self.adaptive or now - self._last_decrease < max(MIN_DECREASE_INTERVAL, self.baseline or 0):
+            return False
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit / 2)
+        self.stats["decreases"] += 1
+        self.stats["lowest"] = min(self.stats["lowest"], self.window)
+        return True
+
+    def rate(self) -> float:
+        """有效请求速率（次/秒）：实际发出的请求数除以第一个请求开始到最后一个请求完成的时间"""
+        if self._started is None or self._finished <= self._started:
+            return 0.0
+        return self.stats["requests"] / (self._finished - self._started)
+
+
+class AdaptiveLimiter:
+    """线程引擎的限流器：在飞请求数不超过 AIMD 窗口，Retry-After 期间不发出新请求"""
+
+    def __init__(self, controller: AimdController):
+        self.controller = controller
+        self._cond = threading.Condition()
+        self._in_flight = 0
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                delay = self.controller.pause_until - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                elif self._in_flight < self.controller.window:
+                    break
+                else:
+                    self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, result: CheckResult, latency: float) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self.controller.record(result, latency)
+            self._cond.notify_all()
+
+
+class AsyncAdaptiveLimiter:
+    """asyncio 引擎的限流器，规则与 AdaptiveLimiter 相同"""
+
+    def __init__(self, controller: AimdController):
+        self.controller = controller
+        self._cond = asyncio.Condition()
+        self._in_flight = 0
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            while True:
+                delay = self.controller.pause_until - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                elif self._in_flight < self.controller.window:
+                    break
+                else:
+                    await self._cond.wait()
+            self._in_flight += 1
+
+    async def release(self, result: CheckResult, latency: float) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self.controller.record(result, latency)
+            self._cond.notify_all()
 
-def parse_urls_from_sitemap(xml_content: str, base_url: str) -> list[str]:
+
+def _finish_check(url: str, resp, entry: dict | None, cache: CheckCache | None,
+                  links: dict[str, str] | None, started: float, ttfb: float) -> CheckResult:
     """
-    从 sitemap XML 中解析出所有 URL。
-    支持 sitemap index（包含多个 sitemap）和普通 sitemap。
+    将最终响应（requests 或 httpx）转换为检查结果：304 沿用缓存的状态码，限流响应不缓存。
+    同时记录重定向链、TTFB、总耗时与响应大小。
     """
-    urls = []
-    root = ET.fromstring(xml_content)
+    if resp.status_code == 304 and entry is not None:
+        result = cache.hit(url, entry, "revalidated")
+    elif resp.status_code in THROTTLE_STATUSES:
+        result = CheckResult(url, resp.status_code, retry_after=_retry_after(resp.headers.get("Retry-After")))
+    else:
+        if cache:
+            cache.store(url, resp.status_code, resp.headers, links)
+        result = CheckResult(url, resp.status_code, alternates=links)
+    result.redirects = [(hop.status_code, str(hop.url)) for hop in resp.history]
+    result.final_url = str(resp.url)
+    result.ttfb = ttfb
+    result.elapsed = time.perf_counter() - started
+    length = resp.headers.get("Content-Length", "")
+    result.size = int(length) if length.isdigit() else None
+    return result
 
-    # 尝试带命名空间解析
-    for elem in root.iter():
-        tag = elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
-        if tag == "loc" and elem.text:
-            url = elem.text.strip()
-            if url and not url.endswith(".xml"):
-                urls.append(url)
-            elif url and url.endswith(".xml"):
-                # 这是 sitemap index 中的子 sitemap，递归获取
-                try:
-                    sub_content = fetch_sitemap(url)
-                    urls.extend(parse_urls_from_sitemap(sub_content, base_url))
-                except Exception as e:
-                    print(f"  警告: 无法获取子 sitemap {url}: {e}", file=sys.stderr)
 
-    return list(dict.fromkeys(urls))  # 去重
+def _is_timeout(error: requests.RequestException) -> bool:
+    """
+    判断请求是否因超时失败。Session 挂载了重试策略时，重试用尽的超时被 urllib3 包装成 MaxRetryError，
+    requests 再以 ConnectionError 抛出，需要检查其中的 reason。
+    """
+    if isinstance(error, requests.Timeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (ConnectTimeoutError, ReadTimeoutError))
 
 
-def check_url(url: str, timeout: int = 10) -> tuple[str, int | None, str | None]:
+def check_url(url: str, timeout: int = 10, session: requests.Session | None = None,
+              cache: CheckCache | None = None, collect_links: bool = False) -> CheckResult:
     """
     检查单个 URL 的 HTTP 状态码。
-    返回 (url, status_code, error_message)
-    先尝试 HEAD，若返回 405 则回退到 GET（部分服务器不支持 HEAD）
+    先尝试 HEAD，若返回 405 则回退到 GET（部分服务器不支持 HEAD）。
+    collect_links 为 True 时直接 GET，并从 HTML 中提取 <link rel="alternate">（一次请求同时得到状态码与回链）。
+    提供 cache 时：TTL 内直接返回缓存结果，否则发送条件请求，304 时沿用缓存的状态码。
     """
+    entry = cache.lookup(url, collect_links) if cache else None
+    if entry is not None and cache.is_fresh(entry):
+        return cache.hit(url, entry, "fresh")
+
+    http = session or requests
+    headers = CheckCache.conditional_headers(entry)
+    links = None
+    started = time.perf_counter()
     try:
-        resp = requests.head(url, timeout=timeout, allow_redirects=True)
-        if resp.status_code == 405:
-            resp = requests.get(url, timeout=timeout, allow_redirects=True, stream=True)
-        return (url, resp.status_code, None)
+        if collect_links:
+            count("http_requests")
+            with http.get(url, timeout=timeout, allow_redirects=True, stream=True, headers=headers) as resp:
+                ttfb = time.perf_counter() - started
+                if resp.status_code == 200:
+                    links = read_alternate_links(resp.iter_content(STREAM_CHUNK_SIZE),
+                                                 _charset(resp.headers.get("Content-Type")))
+        else:
+            count("http_requests")
+            resp = http.head(url, timeout=timeout, allow_redirects=True, headers=headers)
+            ttfb = time.perf_counter() - started
+            if resp.status_code == 405:
+                count("http_requests")
+                with http.get(url, timeout=timeout, allow_redirects=True, stream=True, headers=headers) as resp:
+                    # 只读取状态行；关闭响应以便连接回到连接池
+                    ttfb = time.perf_counter() - started
     except requests.RequestException as e:
-        return (url, None, str(e))
+        return CheckResult(url, error=str(e), timed_out=_is_timeout(e))
+
+    return _finish_check(url, resp, entry, cache, links, started, ttfb)
+
+
+class DiscoveryStopped(Exception):
+    """检查引擎已退出，sitemap 发现随之停止"""
+
+
+class DiscoveryWindow:
+    """
+    限制已发现但尚未检查完成的 URL 数：检查跟不上时，流式读取 sitemap 的线程在 acquire() 处等待，
+    内存占用不随 sitemap 大小增长。close() 之后 acquire() 抛出 DiscoveryStopped，发现线程随即退出。
+    """
+
+    def __init__(self, size: int):
+        self._slots = threading.Semaphore(max(size, 1))
+        self._closed = threading.Event()
+
+    def acquire(self) -> None:
+        while not self._closed.is_set():
+            if self._slots.acquire(timeout=0.1):
+                return
+        raise DiscoveryStopped
+
+    def release(self) -> None:
+        self._slots.release()
+
+    def close(self) -> None:
+        self._closed.set()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+
+@dataclass
+class CrawlResult:
+    """sitemap 发现结果"""
+    # 按发现顺序去重后的全部待检查 URL（--hreflang 时包含备用语言 URL）
+    urls: list[str] = field(default_factory=list)
+    # sitemap 中声明的备用语言 {页面 URL: {hreflang: 备用 URL}}（仅 --hreflang 时记录）
+    groups: dict[str, dict[str, str]] = field(default_factory=dict)
+
+
+@dataclass
+class ReciprocityIssue:
+    """页面声明了备用 URL，但备用页面没有回链到该页面"""
+    page: str
+    hreflang: str
+    alternate: str
+    # 判断依据："html"（备用页面的 <link rel="alternate">）或 "sitemap"（备用 URL 在 sitemap 中的声明）
+    basis: str
+
+
+def crawl(root_url: str, args: argparse.Namespace, sessions: SessionPool,
+          dispatch: Callable[[str], None] | None = None) -> CrawlResult:
+    """
+    从根 sitemap（URL 或本地文件）出发，并发流式抓取子 sitemap（深度不超过 args.max_depth，已访问的不再抓取）。
+    每解析出一个新 URL（去重后）立即在抓取线程中调用 dispatch，不等整个 sitemap 读完；
+    args.hreflang 为真时备用语言 URL 与页面 URL 统一去重后一起分发，并记录备用语言分组；否则忽略备用语言条目。
+    """
+    result = CrawlResult()
+    lock = threading.Lock()
+    discovered: dict[str, None] = {}
+    visited: set[str] = set()
+    # 已完成的抓取 (sitemap URL, future)；outstanding 为尚未处理完成事件的抓取数
+    finished: queue.Queue = queue.Queue()
+    outstanding = 0
+
+    def emit(url: str) -> None:
+        with lock:
+            if url in discovered:
+                return
+            discovered[url] = None
+        if dispatch is not None:
+            dispatch(url)
+
+    def fetch(url: str, depth: int) -> None:
+        with open_sitemap(url, sessions.get()) as stream:
+            for entry in iter_sitemap_entries(stream):
+                if entry.kind == "page":
+                    emit(entry.url)
+                elif entry.kind == "sitemap":
+                    submit(entry.url, depth + 1)
+                elif args.hreflang:
+                    # 备用语言分组只用于互链验证，未启用 --hreflang 时不保留
+                    with lock:
+                        result.groups.setdefault(entry.page, {})[entry.hreflang or ""] = entry.url
+                    emit(entry.url)
+
+    def submit(url: str, depth: int) -> None:
+        nonlocal outstanding
+        with lock:
+            if url in visited:
+                return
+            visited.add(url)
+            too_deep = depth > args.max_depth
+            if not too_deep:
+                outstanding += 1
+        if too_deep:
+            print(f"  警告: 超过最大深度 {args.max_depth}，跳过子 sitemap {url}", file=sys.stderr)
+            return
+        fetcher.submit(fetch, url, depth).add_done_callback(lambda future: finished.put((url, future)))
+
+    with ThreadPoolExecutor(max_workers=args.sitemap_workers, initializer=thread_initializer()) as fetcher:
+        submit(root_url, 0)
+        while True:
+            with lock:
+                if not outstanding:
+                    break
+            url, future = finished.get()
+            with lock:
+                outstanding -= 1
+            error = future.exception()
+            if isinstance(error, (requests.RequestException, OSError, ET.ParseError)):
+                if url == root_url:
+                    raise SystemExit(f"获取 sitemap 失败: {error}")
+                print(f"  警告: 无法获取子 sitemap {url}: {error}", file=sys.stderr)
+            elif error is not None:
+                raise error
+
+    result.urls = list(discovered)
+    return result
+
+
+def verify_reciprocity(groups: dict[str, dict[str, str]], results: dict[str, CheckResult]) -> list[ReciprocityIssue]:
+    """
+    验证 hreflang 互链：页面 P 声明的每个备用 URL A（A != P）都应回链到 P。
+    A 的回链优先取自检查时从 A 的 HTML 中提取的 <link rel="alternate">；
+    没有取到（未检查或来自旧缓存）时，以 sitemap 中 A 自己的 <url> 条目声明的备用 URL 为准。
+    A 本身返回错误或 4xx/5xx 时已在检查结果中报告，不再重复报告互链问题。
+    """
+    issues = []
+    for page, alternates in groups.items():
+        for hreflang, alternate in alternates.items():
+            if alternate == page:
+                continue
+            checked = results.get(alternate)
+            if checked is not None and (checked.error or checked.status >= 400):
+                continue
+            if checked is not None and checked.alternates is not None:
+                links = {urljoin(alternate, href) for href in checked.alternates.values()}
+                basis = "html"
+            else:
+                links = set(groups.get(alternate, {}).values())
+                basis = "sitemap"
+            if page not in links:
+                issues.append(ReciprocityIssue(page, hreflang, alternate, basis))
+    return issues
+
+
+# 延迟汇总中报告的百分位
+LATENCY_PERCENTILES = (50, 95, 99)
+TIMING_CSV_FIELDS = ["url", "status", "error", "cache", "ttfb_ms", "total_ms", "size", "redirect_count",
+                     "final_url", "redirect_chain"]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """最近秩法百分位（sorted_values 已升序且非空）"""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def timing_record(result: CheckResult) -> dict:
+    """单个 URL 的耗时与重定向记录（时间单位毫秒）"""
+    return {
+        "url": result.url,
+        "status": result.status,
+        "error": result.error,
+        "cache": result.cache,
+        "ttfb_ms": _ms(result.ttfb),
+        "total_ms": _ms(result.elapsed),
+        "size": result.size,
+        "redirect_count": len(result.redirects),
+        "final_url": result.final_url,
+        "redirects": [{"status": status, "url": url} for status, url in result.redirects],
+    }
+
+
+def timing_summary(results: list[CheckResult], slowest: int = 10) -> dict:
+    """
+    汇总实际发出请求的 URL 的延迟分布：TTFB 与总耗时的 p50/p95/p99、最慢的 URL、
+    重定向链长度分布与最长的重定向链。TTL 内的缓存命中与请求失败不计入。
+    """
+    timed = [r for r in results if r.elapsed is not None]
+    summary = {"requests": len(timed), "ttfb_ms": {}, "total_ms": {}, "slowest": [],
+               "redirect_chains": {}, "longest_chains": []}
+    if not timed:
+        return summary
+    for key, values in (("ttfb_ms", sorted(r.ttfb for r in timed)), ("total_ms", sorted(r.elapsed for r in timed))):
+        summary[key] = {f"p{pct}": _ms(percentile(values, pct)) for pct in LATENCY_PERCENTILES}
+        summary[key]["max"] = _ms(values[-1])
+    by_time = sorted(timed, key=lambda r: r.elapsed, reverse=True)
+    summary["slowest"] = [timing_record(r) for r in by_time[:slowest]]
+    chains: dict[int, int] = {}
+    for r in timed:
+        chains[len(r.redirects)] = chains.get(len(r.redirects), 0) + 1
+    summary["redirect_chains"] = {str(hops): chains[hops] for hops in sorted(chains)}
+    redirected = sorted((r for r in timed if r.redirects), key=lambda r: len(r.redirects), reverse=True)
+    summary["longest_chains"] = [timing_record(r) for r in redirected[:slowest]]
+    return summary
+
+
+def export_timings_json(path: Path, results: list[CheckResult], summary: dict) -> None:
+    """导出延迟汇总与逐 URL 记录，供跨部署对比"""
+    payload = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "summary": summary,
+               "urls": [timing_record(r) for r in results]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def export_timings_csv(path: Path, results: list[CheckResult]) -> None:
+    """导出逐 URL 记录为 CSV，重定向链以 "状态码 URL -> ..." 表示"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TIMING_CSV_FIELDS)
+        writer.writeheader()
+        for r in results:
+            record = timing_record(r)
+            record["redirect_chain"] = " -> ".join(f"{hop['status']} {hop['url']}" for hop in record.pop("redirects"))
+            writer.writerow(record)
+
+
+def print_timing_summary(summary: dict) -> None:
+    """打印延迟百分位、重定向链长度分布、最慢的 URL 与最长的重定向链"""
+    if not summary["requests"]:
+        return
+    for key, label in (("ttfb_ms", "TTFB"), ("total_ms", "总耗时")):
+        stats = summary[key]
+        parts = " / ".join(f"p{pct} {stats[f'p{pct}']:.0f} ms" for pct in LATENCY_PERCENTILES)
+        print(f"{label}: {parts} / 最大 {stats['max']:.0f} ms（{summary['requests']} 个请求）")
+    chains = "，".join(f"{hops} 跳 {n} 个" for hops, n in summary["redirect_chains"].items())
+    print(f"重定向链: {chains}")
+
+    print(f"\n最慢的 {len(summary['slowest'])} 个 URL:")
+    for record in summary["slowest"]:
+        print(f"  - {record['total_ms']:.0f} ms (TTFB {record['ttfb_ms']:.0f} ms, "
+              f"{record['redirect_count']} 跳) {record['url']}")
+    if summary["longest_chains"]:
+        print("\n最长的重定向链:")
+        for record in summary["longest_chains"]:
+            chain = " -> ".join(f"{hop['status']} {hop['url']}" for hop in record["redirects"])
+            print(f"  - {chain} -> {record['status']} {record['final_url']}")
+
+
+# 判定策略中可用的结果类别：具体状态码（404）、状态码段（5xx）、timeout、error（其余请求失败）、hreflang（未回链）
+POLICY_TOKEN_RE = re.compile(r"^(\d{3}|[1-5]xx|timeout|error|hreflang)$")
+DEFAULT_FAIL_ON = "404,timeout,error,hreflang"
+DEFAULT_WARN_ON = "4xx,5xx"
+
+
+def policy_tokens(value: str) -> frozenset[str]:
+    """解析逗号分隔的结果类别（argparse type）"""
+    tokens = frozenset(t.strip().lower() for t in value.split(",") if t.strip())
+    invalid = sorted(t for t in tokens if not POLICY_TOKEN_RE.match(t))
+    if invalid:
+        raise argparse.ArgumentTypeError(f"无效的结果类别: {', '.join(invalid)}（可用: 404、5xx、timeout、error、hreflang）")
+    return tokens
+
+
+@dataclass(frozen=True)
+class ExitPolicy:
+    """按结果类别判定失败（影响退出码）或警告；同时匹配时以失败为准"""
+    fail_on: frozenset[str]
+    warn_on: frozenset[str]
+
+    @staticmethod
+    def categories(result: CheckResult) -> list[str]:
+        if result.error:
+            return ["timeout" if result.timed_out else "error"]
+        return [str(result.status), f"{result.status // 100}xx"]
+
+    def classify(self, categories: list[str]) -> tuple[str, str | None]:
+        """返回 ("fail" | "warn" | "ok", 匹配到的类别)"""
+        for level, tokens in (("fail", self.fail_on), ("warn", self.warn_on)):
+            for category in categories:
+                if category in tokens:
+                    return level, category
+        return "ok", None
+
+
+class ResultWriter(ABC):
+    """
+    结构化结果输出的基类：检查结果在回调时逐条写出（不等全部完成），结束时写出互链问题与汇总。
+    记录格式：{"record": "url" | "reciprocity" | "summary", ...}
+    子类缺少任一抽象方法时在构造时即报错，而不是运行到一半才失败。
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    @abstractmethod
+    def write_result(self, record: dict) -> None:
+        """写出一个 URL 的检查结果"""
+
+    @abstractmethod
+    def close(self, reciprocity: list[dict], summary: dict) -> None:
+        """写出互链问题与汇总并关闭文件"""
+
+
+class JsonlResultWriter(ResultWriter):
+    """每条记录一行，逐行刷新，运行中断时已写出的记录仍然有效"""
+
+    def __init__(self, path: Path, sitemap: str):
+        super().__init__(path)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._write({"record": "header", "sitemap": sitemap})
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def write_result(self, record: dict) -> None:
+        self._write({"record": "url", **record})
+
+    def close(self, reciprocity: list[dict], summary: dict) -> None:
+        for issue in reciprocity:
+            self._write({"record": "reciprocity", **issue})
+        self._write({"record": "summary", **summary})
+        self._file.close()
+
+
+class JsonResultWriter(ResultWriter):
+    """单个 JSON 文档 {sitemap, results: [...], reciprocity: [...], summary}；results 数组逐条写出"""
+
+    def __init__(self, path: Path, sitemap: str):
+        super().__init__(path)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(f'{{"sitemap": {json.dumps(sitemap, ensure_ascii=False)},\n "results": [')
+        self._first = True
+
+    def write_result(self, record: dict) -> None:
+        self._file.write(("\n  " if self._first else ",\n  ") + json.dumps(record, ensure_ascii=False))
+        self._first = False
+
+    def close(self, reciprocity: list[dict], summary: dict) -> None:
+        self._file.write("\n ],\n")
+        self._file.write(f' "reciprocity": {json.dumps(reciprocity, ensure_ascii=False)},\n')
+        self._file.write(f' "summary": {json.dumps(summary, ensure_ascii=False)}\n}}\n')
+        self._file.close()
+
+
+class JunitResultWriter(ResultWriter):
+    """
+    JUnit XML（CI 测试报告）：每个 URL 一个 testcase，失败为 <failure>，警告写入 <system-out>；
+    互链问题在 hreflang 类别判定为失败或警告时作为 testcase 写出。
+    testsuite 的计数在结束前未知：先写出定长占位的开始标签，关闭时回到文件开头原位改写。
+    """
+
+    HEADER_WIDTH = 160
+
+    def __init__(self, path: Path, sitemap: str):
+        super().__init__(path)
+        self._file = open(self.path, "wb")
+        self._file.write(b'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        self._header_offset = self._file.tell()
+        self._file.write(self._suite_tag(0, 0, 0.0))
+        self._file.write(f"\n  <properties><property name=\"sitemap\" value={quoteattr(sitemap)}/></properties>\n"
+                         .encode("utf-8"))
+        self.tests = self.failures = 0
+        self.seconds = 0.0
+
+    def _suite_tag(self, tests: int, failures: int, seconds: float) -> bytes:
+        tag = f'<testsuite name="sitemap" tests="{tests}" failures="{failures}" errors="0" time="{seconds:.3f}"'
+        return (tag.ljust(self.HEADER_WIDTH - 1) + ">").encode("utf-8")
+
+    def _testcase(self, classname: str, name: str, seconds: float, outcome: str, message: str) -> None:
+        self.tests += 1
+        self.seconds += seconds
+        parts = [f"  <testcase classname={quoteattr(classname)} name={quoteattr(name)} time=\"{seconds:.3f}\""]
+        if outcome == "fail":
+            self.failures += 1
+            parts.append(f"><failure message={quoteattr(message)}/></testcase>\n")
+        elif outcome == "warn":
+            parts.append(f"><system-out>{escape('WARNING: ' + message)}</system-out></testcase>\n")
+        else:
+            parts.append("/>\n")
+        self._file.write("".join(parts).encode("utf-8"))
+
+    def write_result(self, record: dict) -> None:
+        message = record["error"] or f"HTTP {record['status']}"
+        self._testcase("sitemap.url", record["url"], (record["total_ms"] or 0) / 1000, record["outcome"],
+                       f"[{record['reason']}] {message}")
+
+    def close(self, reciprocity: list[dict], summary: dict) -> None:
+        for issue in reciprocity:
+            if issue["outcome"] != "ok":
+                self._testcase("sitemap.hreflang", f"{issue['alternate']} -> {issue['page']}", 0.0, issue["outcome"],
+                               f"{issue['alternate']} ({issue['hreflang']}) 未回链到 {issue['page']} "
+                               f"[依据: {issue['basis']}]")
+        self._file.write(b"</testsuite>\n</testsuites>\n")
+        self._file.seek(self._header_offset)
+        self._file.write(self._suite_tag(self.tests, self.failures, self.seconds))
+        self._file.close()
+
+
+# 输出文件扩展名 -> 写入器
+RESULT_WRITERS = {
+    ".json": JsonResultWriter,
+    ".jsonl": JsonlResultWriter,
+    ".xml": JunitResultWriter,
+}
+
+
+def open_result_writer(path: Path, sitemap: str) -> ResultWriter:
+    """按扩展名选择输出格式：.json / .jsonl / .xml（JUnit）"""
+    writer_class = RESULT_WRITERS.get(path.suffix.lower())
+    if writer_class is None:
+        raise SystemExit(f"不支持的输出格式: {path}（可用扩展名: {', '.join(RESULT_WRITERS)}）")
+    return writer_class(path, sitemap)
+
+
+def run_threads(root_url: str, args: argparse.Namespace, on_result: Callable[[CheckResult], None],
+                sessions: SessionPool, cache: CheckCache | None, controller: AimdController) -> CrawlResult:
+    """
+    线程池引擎：sitemap 发现与 URL 检查流水线并行，每个线程复用自己的 Session，并发由 AIMD 窗口控制。
+    检查请求经过限流器，被限流（429/503）的 URL 在 Retry-After 之后最多重试 args.retries 次；
+    结果在调用线程中按完成顺序回调。
+    """
+    limiter = AdaptiveLimiter(controller)
+    window = DiscoveryWindow(args.workers * PENDING_PER_WORKER)
+    # 完成的检查 future，以及发现结束时的发现 future
+    finished: queue.Queue = queue.Queue()
+
+    def check(url: str) -> CheckResult:
+        for _ in range(args.retries + 1):
+            limiter.acquire()
+            start = time.perf_counter()
+            result = check_url(url, args.timeout, sessions.get(), cache, args.hreflang)
+            limiter.release(result, time.perf_counter() - start)
+            if result.status not in THROTTLE_STATUSES:
+                break
+        return result
+
+    def checked(future: Future) -> None:
+        window.release()
+        finished.put(future)
+
+    with ThreadPoolExecutor(max_workers=args.workers, initializer=thread_initializer()) as checker, \
+            ThreadPoolExecutor(max_workers=1, initializer=thread_initializer()) as discoverer:
+
+        def dispatch(url: str) -> None:
+            window.acquire()
+            checker.submit(check, url).add_done_callback(checked)
+
+        try:
+            discovery = discoverer.submit(crawl, root_url, args, sessions, dispatch)
+            discovery.add_done_callback(finished.put)
+            crawled = None
+            handled = 0
+            while crawled is None or handled < len(crawled.urls):
+                future = finished.get()
+                if future is discovery:
+                    crawled = discovery.result()
+                    continue
+                on_result(future.result())
+                handled += 1
+        finally:
+            window.close()
+    return crawled
+
+
+async def check_url_async(client: "httpx.AsyncClient", url: str,
+                          host_limits: dict[str, asyncio.Semaphore], per_host: int,
+                          cache: CheckCache | None = None, collect_links: bool = False) -> CheckResult:
+    """异步检查单个 URL；同一主机的并发请求数受 per_host 限制，缓存与回链提取规则与 check_url 一致"""
+    entry = cache.lookup(url, collect_links) if cache else None
+    if entry is not None and cache.is_fresh(entry):
+        return cache.hit(url, entry, "fresh")
+
+    headers = CheckCache.conditional_headers(entry)
+    links = None
+    try:
+        host = urlsplit(url).netloc
+    except ValueError as e:
+        # 无法解析的 <loc>（如未闭合的 IPv6 主机名）
+        return CheckResult(url, error=str(e))
+    semaphore = host_limits.setdefault(host, asyncio.Semaphore(per_host))
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            if collect_links:
+                count("http_requests")
+                async with client.stream("GET", url, headers=headers) as resp:
+                    ttfb = time.perf_counter() - started
+                    if resp.status_code == 200:
+                        parser = AlternateLinkParser(_charset(resp.headers.get("Content-Type")))
+                        async for chunk in resp.aiter_bytes(STREAM_CHUNK_SIZE):
+                            if parser.feed_bytes(chunk):
+                                break
+                        links = parser.links
+            else:
+                count("http_requests")
+                resp = await client.head(url, headers=headers)
+                ttfb = time.perf_counter() - started
+                if resp.status_code == 405:
+                    # 只读取状态行，不下载响应体
+                    count("http_requests")
+                    async with client.stream("GET", url, headers=headers) as resp:
+                        ttfb = time.perf_counter() - started
+        except Exception as e:
+            # 与 check_url 一致：非法 <loc> 等引发的异常（如 httpx.InvalidURL，不属于 HTTPError）记为该 URL 的错误，
+            # 不中断整个检查
+            return CheckResult(url, error=str(e) or type(e).__name__,
+                               timed_out=isinstance(e, httpx.TimeoutException))
+
+    return _finish_check(url, resp, entry, cache, links, started, ttfb)
+
+
+async def check_urls_async(root_url: str, args: argparse.Namespace, on_result: Callable[[CheckResult], None],
+                           sessions: SessionPool, cache: CheckCache | None, controller: AimdController) -> CrawlResult:
+    """
+    asyncio 引擎：sitemap 在后台线程中流式发现（sessions 仅用于抓取 sitemap），
+    发现的 URL 立即交给事件循环检查；所有请求共享一个 keep-alive 连接池，按完成顺序回调每个结果。
+    """
+    loop = asyncio.get_running_loop()
+    http2 = importlib.util.find_spec("h2") is not None
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    host_limits: dict[str, asyncio.Semaphore] = {}
+    # 全局并发由连接池上限与 AIMD 窗口共同约束，避免一次性创建全部协程的请求
+    limiter = AsyncAdaptiveLimiter(controller)
+
+    async def bounded(client: "httpx.AsyncClient", url: str) -> CheckResult:
+        for _ in range(args.retries + 1):
+            await limiter.acquire()
+            start = time.perf_counter()
+            result = await check_url_async(client, url, host_limits, args.per_host, cache, args.hreflang)
+            await limiter.release(result, time.perf_counter() - start)
+            if result.status not in THROTTLE_STATUSES:
+                break
+        return result
+
+    window = DiscoveryWindow(args.concurrency * PENDING_PER_WORKER)
+    # 完成的检查 task，以及发现结束时的发现 future
+    finished: asyncio.Queue = asyncio.Queue()
+    tasks: set[asyncio.Task] = set()
+
+    def checked(task: asyncio.Task) -> None:
+        tasks.discard(task)
+        window.release()
+        finished.put_nowait(task)
+
+    async with httpx.AsyncClient(http2=http2, limits=limits, timeout=args.timeout,
+                                 follow_redirects=True) as client:
+
+        def start(url: str) -> None:
+            if window.closed:
+                # 引擎退出前已排入事件循环的 URL，不再检查
+                return
+            task = asyncio.create_task(bounded(client, url))
+            tasks.add(task)
+            task.add_done_callback(checked)
+
+        def dispatch(url: str) -> None:
+            # 在发现线程中调用
+            window.acquire()
+            loop.call_soon_threadsafe(start, url)
+
+        discoverer = ThreadPoolExecutor(max_workers=1, initializer=thread_initializer())
+        try:
+            discovery = loop.run_in_executor(discoverer, crawl, root_url, args, sessions, dispatch)
+            discovery.add_done_callback(finished.put_nowait)
+            crawled = None
+            handled = 0
+            while crawled is None or handled < len(crawled.urls):
+                future = await finished.get()
+                if future is discovery:
+                    crawled = discovery.result()
+                    continue
+                on_result(future.result())
+                handled += 1
+        finally:
+            window.close()
+            # 发现失败或回调抛出异常时仍有检查在进行：先取消并等待它们结束，再关闭连接池
+            pending = list(tasks)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            discoverer.shutdown(wait=False)
+    return crawled
+
+
+def run_async(root_url: str, args: argparse.Namespace, on_result: Callable[[CheckResult], None],
+              sessions: SessionPool, cache: CheckCache | None, controller: AimdController) -> CrawlResult:
+    """asyncio 引擎：发现与检查流水线并行，用 httpx 连接池检查"""
+    return asyncio.run(check_urls_async(root_url, args, on_result, sessions, cache, controller))
+
+
+class StaticIndex:
+    """
+    静态导出目录（next build 生成的 out/）的路径索引：构造时一次 os.walk 收集全部文件，
+    之后每个 URL 只做集合查找，不再逐个 stat。
+    解析规则与静态托管一致（next.config.js 中 trailingSlash: true），URL 的主机名被忽略：
+    - /a/b/ -> a/b/index.html
+    - /a/b  -> 文件 a/b；否则 a/b.html；否则 a/b/index.html（记为 308 重定向到 /a/b/）
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.files: set[str] = set()
+        for dirpath, _, filenames in os.walk(self.root):
+            relative = Path(dirpath).relative_to(self.root).as_posix()
+            prefix = "" if relative == "." else relative + "/"
+            self.files.update(prefix + name for name in filenames)
+
+    def resolve(self, path: str) -> tuple[str | None, bool]:
+        """返回 (相对文件路径, 是否需要补全末尾斜杠)；找不到时文件路径为 None"""
+        path = unquote(path).lstrip("/")
+        if not path or path.endswith("/"):
+            candidate = path + "index.html"
+            return (candidate if candidate in self.files else None), False
+        if path in self.files:
+            return path, False
+        if path + ".html" in self.files:
+            return path + ".html", False
+        if path + "/index.html" in self.files:
+            return path + "/index.html", True
+        return None, False
+
+    def check(self, url: str, collect_links: bool = False) -> CheckResult:
+        """按索引解析 URL：找到文件时为 200，否则为 404；collect_links 时从本地 HTML 提取备用语言链接"""
+        parts = urlsplit(url)
+        relative, add_slash = self.resolve(parts.path)
+        if relative is None:
+            return CheckResult(url, 404, final_url=url)
+        result = CheckResult(url, 200, final_url=url)
+        if add_slash:
+            result.redirects = [(308, url)]
+            result.final_url = parts._replace(path=parts.path + "/").geturl()
+        if collect_links and relative.endswith(".html"):
+            with open(self.root / relative, "rb") as f:
+                count("files_read")
+                result.alternates = read_alternate_links(iter(lambda: f.read(STREAM_CHUNK_SIZE), b""), None)
+        return result
+
+
+def run_static(root_url: str, args: argparse.Namespace, on_result: Callable[[CheckResult], None],
+               sessions: SessionPool, cache: CheckCache | None, controller: AimdController) -> CrawlResult:
+    """离线引擎：发现的 URL 立即在 args.static_dir 的路径索引中解析，不发出检查请求（不使用缓存与限流）"""
+    with section("sitemap.static_index"):
+        index = StaticIndex(args.static_dir)
+    lock = threading.Lock()
+
+    def dispatch(url: str) -> None:
+        # 在发现线程中调用；结果回调串行执行
+        result = index.check(url, args.hreflang)
+        with lock:
+            on_result(result)
+
+    return crawl(root_url, args, sessions, dispatch)
+
+
+ENGINES = {
+    "threads": run_threads,
+    "async": run_async,
+    "static": run_static,
+}
 
 
 def main():
     parser = argparse.ArgumentParser(description="检查 sitemap 中的 URL 是否返回 404")
     parser.add_argument(
         "--sitemap",
-        default=DEFAULT_SITEMAP_URL,
-        help=f"sitemap URL (默认: {DEFAULT_SITEMAP_URL})",
+        help=f"sitemap URL 或本地文件路径，支持 .xml.gz "
+             f"(默认: {DEFAULT_SITEMAP_URL}；指定 --static-dir 时为该目录下的 sitemap.xml)",
+    )
+    parser.add_argument(
+        "--static-dir",
+        type=Path,
+        metavar="DIR",
+        help="离线模式：在静态导出目录（如 out/）中解析全部 URL，不发出网络请求（隐含 --engine static）",
     )
     parser.add_argument(
         "--workers",
         type=int,
         default=10,
-        help="并发检查的线程数 (默认: 10)",
+        help="并发检查的线程数，即 threads 引擎自适应并发的上限 (默认: 10)",
+    )
+    parser.add_argument(
+        "--sitemap-workers",
+        type=int,
+        default=4,
+        help="并发抓取子 sitemap 的线程数 (默认: 4)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=3,
+        help="sitemap index 的最大嵌套深度 (默认: 3)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=sorted(ENGINES),
+        default="threads",
+        help="检查引擎: threads（线程池 + requests）、async（asyncio + httpx 连接池）"
+             "或 static（离线解析 --static-dir）(默认: threads)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=50,
+        help="async 引擎的最大并发请求数 / 连接数，即自适应并发的上限 (默认: 50)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=10,
+        help="async 引擎对每个主机的最大并发请求数 (默认: 10)",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=4,
+        help="threads 引擎每个 Session 对每个主机保留的 keep-alive 连接数 (默认: 4)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help=f"连接错误、{'/'.join(map(str, RETRY_STATUSES))} 或限流 "
+             f"{'/'.join(map(str, THROTTLE_STATUSES))} 时的最大重试次数 (默认: 3)",
+    )
+    parser.add_argument(
+        "--backoff",
+        type=float,
+        default=0.5,
+        help="重试退避系数，第 n 次重试前等待 backoff * 2^(n-1) 秒 (默认: 0.5)",
+    )
+    parser.add_argument(
+        "--no-adaptive",
+        dest="adaptive",
+        action="store_false",
+        help="关闭自适应并发（AIMD），固定使用 --workers / --concurrency 个并发；仍遵守 Retry-After",
+    )
+    parser.add_argument(
+        "--latency-factor",
+        type=float,
+        default=3.0,
+        help="响应延迟超过基线的该倍数时视为拥塞，并发窗口减半 (默认: 3.0)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=0,
+        help="在该秒数内检查过的 URL 直接沿用缓存结果而不发出请求；0 表示总是发送条件请求，"
+             "只在服务器返回 304 时沿用缓存 (默认: 0)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=50000,
+        help="缓存保留的最大 URL 数，超出时淘汰最久未使用的条目 (默认: 50000)",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="忽略已有缓存，重新请求所有 URL（结果仍写入缓存）",
     )
     parser.add_argument(
         "--timeout",
@@ -90,38 +1455,154 @@ def main():
         default=10,
         help="每个请求的超时秒数 (默认: 10)",
     )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=10,
+        help="汇总中列出的最慢 URL 与最长重定向链的数量 (默认: 10)",
+    )
+    parser.add_argument(
+        "--timings-json",
+        type=Path,
+        metavar="PATH",
+        help="导出延迟汇总与逐 URL 的 TTFB / 总耗时 / 大小 / 重定向链（JSON）",
+    )
+    parser.add_argument(
+        "--timings-csv",
+        type=Path,
+        metavar="PATH",
+        help="导出逐 URL 的 TTFB / 总耗时 / 大小 / 重定向链（CSV）",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="逐条写出结构化结果，格式按扩展名: .json、.jsonl 或 .xml（JUnit），可重复指定",
+    )
+    parser.add_argument(
+        "--fail-on",
+        type=policy_tokens,
+        default=DEFAULT_FAIL_ON,
+        help="判定为失败（退出码 1）的结果类别，逗号分隔：状态码（404）、状态码段（5xx）、"
+             f"timeout、error、hreflang (默认: {DEFAULT_FAIL_ON})",
+    )
+    parser.add_argument(
+        "--warn-on",
+        type=policy_tokens,
+        default=DEFAULT_WARN_ON,
+        help=f"只报告警告、不影响退出码的结果类别，格式同 --fail-on (默认: {DEFAULT_WARN_ON})",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=2.0,
+        help="进度输出的最短间隔秒数，0 表示不输出进度 (默认: 2)",
+    )
+    parser.add_argument(
+        "--hreflang",
+        action="store_true",
+        help="同时检查 sitemap 中全部 hreflang 备用 URL，并验证备用页面是否回链",
+    )
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    configure(args)
 
-    print(f"正在获取 sitemap: {args.sitemap}")
-    xml_content = fetch_sitemap(args.sitemap)
+    if args.static_dir:
+        args.engine = "static"
+        if not args.static_dir.is_dir():
+            print(f"静态导出目录不存在: {args.static_dir}")
+            sys.exit(1)
+    elif args.engine == "static":
+        print("static 引擎需要 --static-dir")
+        sys.exit(1)
+    if args.sitemap is None:
+        args.sitemap = str(args.static_dir / "sitemap.xml") if args.static_dir else DEFAULT_SITEMAP_URL
+    if args.engine == "async" and httpx is None:
+        print("async 引擎需要 httpx: pip install httpx（可选 h2 以启用 HTTP/2）")
+        sys.exit(1)
 
-    print("正在解析 URL...")
-    urls = parse_urls_from_sitemap(xml_content, args.sitemap)
-    print(f"共找到 {len(urls)} 个 URL\n")
+    sessions = SessionPool(args.pool_size, args.retries, args.backoff)
+    # 离线引擎不发出请求，不读写缓存
+    cache = None
+    if args.engine != "static":
+        cache = CheckCache(CACHE_FILE, args.cache_ttl, args.cache_size, fresh=args.fresh)
+    max_concurrency = args.workers if args.engine == "threads" else args.concurrency
+    controller = AimdController(max_concurrency, args.adaptive, args.latency_factor)
 
-    if not urls:
-        print("未找到任何 URL")
-        return
+    policy = ExitPolicy(args.fail_on, args.warn_on)
+    writers = [open_result_writer(path, args.sitemap) for path in args.output]
+
+    print(f"正在获取 sitemap: {args.sitemap}")
+    if cache is not None and args.cache_ttl > 0 and not args.fresh:
+        print(f"注意: {args.cache_ttl:g} 秒内检查过的 URL 将沿用缓存结果，不重新请求（--fresh 强制重新检查）")
 
     not_found = []
     errors = []
+    # 按 --fail-on / --warn-on 判定的 (URL, 类别, 说明)
+    failed: list[tuple[str, str, str]] = []
+    warned: list[tuple[str, str, str]] = []
     ok_count = 0
+    checked = 0
+    started = last_progress = time.monotonic()
+    # URL -> 检查结果（每个 URL 只请求一次，互链验证直接复用）
+    results: dict[str, CheckResult] = {}
 
-    print("正在批量检查...")
-    with ThreadPoolExecutor(max_workers=args.workers) as executor:
-        futures = {executor.submit(check_url, url, args.timeout): url for url in urls}
-        for i, future in enumerate(as_completed(futures), 1):
-            url, status, err = future.result()
-            if err:
-                errors.append((url, err))
-                print(f"  [{i}/{len(urls)}] 错误: {url} - {err}")
-            elif status == 404:
-                not_found.append(url)
-                print(f"  [{i}/{len(urls)}] 404: {url}")
-            else:
-                ok_count += 1
-                if (i % 5 == 0) or i == len(urls):
-                    print(f"  [{i}/{len(urls)}] 已检查...")
+    def report(result: CheckResult) -> None:
+        nonlocal ok_count, checked, last_progress
+        checked += 1
+        results[result.url] = result
+        outcome, reason = policy.classify(ExitPolicy.categories(result))
+        message = result.error or f"HTTP {result.status}"
+        if result.error:
+            errors.append((result.url, result.error))
+        elif result.status == 404:
+            not_found.append(result.url)
+        if outcome == "ok":
+            ok_count += 1
+        else:
+            (failed if outcome == "fail" else warned).append((result.url, reason, message))
+            label = "失败" if outcome == "fail" else "警告"
+            cached = "（缓存结果）" if result.cache == "fresh" else ""
+            print(f"  [{checked}] {label} [{reason}]: {result.url} - {message}{cached}")
+
+        record = {**timing_record(result), "outcome": outcome, "reason": reason}
+        for writer in writers:
+            writer.write_result(record)
+
+        # 进度按时间间隔输出，避免大量 URL 时控制台 I/O 拖慢检查
+        now = time.monotonic()
+        if args.progress_interval > 0 and now - last_progress >= args.progress_interval:
+            last_progress = now
+            print(f"  [{checked}] 已检查（{checked / (now - started):.1f} 个/秒）...")
+
+    print(f"正在发现并检查 URL（{args.engine} 引擎）...")
+    with section("sitemap.crawl"):
+        crawled = ENGINES[args.engine](args.sitemap, args, report, sessions, cache, controller)
+    if cache is not None:
+        cache.save()
+    urls = crawled.urls
+    reciprocity_issues = verify_reciprocity(crawled.groups, results) if args.hreflang else []
+    reciprocity_outcome, _ = policy.classify(["hreflang"])
+    if reciprocity_outcome != "ok":
+        for issue in reciprocity_issues:
+            (failed if reciprocity_outcome == "fail" else warned).append(
+                (issue.alternate, "hreflang", f"({issue.hreflang}) 未回链到 {issue.page}"))
+
+    exit_code = 1 if failed else 0
+    summary = {"total": len(urls), "not_found": len(not_found), "errors": len(errors),
+               "failed": len(failed), "warned": len(warned), "reciprocity_issues": len(reciprocity_issues),
+               "fail_on": sorted(policy.fail_on), "warn_on": sorted(policy.warn_on), "exit_code": exit_code}
+    reciprocity_records = [{**issue.__dict__, "outcome": reciprocity_outcome} for issue in reciprocity_issues]
+    for writer in writers:
+        writer.close(reciprocity_records, summary)
+
+    if not urls:
+        print("未找到任何 URL")
+        sessions.close()
+        finish(args)
+        return
 
     # 汇总
     print("\n" + "=" * 50)
@@ -130,19 +1611,56 @@ def main():
     print(f"总计: {len(urls)} 个 URL")
     print(f"正常: {ok_count} 个")
     print(f"404:  {len(not_found)} 个")
-    print(f"错误: {len(errors)} 个")
+    timeouts = sum(1 for r in results.values() if r.timed_out)
+    print(f"错误: {len(errors)} 个（其中超时 {timeouts} 个）")
+    print(f"失败: {len(failed)} 个（--fail-on {','.join(sorted(policy.fail_on))}）")
+    print(f"警告: {len(warned)} 个（--warn-on {','.join(sorted(policy.warn_on))}）")
+    if args.hreflang:
+        print(f"hreflang 未回链: {len(reciprocity_issues)} 个")
+    if args.engine == "threads":
+        created, reused = sessions.connection_stats()
+        print(f"连接: 新建 {created} 个，复用 {reused} 次")
+    if args.engine == "static":
+        redirected = sum(1 for r in results.values() if r.redirects)
+        print(f"离线解析: {args.static_dir}（{redirected} 个 URL 需要补全末尾斜杠）")
+    else:
+        print(f"缓存: TTL 内跳过 {cache.stats['fresh']} 个，304 重新验证 {cache.stats['revalidated']} 个")
+        if cache.stats["fresh"]:
+            print(f"注意: {cache.stats['fresh']} 个 URL 的结果来自 {args.cache_ttl:g} 秒内的缓存，本次未请求")
+        throttle = controller.stats
+        print(f"请求速率: {controller.rate():.1f} 次/秒（{throttle['requests']} 次请求），"
+              f"并发窗口: 最终 {controller.window} / 最低 {throttle['lowest']} / 上限 {controller.maximum}，"
+              f"限流响应 {throttle['throttled']} 次，慢响应 {throttle['slow']} 次")
+    sessions.close()
+
+    checked_results = [results[url] for url in urls if url in results]
+    timings = timing_summary(checked_results, args.slowest)
+    print_timing_summary(timings)
+    if args.timings_json or args.timings_csv:
+        print()
+    if args.timings_json:
+        export_timings_json(args.timings_json, checked_results, timings)
+        print(f"耗时记录已保存到: {args.timings_json}")
+    if args.timings_csv:
+        export_timings_csv(args.timings_csv, checked_results)
+        print(f"耗时记录已保存到: {args.timings_csv}")
+
+    for title, entries in (("判定为失败的 URL:", failed), ("警告:", warned)):
+        if entries:
+            print(f"\n{title}")
+            for u, reason, message in entries:
+                print(f"  - [{reason}] {u}: {message}")
 
-    if not_found:
-        print("\n返回 404 的 URL:")
-        for u in not_found:
-            print(f"  - {u}")
+    if reciprocity_issues:
+        print("\n未回链的 hreflang 备用 URL:")
+        for issue in reciprocity_issues:
+            print(f"  - {issue.alternate} ({issue.hreflang}) 未回链到 {issue.page} [依据: {issue.basis}]")
 
-    if errors:
-        print("\n请求失败的 URL:")
-        for u, e in errors:
-            print(f"  - {u}: {e}")
+    for path in args.output:
+        print(f"结果已保存到: {path}")
 
-    sys.exit(1 if (not_found or errors) else 0)
+    finish(args)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,11 @@
+"""
+测试共用配置：仓库根目录下的审计脚本不是包，将根目录加入 sys.path 以便直接 import。
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
@@ -0,0 +1,131 @@
+"""
+audit_report 的离线测试：
+- convert_jsonl_to_json 的输出与旧版审计脚本 json.dump(..., ensure_ascii=False, indent=2) 的输出逐字节一致
+- generate_summary_report 读取 JSONL 流与嵌套 JSON 中较新的一个
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import audit_report
+import generate_summary_report
+
+TRANSLATION_REPORT = {
+    "about.json": {
+        "de": {
+            "missing_keys": ["team.lead"],
+            "placeholder_issues": [
+                {"key": "title", "en": ["{company}"], "lang": ["{firma}"]},
+            ],
+            "html_tag_issues": [],
+            "structure_issues": [
+                {"key": "body", "kind": "tag_order", "en": ["b", "/b"], "lang": ["i", "/i"]},
+            ],
+            "file_exists": True,
+        },
+        "fr": {
+            "missing_keys": [],
+            "placeholder_issues": [],
+            "html_tag_issues": [],
+            "structure_issues": [],
+            "file_exists": False,
+        },
+    },
+    "products.json": {
+        "ja": {
+            "missing_keys": ["説明"],
+            "placeholder_issues": [],
+            "html_tag_issues": [{"key": "intro", "en": ["<br>"], "lang": []}],
+            "structure_issues": [],
+            "file_exists": True,
+            "json_error": "Expecting value: line 1 column 1 (char 0)",
+        },
+    },
+}
+
+ISSUE_REPORT = [
+    {"type": "missing_title", "file": "app/[locale]/page.tsx", "severity": "high"},
+    {"type": "missing_alt", "file": "components/Hero.tsx", "line": 12, "detail": {"src": "/hero.webp"}},
+]
+
+
+def legacy_dump(data) -> str:
+    """旧版审计脚本写出报告的方式"""
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def write_translation_stream(path: Path, report: dict) -> None:
+    with audit_report.JsonlReportWriter(path, "translations") as writer:
+        for filename, file_results in report.items():
+            for lang, results in file_results.items():
+                writer.write_translation_pair(filename, lang, results)
+
+
+def write_issue_stream(path: Path, issues: list, audit: str = "seo") -> None:
+    with audit_report.JsonlReportWriter(path, audit) as writer:
+        writer.write_issues(issues)
+
+
+@pytest.mark.parametrize("report", [TRANSLATION_REPORT, {}], ids=["issues", "empty"])
+def test_translation_report_matches_indent2_output(tmp_path, report):
+    jsonl_path = tmp_path / "report.jsonl"
+    json_path = tmp_path / "report.json"
+    write_translation_stream(jsonl_path, report)
+    audit_report.convert_jsonl_to_json(jsonl_path, json_path)
+    assert json_path.read_text(encoding="utf-8") == legacy_dump(report)
+
+
+@pytest.mark.parametrize("issues", [ISSUE_REPORT, []], ids=["issues", "empty"])
+@pytest.mark.parametrize("audit", ["seo", "404"])
+def test_issue_report_matches_indent2_output(tmp_path, issues, audit):
+    jsonl_path = tmp_path / "report.jsonl"
+    json_path = tmp_path / "report.json"
+    write_issue_stream(jsonl_path, issues, audit)
+    audit_report.convert_jsonl_to_json(jsonl_path, json_path)
+    assert json_path.read_text(encoding="utf-8") == legacy_dump(issues)
+
+
+def test_converted_report_keeps_stream_mtime(tmp_path):
+    jsonl_path = tmp_path / "report.jsonl"
+    json_path = tmp_path / "report.json"
+    write_issue_stream(jsonl_path, ISSUE_REPORT)
+    os.utime(jsonl_path, ns=(1_000_000_000, 1_000_000_000))
+    audit_report.convert_jsonl_to_json(jsonl_path, json_path)
+    assert json_path.stat().st_mtime_ns == jsonl_path.stat().st_mtime_ns
+
+
+@pytest.fixture
+def summary_reports(tmp_path, monkeypatch):
+    """将摘要脚本的输入指向临时目录，返回 (JSONL 流, 嵌套 JSON) 路径"""
+    jsonl_path = tmp_path / "translation_audit_report.jsonl"
+    json_path = tmp_path / "translation_audit_report.json"
+    monkeypatch.setattr(generate_summary_report, "REPORT_STREAM_FILE", jsonl_path)
+    monkeypatch.setattr(generate_summary_report, "REPORT_FILE", json_path)
+    return jsonl_path, json_path
+
+
+def test_summary_reads_stream_when_json_was_converted_from_it(summary_reports):
+    jsonl_path, json_path = summary_reports
+    write_translation_stream(jsonl_path, TRANSLATION_REPORT)
+    audit_report.convert_jsonl_to_json(jsonl_path, json_path)
+    from_stream = generate_summary_report.aggregate_report()
+
+    jsonl_path.unlink()
+    assert generate_summary_report.aggregate_report() == from_stream
+    assert list(from_stream["files"]) == ["about.json", "products.json"]
+    assert from_stream["totals"]["json_errors"] == 1
+
+
+def test_summary_reads_json_when_it_is_newer(summary_reports):
+    jsonl_path, json_path = summary_reports
+    write_translation_stream(jsonl_path, TRANSLATION_REPORT)
+    os.utime(jsonl_path, ns=(1_000_000_000, 1_000_000_000))
+    # 旧版审计脚本只更新了嵌套 JSON：JSONL 流已过时
+    json_path.write_text(legacy_dump({"about.json": TRANSLATION_REPORT["about.json"]}), encoding="utf-8")
+
+    summary = generate_summary_report.aggregate_report()
+    assert summary["totals"]["missing_keys"] == 1
+    assert list(summary["files"]) == ["about.json"]
@@ -0,0 +1,227 @@
+"""
+scripts/check_sitemap_404.py 的离线测试：在本地线程中启动 http.server，
+验证 200 / 404 / 超时 / 重定向 / 非法 <loc> 的判定、threads 与 async 两种引擎的退出码，
+sitemap 发现失败时 async 引擎对进行中检查的清理，以及离线 static 引擎不读写检查缓存。
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "check_sitemap_404.py"
+
+# /slow 在发送响应头前等待的秒数，需明显大于请求超时（--timeout 的最小值为 1 秒）
+SLOW_SECONDS = 3
+
+# 无法解析的 <loc>（未闭合的 IPv6 主机名）：requests 抛出 InvalidURL，httpx 抛出不属于 HTTPError 的 InvalidURL
+MALFORMED_URL = "http://[::1/"
+
+
+def load_script():
+    """按路径加载脚本（scripts/ 不是包）"""
+    spec = importlib.util.spec_from_file_location("check_sitemap_404", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+checker = load_script()
+
+
+def urlset(base: str, paths: list[str]) -> bytes:
+    entries = "".join(f"<url><loc>{path if '://' in path else base + path}</loc></url>" for path in paths)
+    return (f'<?xml version="1.0" encoding="UTF-8"?>'
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>').encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command == "GET":
+            self.wfile.write(body)
+
+    def _route(self) -> None:
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        if self.path == "/sitemap.xml":
+            self._send(200, urlset(base, ["/ok", "/missing", "/slow", "/redirect"]),
+                       {"Content-Type": "application/xml"})
+        elif self.path == "/healthy.xml":
+            self._send(200, urlset(base, ["/ok", "/redirect"]), {"Content-Type": "application/xml"})
+        elif self.path == "/malformed.xml":
+            self._send(200, urlset(base, ["/ok", MALFORMED_URL]), {"Content-Type": "application/xml"})
+        elif self.path == "/ok":
+            self._send(200, b"<html><head></head><body>ok</body></html>", {"Content-Type": "text/html"})
+        elif self.path == "/redirect":
+            self._send(301, headers={"Location": "/ok"})
+        elif self.path == "/slow":
+            time.sleep(SLOW_SECONDS)
+            self._send(200)
+        else:
+            self._send(404)
+
+    def do_GET(self) -> None:
+        try:
+            self._route()
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端超时后已断开
+            pass
+
+    do_HEAD = do_GET
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def assert_classified(results: dict, base: str) -> None:
+    ok = results["/ok"]
+    assert (ok.status, ok.error, ok.redirects) == (200, None, [])
+    assert checker.ExitPolicy.categories(ok) == ["200", "2xx"]
+
+    missing = results["/missing"]
+    assert missing.status == 404
+    assert checker.ExitPolicy.categories(missing) == ["404", "4xx"]
+
+    slow = results["/slow"]
+    assert slow.timed_out and slow.error and slow.status is None
+    assert checker.ExitPolicy.categories(slow) == ["timeout"]
+
+    redirect = results["/redirect"]
+    assert redirect.status == 200
+    assert redirect.redirects == [(301, f"{base}/redirect")]
+    assert redirect.final_url == f"{base}/ok"
+
+
+def test_check_url_classifies_responses(server):
+    session = checker.SessionPool(retries=0).get()
+    results = {path: checker.check_url(f"{server}{path}", 1, session)
+               for path in ("/ok", "/missing", "/slow", "/redirect")}
+    assert_classified(results, server)
+
+
+@pytest.mark.skipif(checker.httpx is None, reason="async 引擎需要 httpx")
+def test_check_url_async_classifies_responses(server):
+    async def run() -> dict:
+        async with checker.httpx.AsyncClient(timeout=1, follow_redirects=True) as client:
+            return {path: await checker.check_url_async(client, f"{server}{path}", {}, 4)
+                    for path in ("/ok", "/missing", "/slow", "/redirect")}
+
+    assert_classified(asyncio.run(run()), server)
+
+
+def run_main(monkeypatch, tmp_path: Path, sitemap: str, engine: str) -> tuple[int, list[dict]]:
+    """运行 main()，返回 (退出码, --output 写出的 JSONL 记录)"""
+    output = tmp_path / f"{engine}.jsonl"
+    monkeypatch.setattr(checker, "CACHE_FILE", tmp_path / "cache.json")
+    monkeypatch.setattr(sys, "argv", [
+        "check_sitemap_404.py", "--sitemap", sitemap, "--engine", engine, "--timeout", "1",
+        "--retries", "0", "--fresh", "--progress-interval", "0", "--output", str(output),
+    ])
+    with pytest.raises(SystemExit) as exit_info:
+        checker.main()
+    with open(output, "r", encoding="utf-8") as f:
+        return exit_info.value.code, [json.loads(line) for line in f]
+
+
+ENGINES = ["threads", pytest.param("async", marks=pytest.mark.skipif(checker.httpx is None,
+                                                                     reason="async 引擎需要 httpx"))]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_main_fails_on_404_and_timeout(server, monkeypatch, tmp_path, engine):
+    code, records = run_main(monkeypatch, tmp_path, f"{server}/sitemap.xml", engine)
+    assert code == 1
+
+    outcomes = {record["url"][len(server):]: (record["outcome"], record["reason"])
+                for record in records if record["record"] == "url"}
+    assert outcomes == {
+        "/ok": ("ok", None),
+        "/missing": ("fail", "404"),
+        "/slow": ("fail", "timeout"),
+        "/redirect": ("ok", None),
+    }
+    summary = records[-1]
+    assert summary["record"] == "summary"
+    assert (summary["total"], summary["not_found"], summary["failed"], summary["exit_code"]) == (4, 1, 2, 1)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_main_passes_when_all_urls_resolve(server, monkeypatch, tmp_path, engine):
+    code, records = run_main(monkeypatch, tmp_path, f"{server}/healthy.xml", engine)
+    assert code == 0
+    assert records[-1]["failed"] == 0 and records[-1]["total"] == 2
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_main_records_malformed_loc_as_error(server, monkeypatch, tmp_path, engine):
+    code, records = run_main(monkeypatch, tmp_path, f"{server}/malformed.xml", engine)
+    assert code == 1
+
+    outcomes = {record["url"]: (record["outcome"], record["reason"])
+                for record in records if record["record"] == "url"}
+    assert outcomes == {f"{server}/ok": ("ok", None), MALFORMED_URL: ("fail", "error")}
+    assert records[-1]["errors"] == 1
+
+
+@pytest.mark.skipif(checker.httpx is None, reason="async 引擎需要 httpx")
+def test_async_engine_cancels_checks_when_discovery_fails(server, monkeypatch):
+    def failing_crawl(root_url, args, sessions, dispatch):
+        dispatch(f"{server}/slow")
+        # 等检查请求发出后再失败
+        time.sleep(0.2)
+        raise RuntimeError("discovery failed")
+
+    monkeypatch.setattr(checker, "crawl", failing_crawl)
+    args = argparse.Namespace(concurrency=4, per_host=4, retries=0, timeout=SLOW_SECONDS * 2, hreflang=False)
+    results = []
+
+    async def run() -> set:
+        with pytest.raises(RuntimeError, match="discovery failed"):
+            await checker.check_urls_async(f"{server}/sitemap.xml", args, results.append,
+                                           checker.SessionPool(retries=0), None,
+                                           checker.AimdController(args.concurrency, True, 3.0))
+        return {task for task in asyncio.all_tasks() if task is not asyncio.current_task()}
+
+    started = time.monotonic()
+    assert asyncio.run(run()) == set()
+    assert results == []
+    assert time.monotonic() - started < SLOW_SECONDS
+
+
+def test_static_engine_does_not_touch_cache(monkeypatch, tmp_path):
+    site = tmp_path / "out"
+    (site / "en").mkdir(parents=True)
+    (site / "en" / "index.html").write_text("<html></html>", encoding="utf-8")
+    (site / "sitemap.xml").write_bytes(urlset("https://example.com", ["/en/", "/missing/"]))
+    cache_file = tmp_path / "cache.json"
+    monkeypatch.setattr(checker, "CACHE_FILE", cache_file)
+    monkeypatch.setattr(checker, "CheckCache", None)
+    monkeypatch.setattr(sys, "argv", ["check_sitemap_404.py", "--static-dir", str(site), "--progress-interval", "0"])
+    with pytest.raises(SystemExit) as exit_info:
+        checker.main()
+    assert exit_info.value.code == 1
+    assert not cache_file.exists()
@@ -0,0 +1,182 @@
+"""
+check_translations 的离线测试：
+- 单次扫描的 tokenize_string 与分别使用 PLACEHOLDER_PATTERN / HTML_TAG_PATTERN 的结果一致，
+  并提取实体引用、ICU 参数与标签序列；check_file 按 kind 报告各类结构问题
+- 在临时目录中构造 messages/ 语料，验证增量审计（--incremental）只重新检查内容哈希发生变化的组合，
+  其余结果从上一次的 JSONL 流中沿用
+"""
+
+import contextlib
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+import check_translations
+import message_corpus
+
+EN_ABOUT = {
+    "title": "About {company}",
+    "body": "We build <strong>analysers</strong> for labs.",
+    "team": {"lead": "Led by {name}"},
+}
+
+
+def write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    """临时语料：en 为源语言，de 完整、fr 缺少一个键；共享语料不读写磁盘缓存"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(check_translations, "LANGUAGES", ["de", "fr"])
+    monkeypatch.setattr(check_translations, "FILES", ["about.json"])
+    monkeypatch.setattr(message_corpus, "_corpus", message_corpus.MessageCorpus(None))
+    check_translations.tokenize_source_string.cache_clear()
+
+    write_json(tmp_path / "messages" / "en" / "about.json", EN_ABOUT)
+    write_json(tmp_path / "messages" / "de" / "about.json", {
+        "title": "Über {company}",
+        "body": "Wir bauen <strong>Analysegeräte</strong> für Labore.",
+        "team": {"lead": "Geleitet von {name}"},
+    })
+    write_json(tmp_path / "messages" / "fr" / "about.json", {
+        "title": "À propos de {company}",
+        "body": "Nous fabriquons des <strong>analyseurs</strong>.",
+    })
+    return tmp_path
+
+
+@pytest.fixture
+def audited(monkeypatch):
+    """记录实际重新审计（未沿用上次结果）的 (文件, 语言) 组合"""
+    pairs = []
+    audit_pair = check_translations.audit_pair
+
+    def spy(pair):
+        pairs.append(pair)
+        return audit_pair(pair)
+
+    monkeypatch.setattr(check_translations, "audit_pair", spy)
+    return pairs
+
+
+@pytest.mark.parametrize("text", [
+    "Hello {name}, <strong>you</strong>&nbsp;won",
+    '<a href="{url}">link</a> {count}',
+    "{n, plural, one {# item} other {# items}}",
+    "<b><i>x</b></i>",
+    "Line<br>break &#8212; &#x2014; &amp; <img src='a.webp' alt=\"{alt}\"/>",
+    "no markup at all",
+])
+def test_tokenize_matches_separate_patterns(text):
+    tokens = check_translations.tokenize_string(text)
+    assert tokens.placeholders == set(check_translations.PLACEHOLDER_PATTERN.findall(text))
+    assert tokens.tags == set(check_translations.HTML_TAG_PATTERN.findall(text))
+
+
+def test_tokenize_extracts_structure():
+    tokens = check_translations.tokenize_string("{n, plural, one {#}} <b>a<br>b</b> &nbsp;&#8212;")
+    assert tokens.icu_arguments == {("n", "plural")}
+    assert tokens.entities == {"&nbsp;", "&#8212;"}
+    assert tokens.tag_sequence == ("b", "br/", "/b")
+    assert tokens.well_nested
+
+    assert not check_translations.tokenize_string("<b><i>x</b></i>").well_nested
+    assert not check_translations.tokenize_string("<b>unclosed").well_nested
+
+
+def test_check_file_reports_structure_issue_kinds(corpus):
+    en_file = corpus / "messages" / "en" / "structure.json"
+    de_file = corpus / "messages" / "de" / "structure.json"
+    write_json(en_file, {
+        "nesting": "<b><i>x</i></b>",
+        "order": "<b>a</b> <i>b</i>",
+        "entities": "a&nbsp;b",
+        "icu": "{n, plural, one {#} other {#}}",
+        "clean": "<b>same</b> &amp; {x}",
+    })
+    write_json(de_file, {
+        "nesting": "<b><i>x</b></i>",
+        "order": "<i>b</i> <b>a</b>",
+        "entities": "a b",
+        "icu": "{n, select, one {#} other {#}}",
+        "clean": "<b>gleich</b> &amp; {x}",
+    })
+    results = check_translations.check_file(en_file, de_file, "de")
+    assert [(issue["key"], issue["kind"]) for issue in results["structure_issues"]] == [
+        ("nesting", "tag_nesting"),
+        ("order", "tag_order"),
+        ("entities", "entities"),
+        ("icu", "icu_arguments"),
+    ]
+    entities = results["structure_issues"][2]
+    assert (entities["en"], entities["lang"]) == (["&nbsp;"], [])
+    # ICU 参数类型不同时占位符本身也不同
+    assert [issue["key"] for issue in results["placeholder_issues"]] == ["icu"]
+    assert results["html_tag_issues"] == [] and results["missing_keys"] == []
+
+
+def run_main(monkeypatch, *args: str) -> dict:
+    """运行 main()，返回兼容的嵌套 JSON 报告"""
+    monkeypatch.setattr(sys, "argv", ["check_translations.py", *args])
+    with contextlib.redirect_stdout(io.StringIO()):
+        check_translations.main()
+    with open(check_translations.REPORT_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_incremental_reuses_unchanged_pairs(corpus, audited, monkeypatch):
+    first = run_main(monkeypatch, "--incremental")
+    assert audited == [("about.json", "de"), ("about.json", "fr")]
+    assert first["about.json"]["fr"]["missing_keys"] == ["team", "team.lead"]
+    with open(check_translations.HASH_MANIFEST_FILE, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["version"] == check_translations.AUDIT_VERSION
+    assert set(manifest["pairs"]) == {"about.json/de", "about.json/fr"}
+
+    # 内容未变化：全部沿用，报告与首次运行一致
+    audited.clear()
+    assert run_main(monkeypatch, "--incremental") == first
+    assert audited == []
+    assert not check_translations.REPORT_STREAM_FILE.with_name(
+        check_translations.REPORT_STREAM_FILE.name + ".tmp").exists()
+
+    # 只有 fr 发生变化：只重新审计 fr，de 的结果从上次的 JSONL 流中读取
+    audited.clear()
+    write_json(corpus / "messages" / "fr" / "about.json", {
+        "title": "À propos de {company}",
+        "body": "Nous fabriquons des <strong>analyseurs</strong> pour les laboratoires.",
+        "team": {"lead": "Dirigé par {nom}"},
+    })
+    third = run_main(monkeypatch, "--incremental")
+    assert audited == [("about.json", "fr")]
+    assert third["about.json"]["de"] == first["about.json"]["de"]
+    assert third["about.json"]["fr"]["missing_keys"] == []
+    assert [issue["key"] for issue in third["about.json"]["fr"]["placeholder_issues"]] == ["team.lead"]
+
+
+def test_incremental_rechecks_all_languages_when_source_changes(corpus, audited, monkeypatch):
+    run_main(monkeypatch, "--incremental")
+    audited.clear()
+    write_json(corpus / "messages" / "en" / "about.json", {**EN_ABOUT, "footer": "Contact us"})
+    report = run_main(monkeypatch, "--incremental")
+    assert audited == [("about.json", "de"), ("about.json", "fr")]
+    assert report["about.json"]["de"]["missing_keys"] == ["footer"]
+
+
+def test_incremental_ignores_results_from_other_audit_version(corpus, audited, monkeypatch):
+    run_main(monkeypatch, "--incremental")
+    audited.clear()
+    monkeypatch.setattr(check_translations, "AUDIT_VERSION", check_translations.AUDIT_VERSION + 1)
+    run_main(monkeypatch, "--incremental")
+    assert audited == [("about.json", "de"), ("about.json", "fr")]
+
+
+def test_full_run_matches_incremental_run(corpus, monkeypatch):
+    incremental = run_main(monkeypatch, "--incremental")
+    assert run_main(monkeypatch) == incremental
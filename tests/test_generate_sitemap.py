@@ -0,0 +1,212 @@
+"""
+generate_sitemap 的离线测试：
+- SitemapWriter 按 URL 数上限分片并写出 sitemap_index.xml，只有一个分片时输出 sitemap.xml，并清理上次多余的分片
+- 内容与已有文件逐字节相同时不重写（保留原文件及其修改时间），gzip 输出不含时间戳
+- LastmodManifest 在内容哈希不变时沿用记录的日期；清单中没有的 URL 依次使用已发布 sitemap 的日期、文章发布日期
+- 页面的 priority / changefreq 与 scripts/generate-sitemap.ts 生成的 sitemap.xml 一致
+- 根目录与 public/ 的 sitemap.xml 由 scripts/generate-sitemap.ts 生成，main 拒绝输出到这两个目录
+"""
+
+import gzip
+import os
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+import generate_sitemap
+from generate_sitemap import LastmodManifest, PageVersion, Route, SitemapWriter
+
+ROOT = Path(__file__).resolve().parent.parent
+SITEMAP_NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+OLD_MTIME_NS = 1_000_000_000
+
+
+def entry(path: str, lastmod: str) -> str:
+    return generate_sitemap.generate_url_entry(path, "0.5", "monthly", locales=["en"], lastmod=lastmod, lang="en")
+
+
+def write_sitemap(output_dir: Path, count: int, **kwargs) -> SitemapWriter:
+    with SitemapWriter(output_dir, **kwargs) as writer:
+        for i in range(count):
+            writer.write(entry(f"/page-{i}", f"2026-01-{i + 1:02d}T00:00:00+00:00"),
+                         f"2026-01-{i + 1:02d}T00:00:00+00:00")
+    return writer
+
+
+def locs(path: Path) -> list:
+    return [loc.text for loc in ET.parse(path).getroot().iterfind(".//sm:loc", SITEMAP_NS)]
+
+
+def age(paths) -> None:
+    """把文件的修改时间改到过去，便于判断之后是否被重写"""
+    for path in paths:
+        os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+
+def test_single_shard_is_written_as_sitemap_xml(tmp_path):
+    writer = write_sitemap(tmp_path, 3, max_urls=10)
+    assert writer.files == [tmp_path / "sitemap.xml"]
+    assert sorted(os.listdir(tmp_path)) == ["sitemap.xml"]
+    assert locs(tmp_path / "sitemap.xml") == [
+        f"{generate_sitemap.BASE_URL}/en/page-{i}/" for i in range(3)
+    ]
+
+
+def test_shards_when_url_limit_is_exceeded(tmp_path):
+    writer = write_sitemap(tmp_path, 5, max_urls=2)
+    shards = [tmp_path / f"sitemap-{n}.xml" for n in (1, 2, 3)]
+    assert writer.files == shards + [tmp_path / "sitemap_index.xml"]
+    assert [len(locs(shard)) for shard in shards] == [2, 2, 1]
+
+    index = ET.parse(tmp_path / "sitemap_index.xml").getroot()
+    assert [sitemap.findtext("sm:loc", namespaces=SITEMAP_NS) for sitemap in index] == [
+        f"{generate_sitemap.BASE_URL}/{shard.name}" for shard in shards
+    ]
+    # 每个分片的 lastmod 为其中最新的条目日期
+    assert [sitemap.findtext("sm:lastmod", namespaces=SITEMAP_NS) for sitemap in index] == [
+        "2026-01-02T00:00:00+00:00", "2026-01-04T00:00:00+00:00", "2026-01-05T00:00:00+00:00",
+    ]
+
+
+def test_removes_stale_shards_and_index(tmp_path):
+    write_sitemap(tmp_path, 5, max_urls=2)
+    write_sitemap(tmp_path, 3, max_urls=2)
+    assert sorted(os.listdir(tmp_path)) == ["sitemap-1.xml", "sitemap-2.xml", "sitemap_index.xml"]
+
+    write_sitemap(tmp_path, 2, max_urls=2)
+    assert sorted(os.listdir(tmp_path)) == ["sitemap.xml"]
+
+    write_sitemap(tmp_path, 3, max_urls=2)
+    assert sorted(os.listdir(tmp_path)) == ["sitemap-1.xml", "sitemap-2.xml", "sitemap_index.xml"]
+
+
+def test_identical_output_is_not_rewritten(tmp_path):
+    first = write_sitemap(tmp_path, 5, max_urls=2)
+    assert first.unchanged == []
+    age(first.files)
+
+    second = write_sitemap(tmp_path, 5, max_urls=2)
+    assert second.files == first.files
+    assert second.unchanged == second.files
+    assert all(path.stat().st_mtime_ns == OLD_MTIME_NS for path in second.files)
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+
+    # 只有最后一个分片的内容变化：只重写该分片与索引（索引中的 lastmod 随之变化）
+    with SitemapWriter(tmp_path, max_urls=2) as third:
+        for i in range(5):
+            lastmod = f"2026-02-{i + 1:02d}T00:00:00+00:00" if i == 4 else f"2026-01-{i + 1:02d}T00:00:00+00:00"
+            third.write(entry(f"/page-{i}", lastmod), lastmod)
+    assert third.unchanged == [tmp_path / "sitemap-1.xml", tmp_path / "sitemap-2.xml"]
+
+
+def test_gzip_output_is_deterministic(tmp_path):
+    writer = write_sitemap(tmp_path, 3, gzip_output=True)
+    path = tmp_path / "sitemap.xml.gz"
+    assert writer.files == [path]
+    content = path.read_bytes()
+    assert gzip.decompress(content).startswith(generate_sitemap.URLSET_HEADER)
+    age(writer.files)
+
+    again = write_sitemap(tmp_path, 3, gzip_output=True)
+    assert again.unchanged == [path]
+    assert path.read_bytes() == content
+    assert path.stat().st_mtime_ns == OLD_MTIME_NS
+
+
+def route(path: str, kind: str = "page", **versions: PageVersion) -> Route:
+    return Route(path, kind, tuple(versions), versions)
+
+
+def test_lastmod_is_stable_while_content_hash_is_unchanged(tmp_path):
+    manifest_path = tmp_path / "sitemap_lastmod.json"
+    about = route("/about", en=PageVersion("v1", None, "2026-03-01T00:00:00+00:00"))
+    manifest = LastmodManifest(manifest_path)
+    assert manifest.lastmod(about, "en") == "2026-03-01T00:00:00+00:00"
+    assert manifest.save()
+
+    # 来源文件有新的提交但内容哈希相同：沿用记录的日期，不重写清单
+    touched = route("/about", en=PageVersion("v1", None, "2026-04-01T00:00:00+00:00"))
+    manifest = LastmodManifest(manifest_path)
+    assert manifest.lastmod(touched, "en") == "2026-03-01T00:00:00+00:00"
+    assert manifest.changed == 0
+    assert not manifest.save()
+
+    # 内容哈希变化：使用来源文件的提交时间
+    changed = route("/about", en=PageVersion("v2", None, "2026-04-01T00:00:00+00:00"))
+    manifest = LastmodManifest(manifest_path)
+    assert manifest.lastmod(changed, "en") == "2026-04-01T00:00:00+00:00"
+    assert manifest.changed == 1
+    assert manifest.save()
+    assert LastmodManifest(manifest_path).entries == {
+        "/about": {"en": {"hash": "v2", "lastmod": "2026-04-01T00:00:00+00:00"}},
+    }
+
+
+def test_new_article_uses_published_date_until_it_changes(tmp_path):
+    manifest_path = tmp_path / "sitemap_lastmod.json"
+    article = route("/faq/setup", "article", en=PageVersion("a1", "2026-02-14", "2026-03-01T00:00:00+00:00"))
+    manifest = LastmodManifest(manifest_path)
+    assert manifest.lastmod(article, "en") == "2026-02-14"
+    manifest.save()
+
+    edited = route("/faq/setup", "article", en=PageVersion("a2", "2026-02-14", "2026-03-05T00:00:00+00:00"))
+    assert LastmodManifest(manifest_path).lastmod(edited, "en") == "2026-03-05T00:00:00+00:00"
+
+
+def test_seed_is_used_only_for_urls_missing_from_manifest(tmp_path):
+    manifest_path = tmp_path / "sitemap_lastmod.json"
+    published = "2026-01-10T07:40:11+00:00"
+    seed = {
+        generate_sitemap.page_url("en", "/faq/setup"): published,
+        generate_sitemap.page_url("de", "/contact"): published,
+    }
+    article = route("/faq/setup", "article", en=PageVersion("a1", "2026-02-14", "2026-03-01T00:00:00+00:00"))
+    contact = route("/contact", en=PageVersion("c1", None, "2026-03-01T00:00:00+00:00"),
+                    de=PageVersion("c1", None, "2026-03-01T00:00:00+00:00"))
+
+    manifest = LastmodManifest(manifest_path, seed)
+    assert manifest.lastmod(article, "en") == published
+    assert manifest.lastmod(contact, "de") == published
+    # 已发布 sitemap 中没有的 URL 不受 seed 影响
+    assert manifest.lastmod(contact, "en") == "2026-03-01T00:00:00+00:00"
+    manifest.save()
+
+    # 已记录在清单中的 URL 内容变化时使用提交时间，不再回退到 seed
+    changed = route("/contact", de=PageVersion("c2", None, "2026-04-01T00:00:00+00:00"))
+    assert LastmodManifest(manifest_path, seed).lastmod(changed, "de") == "2026-04-01T00:00:00+00:00"
+
+
+def test_load_published_lastmods_includes_alternates(tmp_path):
+    sitemap = tmp_path / "sitemap.xml"
+    lastmod = "2026-05-29T07:40:11+00:00"
+    with SitemapWriter(tmp_path) as writer:
+        writer.write(generate_sitemap.generate_url_entry("/about", "0.9", "monthly", locales=["en", "de"],
+                                                         lastmod=lastmod), lastmod)
+    lastmods = generate_sitemap.load_published_lastmods(sitemap)
+    assert lastmods == {
+        generate_sitemap.page_url("en", "/about"): lastmod,
+        generate_sitemap.page_url("de", "/about"): lastmod,
+    }
+
+
+@pytest.mark.parametrize("output_dir", [".", "public"])
+def test_main_refuses_build_sitemap_dirs(tmp_path, monkeypatch, output_dir):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as excinfo:
+        generate_sitemap.main(["--output-dir", output_dir])
+    assert excinfo.value.code == 2
+    assert not (tmp_path / "sitemap.xml").exists()
+
+
+def test_priority_and_changefreq_match_build_sitemap():
+    """PRIORITY_RULES 必须与 npm run build:sitemap 输出的 sitemap.xml 保持一致"""
+    urls = ET.parse(ROOT / "sitemap.xml").getroot().findall("sm:url", SITEMAP_NS)
+    assert urls
+    for url in urls:
+        loc = url.findtext("sm:loc", namespaces=SITEMAP_NS)
+        lang_path = loc[len(generate_sitemap.BASE_URL):].strip("/").split("/", 1)
+        path = "/" + (lang_path[1] if len(lang_path) > 1 else "")
+        expected = (url.findtext("sm:priority", namespaces=SITEMAP_NS),
+                    url.findtext("sm:changefreq", namespaces=SITEMAP_NS))
+        assert generate_sitemap.page_priority_and_changefreq(path) == expected, loc
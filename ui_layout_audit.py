@@ -5,18 +5,22 @@ UI 溢出与排版审计脚本
 检查 375px（移动端）和 1440px（桌面端）下的布局问题
 """
 
+import argparse
 import re
 from pathlib import Path
 
+from audit_profile import add_profile_arguments, configure, count, finish, section
+from message_corpus import load_text
+
 def check_css_file(css_file: Path):
     """检查 CSS 文件中的布局问题"""
     issues = []
     
-    with open(css_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = load_text(css_file)
     
     # 检查导航栏
     nav_menu_match = re.search(r'\.nav-menu\s*\{[^}]*\}', content, re.DOTALL)
+    count('regex_evals')
     if nav_menu_match:
         nav_css = nav_menu_match.group(0)
         # 检查是否有 white-space: nowrap（可能导致溢出）
@@ -31,6 +35,7 @@ def check_css_file(css_file: Path):
     
     # 检查按钮
     btn_matches = re.finditer(r'\.btn[^{]*\{[^}]*\}', content, re.DOTALL)
+    count('regex_evals')
     for match in btn_matches:
         btn_css = match.group(0)
         if 'white-space: nowrap' in btn_css:
@@ -47,6 +52,7 @@ def check_css_file(css_file: Path):
         if '@media (max-width: 768px)' in content or '@media (max-width: 375px)' in content:
             # 检查表格是否有 overflow-x: auto
             table_sections = re.finditer(r'table[^{]*\{[^}]*\}', content, re.DOTALL)
+            count('regex_evals')
             has_table_overflow = False
             for table_match in table_sections:
                 if 'overflow-x' in table_match.group(0):
@@ -61,6 +67,7 @@ def check_css_file(css_file: Path):
     
     # 检查产品卡片高度对齐
     product_card_match = re.search(r'\.product-card[^{]*\{[^}]*\}', content, re.DOTALL)
+    count('regex_evals')
     if product_card_match:
         card_css = product_card_match.group(0)
         if 'height: 100%' not in card_css and 'align-items: stretch' not in content:
@@ -72,6 +79,7 @@ def check_css_file(css_file: Path):
     
     # 检查 FAQ 卡片高度对齐
     article_card_match = re.search(r'\.article-card[^{]*\{[^}]*\}', content, re.DOTALL)
+    count('regex_evals')
     if article_card_match:
         article_css = article_card_match.group(0)
         if 'height: 100%' not in article_css:
@@ -84,6 +92,7 @@ def check_css_file(css_file: Path):
     # 检查 hyphens: auto
     # 检查 FAQ 文章内容区域
     about_section_match = re.search(r'\.about-section[^{]*article[^{]*\{[^}]*\}', content, re.DOTALL)
+    count('regex_evals')
     if about_section_match:
         article_css = about_section_match.group(0)
         if 'hyphens' not in article_css:
@@ -102,8 +111,7 @@ def check_tsx_files():
     # 检查导航栏组件
     nav_file = Path('components/Navigation.tsx')
     if nav_file.exists():
-        with open(nav_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = load_text(nav_file)
         # 检查是否有内联样式导致溢出
         if 'white-space' in content and 'overflow' not in content:
             issues.append({
@@ -115,8 +123,7 @@ def check_tsx_files():
     # 检查 FAQ 文章页面
     faq_article_file = Path('app/[locale]/faq/[slug]/page.tsx')
     if faq_article_file.exists():
-        with open(faq_article_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = load_text(faq_article_file)
         # 检查表格的响应式处理
         if 'table' in content.lower():
             if 'overflowX' not in content and 'overflow-x' not in content:
@@ -138,6 +145,11 @@ def check_tsx_files():
     return issues
 
 def main():
+    parser = argparse.ArgumentParser(description='UI 溢出与排版审计')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+    
     print("=" * 80)
     print("UI 溢出与排版审计报告")
     print("=" * 80)
@@ -148,14 +160,16 @@ def main():
     
     if css_file.exists():
         print("检查 CSS 文件...")
-        css_issues = check_css_file(css_file)
+        with section('ui.css'):
+            css_issues = check_css_file(css_file)
         all_issues.extend(css_issues)
         print(f"  发现 {len(css_issues)} 个潜在问题")
     else:
         print("警告: styles.css 文件不存在")
     
     print("\n检查 TSX 文件...")
-    tsx_issues = check_tsx_files()
+    with section('ui.tsx'):
+        tsx_issues = check_tsx_files()
     all_issues.extend(tsx_issues)
     print(f"  发现 {len(tsx_issues)} 个潜在问题")
     
@@ -182,6 +196,8 @@ def main():
     print("=" * 80)
     print("审计完成")
     print("=" * 80)
+    
+    finish(args)
 
 if __name__ == '__main__':
     main()